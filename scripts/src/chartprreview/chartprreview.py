@@ -1,5 +1,6 @@
 import argparse
-import hashlib
+import filecmp
+import json
 import os
 import os.path
 import re
@@ -7,8 +8,6 @@ import subprocess
 import sys
 
 import requests
-import semantic_version
-import semver
 import yaml
 from environs import Env
 
@@ -18,14 +17,26 @@ except ImportError:
     from yaml import Loader
 
 sys.path.append("../")
+from chartprreview import checkgraph
 from pullrequest import prartifact
 from reporegex import matchers
-from report import report_info, verifier_report
+from report import report_info, verification_cache, verifier_report
 from signedchart import signedchart
-from tools import gitutils
+from tools import digest, errorlog, gitutils, versions
+
+# Findings of the checks, see checkgraph.Finding.to_dict
+FINDINGS_FILE = "findings.json"
 
 
 def write_error_log(directory, *msg):
+    """Print the messages and write them to the errors file. In a check run by a
+    CheckGraph, the messages are recorded as a finding of the check instead, see
+    checkgraph."""
+    if not errorlog.record(*msg):
+        write_errors_file(directory, *msg)
+
+
+def write_errors_file(directory, *msg):
     os.makedirs(directory, exist_ok=True)
     with open(os.path.join(directory, "errors"), "w") as fd:
         for line in msg:
@@ -34,6 +45,22 @@ def write_error_log(directory, *msg):
             fd.write("\n")
 
 
+def write_findings(directory, findings):
+    """Write the messages of all the findings of the checks to the errors file, if
+    any, and the findings themselves to findings.json.
+
+    Args:
+        directory (str): Local directory in which to write the error logs
+        findings (list[checkgraph.Finding]): Findings of the checks
+    """
+    messages = [line for finding in findings for line in finding.messages]
+    if messages:
+        write_errors_file(directory, *messages)
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, FINDINGS_FILE), "w") as fd:
+        json.dump([finding.to_dict() for finding in findings], fd, indent=2)
+
+
 def get_vendor_type(directory):
     vendor_type = os.environ.get("VENDOR_TYPE")
     if not vendor_type or vendor_type not in {"partner", "redhat", "community"}:
@@ -71,15 +98,17 @@ def get_modified_charts(directory, api_url):
     sys.exit(1)
 
 
-def verify_user(directory, username, category, organization, chart):
+def verify_user(username, category, organization, chart):
     """Check that the user that submitted the PR is in the OWNERS file for this chart.
 
     Args:
-        directory (str): Local directory in which to write the error logs
         username (str): Github username that submitted the PR.
         category (str): Type of profile (community, partners, or redhat)
         organization (str): Name of the organization (ex: hashicorp)
         chart (str): Name of the chart (ex: vault)
+
+    Returns:
+        list[checkgraph.Finding]: The problems found
     """
     print(
         "[INFO] Verify user. %s, %s, %s, %s" % (username, category, organization, chart)
@@ -87,20 +116,17 @@ def verify_user(directory, username, category, organization, chart):
     owners_path = os.path.join("charts", category, organization, chart, "OWNERS")
     if not os.path.exists(owners_path):
         msg = f"[ERROR] {owners_path} file does not exist."
-        write_error_log(directory, msg)
-        sys.exit(1)
+        return [checkgraph.Finding([msg])]
 
     data = open(owners_path).read()
     out = yaml.load(data, Loader=Loader)
     if username not in [x["githubUsername"] for x in out["users"]]:
         msg = f"[ERROR] {username} is not allowed to submit the chart on behalf of {organization}"
-        write_error_log(directory, msg)
-        sys.exit(1)
+        return [checkgraph.Finding([msg])]
+    return []
 
 
-def check_owners_file_against_directory_structure(
-    directory, category, organization, chart
-):
+def check_owners_file_against_directory_structure(category, organization, chart):
     """Check that the content of the OWNERS file correspond to the directory structure
     the chart is under.
 
@@ -109,23 +135,28 @@ def check_owners_file_against_directory_structure(
     - the vendor.label key must correspond to the organization directory
 
     Args:
-        directory (str): Local directory in which to write the error logs
         category (str): Type of profile (community, partners, or redhat)
         organization (str): Name of the organization (ex: hashicorp)
         chart (str): Name of the chart (ex: vault)
+
+    Returns:
+        list[checkgraph.Finding]: The problems found
     """
     print(
         "[INFO] Check owners file against directory structure. %s, %s, %s"
         % (category, organization, chart)
     )
-    data = open(os.path.join("charts", category, organization, chart, "OWNERS")).read()
+    owners_path = os.path.join("charts", category, organization, chart, "OWNERS")
+    if not os.path.exists(owners_path):
+        # Reported by verify_user
+        return []
+
+    data = open(owners_path).read()
     out = yaml.load(data, Loader=Loader)
     vendor_label = out["vendor"]["label"]
     chart_name = out["chart"]["name"]
-    error_exit = False
     msgs = []
     if organization != vendor_label:
-        error_exit = True
         msgs.append(
             f"[ERROR] vendor/label in OWNERS file ({vendor_label}) doesn't match the directory structure (charts/{category}/{organization}/{chart})"
         )
@@ -133,10 +164,9 @@ def check_owners_file_against_directory_structure(
         msgs.append(
             f"[ERROR] chart/name in OWNERS file ({chart_name}) doesn't match the directory structure (charts/{category}/{organization}/{chart})"
         )
-        error_exit = True
-    if error_exit:
-        write_error_log(directory, *msgs)
-        sys.exit(1)
+    if msgs:
+        return [checkgraph.Finding(msgs)]
+    return []
 
 
 def verify_signature(category, organization, chart, version):
@@ -175,20 +205,73 @@ def verify_signature(category, organization, chart, version):
         print(f"[INFO] Signed report not found: {sign}.")
 
 
-def match_checksum(
-    directory, generated_report_info_path, category, organization, chart, version
-):
+def check_report_validity(report_path, ocp_version_range):
+    """Check that the submitted report is valid, see verifier_report.validate_report.
+
+    Args:
+        report_path (str): Path to report.yaml
+        ocp_version_range (str): Range of supported OCP versions
+
+    Returns:
+        list[checkgraph.Finding]: The problems found, one per failed validity check
+    """
+    is_valid_yaml, report_data = verifier_report.get_report_data(report_path)
+    if not is_valid_yaml:
+        msg = f"Report is not valid yaml: {report_path}"
+        return [checkgraph.Finding([f"Submitted report is not valid: {msg}"])]
+
+    validation = verifier_report.validate_report(
+        report_data, ocp_version_range, report_path
+    )
+    if validation.valid:
+        print("[INFO] Submitted report passed validity check!")
+    return [
+        checkgraph.Finding([f"Submitted report is not valid: {error}"])
+        for error in validation.errors
+    ]
+
+
+def check_pgp_public_key(category, organization, chart, report_path):
+    """Check that the PGP key in the OWNERS file matches the key digest in the report
+    of a signed chart.
+
+    Args:
+        category (str): Type of profile (community, partners, or redhat)
+        organization (str): Name of the organization (ex: hashicorp)
+        chart (str): Name of the chart (ex: vault)
+        report_path (str): Path to report.yaml
+
+    Returns:
+        list[checkgraph.Finding]: The problems found
+    """
+    owners_file = os.path.join("charts", category, organization, chart, "OWNERS")
+    pgp_key_in_owners = signedchart.get_pgp_key_from_owners(owners_file)
+    if pgp_key_in_owners:
+        if signedchart.check_report_for_signed_chart(report_path):
+            if not signedchart.check_pgp_public_key(pgp_key_in_owners, report_path):
+                msg = "PGP key in OWNERS file does not match with key digest in report."
+                return [checkgraph.Finding([msg])]
+            else:
+                print(
+                    "[INFO] PGP key in OWNERS file matches with key digest in report."
+                )
+    return []
+
+
+def match_checksum(generated_report_info_path, category, organization, chart, version):
     """Check that the provided report and the generated report have the same chart
     digest
 
     Args:
-        directory (str): Local directory in which to write the error logs
         generated_report_info_path (str): Path to the processed JSON report generated
                                           in the pipeline
         category (str): Type of profile (community, partners, or redhat)
         organization (str): Name of the organization (ex: hashicorp)
         chart (str): Name of the chart (ex: vault)
         version (str): The version of the chart (ex: 1.4.0)
+
+    Returns:
+        list[checkgraph.Finding]: The problems found
     """
     print("[INFO] Check digests match. %s, %s, %s" % (organization, chart, version))
     submitted_report_path = os.path.join(
@@ -206,17 +289,19 @@ def match_checksum(
 
     if submitted_digest != generated_digest:
         msg = f"[ERROR] Digest is not matching: {submitted_digest}, {generated_digest}"
-        write_error_log(directory, msg)
-        sys.exit(1)
+        return [checkgraph.Finding([msg])]
+    return []
 
 
-def check_url(directory, report_path):
+def check_url(report_path):
     """Check that the chart URL provided in report.yaml is valid and that the chart
     digest matches the one provided in report.yaml
 
     Args:
-        directory (str): Local directory in which to write the error logs
         report_path (str): Path to report.yaml
+
+    Returns:
+        list[checkgraph.Finding]: The problems found
     """
     print("[INFO] Check chart_url is a valid url. %s" % report_path)
     chart_url = report_info.get_report_chart_url(report_path=report_path)
@@ -224,53 +309,45 @@ def check_url(directory, report_path):
     try:
         r = requests.head(chart_url)
     except requests.exceptions.InvalidSchema as err:
-        msgs = []
-        msgs.append(f"Invalid schema: {chart_url}")
-        msgs.append(str(err))
-        write_error_log(directory, *msgs)
-        sys.exit(1)
+        return [checkgraph.Finding([f"Invalid schema: {chart_url}", str(err)])]
     except requests.exceptions.InvalidURL as err:
-        msgs = []
-        msgs.append(f"Invalid URL: {chart_url}")
-        msgs.append(str(err))
-        write_error_log(directory, *msgs)
-        sys.exit(1)
+        return [checkgraph.Finding([f"Invalid URL: {chart_url}", str(err)])]
     except requests.exceptions.MissingSchema as err:
-        msgs = []
-        msgs.append(f"Missing schema in URL: {chart_url}")
-        msgs.append(str(err))
-        write_error_log(directory, *msgs)
-        sys.exit(1)
+        return [checkgraph.Finding([f"Missing schema in URL: {chart_url}", str(err)])]
 
+    findings = []
     try:
         r.raise_for_status()
     except requests.exceptions.HTTPError as err:
         msgs = []
         msgs.append("[WARNING] URL is not accessible: {chart_url} ")
         msgs.append(str(err))
-        write_error_log(directory, *msgs)
+        findings.append(checkgraph.Finding(msgs, fatal=False))
 
-    verify_package_digest(chart_url, report_path)
+    return findings + verify_package_digest(chart_url, report_path)
 
 
 def match_name_and_version(
-    directory, category, organization, chart, version, generated_report_path
+    category, organization, chart, version, generated_report_path
 ):
     """Check that the chart name and version in the provided report.yaml and in the
     report generated in the pipeline match the underlying directory structure.
 
     Args:
-        directory (str): Local directory in which to write the error logs
         category (str): Type of profile (community, partners, or redhat)
         organization (str): Name of the organization (ex: hashicorp)
         chart (str): Name of the chart (ex: vault)
         version (str): The version of the chart (ex: 1.4.0)
         generated_report_path (str): Path to the report generated in the pipeline
+
+    Returns:
+        list[checkgraph.Finding]: The problems found
     """
     print(
         "[INFO] Check chart has same name and version as directory structure. %s, %s, %s"
         % (organization, chart, version)
     )
+    findings = []
     submitted_report_path = os.path.join(
         "charts", category, organization, chart, version, "report.yaml"
     )
@@ -283,13 +360,11 @@ def match_name_and_version(
 
         if submitted_report_chart_name != chart:
             msg = f"[ERROR] Chart name ({submitted_report_chart_name}) doesn't match the directory structure (charts/{category}/{organization}/{chart}/{version})"
-            write_error_log(directory, msg)
-            sys.exit(1)
+            findings.append(checkgraph.Finding([msg]))
 
         if submitted_report_chart_version != version:
             msg = f"[ERROR] Chart version ({submitted_report_chart_version}) doesn't match the directory structure (charts/{category}/{organization}/{chart}/{version})"
-            write_error_log(directory, msg)
-            sys.exit(1)
+            findings.append(checkgraph.Finding([msg]))
 
         if os.path.exists(generated_report_path):
             report_chart = report_info.get_report_chart(
@@ -300,13 +375,11 @@ def match_name_and_version(
 
             if submitted_report_chart_name != report_chart_name:
                 msg = f"[ERROR] Chart name in the chart is not matching against the value in the report: {submitted_report_chart_name} vs {report_chart_name}"
-                write_error_log(directory, msg)
-                sys.exit(1)
+                findings.append(checkgraph.Finding([msg]))
 
             if submitted_report_chart_version != report_chart_version:
                 msg = f"[ERROR] Chart version in the chart is not matching against the value in the report: {submitted_report_chart_version} vs. {report_chart_version}"
-                write_error_log(directory, msg)
-                sys.exit(1)
+                findings.append(checkgraph.Finding([msg]))
     else:
         print(f"[INFO] No report submitted, get data from : {generated_report_path}")
         report_chart = report_info.get_report_chart(report_path=generated_report_path)
@@ -315,16 +388,15 @@ def match_name_and_version(
 
         if report_chart_name != chart:
             msg = f"[ERROR] Chart name ({report_chart_name}) doesn't match the directory structure (charts/{category}/{organization}/{chart}/{version})"
-            write_error_log(directory, msg)
-            sys.exit(1)
+            findings.append(checkgraph.Finding([msg]))
 
         if report_chart_version != version:
             msg = f"[ERROR] Chart version ({report_chart_version}) doesn't match the directory structure (charts/{category}/{organization}/{chart}/{version})"
-            write_error_log(directory, msg)
-            sys.exit(1)
+            findings.append(checkgraph.Finding([msg]))
+    return findings
 
 
-def check_report_success(directory, api_url, report_path, report_info_path, version):
+def check_report_success(api_url, report_path, report_info_path, version, vendor_type):
     """Check the content of report.yaml
 
     * Check that the version in the report matches with the directory structure.
@@ -337,11 +409,14 @@ def check_report_success(directory, api_url, report_path, report_info_path, vers
     Also adds the content of report.yaml to the GITHUB_OUTPUT.
 
     Args:
-        directory (str): Local directory in which to write the error logs
         api_url (str): URL of the GitHub PR
         report_path (str): Path to report.yaml
         report_info_path (str): Path to processed JSON report
         version (str): The version of the chart (ex: 1.4.0)
+        vendor_type (str): Vendor type of the submission, see get_vendor_type
+
+    Returns:
+        list[checkgraph.Finding]: The problems found
     """
     print("[INFO] Check report success. %s" % report_path)
     data = open(report_path).read()
@@ -350,26 +425,24 @@ def check_report_success(directory, api_url, report_path, report_info_path, vers
     quoted_data = data.replace("%", "%25").replace("\n", "%0A").replace("\r", "%0D")
     gitutils.add_output("report_content", quoted_data)
 
+    findings = []
     chart = report_info.get_report_chart(
         report_path=report_path, report_info_path=report_info_path
     )
     report_version = chart["version"]
     if report_version != version:
         msg = f"[ERROR] Chart Version '{report_version}' doesn't match the version in the directory path: '{version}'"
-        write_error_log(directory, msg)
-        sys.exit(1)
+        findings.append(checkgraph.Finding([msg]))
 
     report_metadata = report_info.get_report_metadata(
         report_path=report_path, report_info_path=report_info_path
     )
     profile_version = report_metadata["profileVersion"]
-    vendor_type = get_vendor_type(directory)
     report_vendor_type = report_metadata["vendorType"]
 
     if report_vendor_type != vendor_type:
         msg = f"[ERROR] Report profile type '{report_vendor_type}' doesn't match the vendor type in the directory path: '{vendor_type}'"
-        write_error_log(directory, msg)
-        sys.exit(1)
+        findings.append(checkgraph.Finding([msg]))
 
     print(f"[INFO] Profile version:  {profile_version}")
     annotations = report_info.get_report_annotations(
@@ -393,10 +466,9 @@ def check_report_success(directory, api_url, report_path, report_info_path, vers
     available_annotations = set(annotations.keys())
 
     missing_annotations = required_annotations - available_annotations
-    for annotation in missing_annotations:
+    for annotation in sorted(missing_annotations):
         msg = f"[ERROR] Missing annotation in chart/report: {annotation}"
-        write_error_log(directory, msg)
-        sys.exit(1)
+        findings.append(checkgraph.Finding([msg]))
 
     report = report_info.get_report_results(
         report_path=report_path,
@@ -417,48 +489,111 @@ def check_report_success(directory, api_url, report_path, report_info_path, vers
         msgs.append("- Error message(s):")
         for m in report["message"]:
             msgs.append(f"  - {m}")
-        write_error_log(directory, *msgs)
         if vendor_type == "redhat":
             gitutils.add_output("redhat_to_community", "True")
-        if vendor_type != "redhat" and "force-publish" not in label_names:
-            if vendor_type == "community":
-                # requires manual review and approval
-                gitutils.add_output("community_manual_review_required", "True")
-            sys.exit(1)
+        fatal = vendor_type != "redhat" and "force-publish" not in label_names
+        if fatal and vendor_type == "community":
+            # requires manual review and approval
+            gitutils.add_output("community_manual_review_required", "True")
+        findings.append(checkgraph.Finding(msgs, fatal=fatal))
+        if fatal:
+            return findings
 
     if vendor_type == "community" and "force-publish" not in label_names:
         # requires manual review and approval
         print("[INFO] Community submission requires manual approval.")
         gitutils.add_output("community_manual_review_required", "True")
-        sys.exit(1)
+        if findings:
+            return findings
+        # Fail the check without reporting an error: the manual review is signalled
+        # by community_manual_review_required
+        return [checkgraph.Finding([])]
 
     if failures_in_report or vendor_type == "community":
-        return
+        return findings
 
     if "charts.openshift.io/testedOpenShiftVersion" in annotations:
         full_version = annotations["charts.openshift.io/testedOpenShiftVersion"]
         try:
-            semantic_version.Version.coerce(full_version)
+            versions.coerce(full_version)
         except ValueError:
             msg = f"[ERROR] tested OpenShift version not conforming to SemVer spec: {full_version}"
-            write_error_log(directory, msg)
-            sys.exit(1)
+            findings.append(checkgraph.Finding([msg]))
 
     if "charts.openshift.io/certifiedOpenShiftVersions" in annotations:
         full_version = annotations["charts.openshift.io/certifiedOpenShiftVersions"]
-        if not semver.VersionInfo.is_valid(full_version):
+        if not versions.is_valid(full_version):
             msg = f"[ERROR] certified OpenShift version not conforming to SemVer spec: {full_version}"
-            write_error_log(directory, msg)
-            sys.exit(1)
+            findings.append(checkgraph.Finding([msg]))
+    return findings
+
+
+def cache_verification(cache_key, report_path, report_info_path, passed):
+    """Add the verification of a report and the outcome of check_report_success to
+    the verification cache, see verification_cache."""
+    info = report_info.get_report_info(
+        report_path=report_path,
+        report_info_path=report_info_path,
+        profile_type=os.environ.get("VENDOR_TYPE"),
+    )
+    verification_cache.store(cache_key, report_path, info, passed)
+
+
+def _get_chart_cache_key(chart_path, vendor_type):
+    try:
+        return verification_cache.get_chart_cache_key(chart_path, vendor_type)
+    except (OSError, subprocess.CalledProcessError) as err:
+        print(f"[WARNING] Can't compute the verification cache key of the chart: {err}")
+        return None
+
+
+def verify_report(
+    api_url, report_path, report_info_path, version, vendor_type, chart_path=None
+):
+    """Run check_report_success, and add the verification to the verification cache.
+
+    Only the reports generated in the workflow are cached, under the key of the chart
+    tarball they were generated from. A report submitted in the PR is never cached.
+
+    Args:
+        chart_path (str): Path to the chart tarball, if the report was generated from
+                          it in the workflow with the default profile of the vendor
+                          type
+
+    Returns:
+        list[checkgraph.Finding]: The problems found by check_report_success
+    """
+    cache_key = _get_chart_cache_key(chart_path, vendor_type) if chart_path else None
+    cached_verification = cache_key and verification_cache.lookup(cache_key)
+    if (
+        cached_verification
+        and not report_info_path
+        and filecmp.cmp(cached_verification.report_path, report_path, shallow=False)
+    ):
+        print("[INFO] Using the report info of a previous verification of the report")
+        report_info_path = cached_verification.report_info_path
+
+    findings = check_report_success(
+        api_url, report_path, report_info_path, version, vendor_type
+    )
+    if cache_key:
+        passed = not any(finding.fatal for finding in findings)
+        cache_verification(cache_key, report_path, report_info_path, passed)
+    return findings
 
 
 def verify_package_digest(url, report):
+    """Check that the digest of the package at url matches the package digest in the
+    report.
+
+    Returns:
+        list[checkgraph.Finding]: The problems found
+    """
     print("[INFO] check package digest.")
 
-    response = requests.get(url, allow_redirects=True)
-    if response.status_code == 200:
-        target_digest = hashlib.sha256(response.content).hexdigest()
+    target_digest = digest.get_package_digest(url)
 
+    pkg_digest = None
     found, report_data = verifier_report.get_report_data(report)
     if found:
         pkg_digest = verifier_report.get_package_digest(report_data)
@@ -466,14 +601,13 @@ def verify_package_digest(url, report):
     if target_digest:
         if pkg_digest and pkg_digest != target_digest:
             # Digest was passed and computed but differ
-            raise Exception(
-                "Found an integrity issue. SHA256 digest passed does not match SHA256 digest computed."
-            )
+            msg = "[ERROR] Found an integrity issue. SHA256 digest passed does not match SHA256 digest computed."
+            return [checkgraph.Finding([msg])]
     elif not pkg_digest:
         # Digest was not passed and could not be computed
-        raise Exception(
-            "Was unable to compute SHA256 digest, please ensure chart url points to a chart package."
-        )
+        msg = "[ERROR] Was unable to compute SHA256 digest, please ensure chart url points to a chart package."
+        return [checkgraph.Finding([msg])]
+    return []
 
 
 def main():
@@ -507,63 +641,73 @@ def main():
     category, organization, chart, version = get_modified_charts(
         args.directory, args.api_url
     )
-    verify_user(args.directory, args.username, category, organization, chart)
-    check_owners_file_against_directory_structure(
-        args.directory, category, organization, chart
-    )
-
+    vendor_type = get_vendor_type(args.directory)
     report_generated = os.environ.get("REPORT_GENERATED")
     generated_report_path = os.environ.get("GENERATED_REPORT_PATH")
     generated_report_info_path = os.environ.get("REPORT_SUMMARY_PATH")
     env = Env()
     web_catalog_only = env.bool("WEB_CATALOG_ONLY", False)
 
+    # All the checks whose dependencies pass are run, independent ones concurrently,
+    # see checkgraph
+    checks = checkgraph.CheckGraph()
+    checks.add("verify-user", verify_user, args.username, category, organization, chart)
+    checks.add(
+        "owners-file",
+        check_owners_file_against_directory_structure,
+        category,
+        organization,
+        chart,
+    )
+
+    report_dependencies = []
     submitted_report_path = os.path.join(
         "charts", category, organization, chart, version, "report.yaml"
     )
     if os.path.exists(submitted_report_path):
-        ocp_version_range = os.environ.get("OCP_VERSION_RANGE")
-        report_valid, message = verifier_report.validate(
-            submitted_report_path, ocp_version_range
-        )
-        if not report_valid:
-            msg = f"Submitted report is not valid: {message}"
-            print(f"[ERROR] {msg}")
-            write_error_log(args.directory, msg)
-            sys.exit(1)
-
-        print("[INFO] Submitted report passed validity check!")
-        owners_file = os.path.join("charts", category, organization, chart, "OWNERS")
-        pgp_key_in_owners = signedchart.get_pgp_key_from_owners(owners_file)
-        if pgp_key_in_owners:
-            if signedchart.check_report_for_signed_chart(submitted_report_path):
-                if not signedchart.check_pgp_public_key(
-                    pgp_key_in_owners, submitted_report_path
-                ):
-                    msg = "PGP key in OWNERS file does not match with key digest in report."
-                    print(f"[ERROR] {msg}")
-                    write_error_log(args.directory, msg)
-                    sys.exit(1)
-                else:
-                    print(
-                        "[INFO] PGP key in OWNERS file matches with key digest in report."
-                    )
-
         print("[INFO] Report exists: ", submitted_report_path)
-        verify_signature(category, organization, chart, version)
+        checks.add(
+            "report-validity",
+            check_report_validity,
+            submitted_report_path,
+            os.environ.get("OCP_VERSION_RANGE"),
+        )
+        report_dependencies.append("report-validity")
+        checks.add(
+            "pgp-public-key",
+            check_pgp_public_key,
+            category,
+            organization,
+            chart,
+            submitted_report_path,
+            depends_on=["report-validity"],
+        )
+        checks.add(
+            "signature",
+            verify_signature,
+            category,
+            organization,
+            chart,
+            version,
+            depends_on=["report-validity"],
+        )
         report_path = submitted_report_path
         report_info_path = ""
         if report_generated and report_generated == "True":
-            match_checksum(
-                args.directory,
+            checks.add(
+                "checksum",
+                match_checksum,
                 generated_report_info_path,
                 category,
                 organization,
                 chart,
                 version,
+                depends_on=["report-validity"],
             )
         elif not web_catalog_only:
-            check_url(args.directory, report_path)
+            checks.add(
+                "chart-url", check_url, report_path, depends_on=["report-validity"]
+            )
     else:
         print("[INFO] Report does not exist: ", submitted_report_path)
         report_path = generated_report_path
@@ -573,9 +717,43 @@ def main():
     print(f"[INFO]: generated report path: {generated_report_path}")
     print(f"[INFO]: generated report info: {generated_report_info_path}")
 
-    match_name_and_version(
-        args.directory, category, organization, chart, version, generated_report_path
+    checks.add(
+        "name-and-version",
+        match_name_and_version,
+        category,
+        organization,
+        chart,
+        version,
+        generated_report_path,
+        depends_on=report_dependencies,
     )
-    check_report_success(
-        args.directory, args.api_url, report_path, report_info_path, version
+
+    # Only a report generated in this workflow from an unsigned chart tarball, with
+    # the default flags, is added to the verification cache
+    chart_path = os.path.join(
+        "charts", category, organization, chart, version, f"{chart}-{version}.tgz"
     )
+    if (
+        report_path != generated_report_path
+        or not os.path.exists(chart_path)
+        or os.path.exists(f"{chart_path}.prov")
+    ):
+        chart_path = None
+
+    checks.add(
+        "report-success",
+        verify_report,
+        args.api_url,
+        report_path,
+        report_info_path,
+        version,
+        vendor_type,
+        chart_path,
+        depends_on=report_dependencies,
+    )
+
+    findings = checks.run()
+    if findings:
+        write_findings(args.directory, findings)
+    if checks.failed:
+        sys.exit(1)
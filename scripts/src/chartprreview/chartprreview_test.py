@@ -1,7 +1,6 @@
 import os
 
-import pytest
-
+from chartprreview import chartprreview
 from chartprreview.chartprreview import (
     check_owners_file_against_directory_structure,
     verify_user,
@@ -10,8 +9,9 @@ from chartprreview.chartprreview import (
 
 
 def test_verify_user():
-    with pytest.raises(SystemExit):
-        verify_user("mbaiju", "partners", "test-org1", "test-chart")
+    findings = verify_user("mbaiju", "partners", "test-org1", "test-chart")
+    assert len(findings) == 1
+    assert findings[0].fatal
 
 
 owners_with_wrong_vendor_label = """\
@@ -69,17 +69,22 @@ def test_check_owners_file_against_directory_structure(tmpdir):
     os.chdir(tmpdir)
     new_cwd = os.getcwd()
     print("new_cwd", new_cwd)
-    with pytest.raises(SystemExit):
-        check_owners_file_against_directory_structure(
-            "partners", "test-org", "test-chart"
-        )
+    findings = check_owners_file_against_directory_structure(
+        "partners", "test-org", "test-chart"
+    )
+    assert "vendor/label" in findings[0].messages[0]
     p.write(owners_with_wrong_chart_name)
-    with pytest.raises(SystemExit):
+    findings = check_owners_file_against_directory_structure(
+        "partners", "test-org", "test-chart"
+    )
+    assert "chart/name" in findings[0].messages[0]
+    p.write(owners_with_correct_values)
+    assert (
         check_owners_file_against_directory_structure(
             "partners", "test-org", "test-chart"
         )
-    p.write(owners_with_correct_values)
-    check_owners_file_against_directory_structure("partners", "test-org", "test-chart")
+        == []
+    )
 
 
 def test_write_error_log(tmpdir):
@@ -90,3 +95,87 @@ def test_write_error_log(tmpdir):
     write_error_log(tmpdir, "First message", "Second message")
     msg = open(os.path.join(tmpdir, "errors")).read()
     assert msg == "First message\nSecond message\n"
+
+
+def test_verify_report_cache(tmpdir, monkeypatch):
+    report_path = os.path.join(tmpdir, "report.yaml")
+    with open(report_path, "w") as fd:
+        fd.write("kind: verify-report")
+    chart_path = os.path.join(tmpdir, "chart-1.0.0.tgz")
+    with open(chart_path, "wb") as fd:
+        fd.write(b"chart")
+    monkeypatch.setattr(chartprreview, "check_report_success", lambda *args: [])
+    cached = []
+    monkeypatch.setattr(
+        chartprreview, "cache_verification", lambda *args: cached.append(args)
+    )
+    monkeypatch.setattr(
+        chartprreview.verification_cache, "get_verifier_version", lambda: "1.13.0"
+    )
+
+    # A report submitted in the PR is never cached
+    assert chartprreview.verify_report("", report_path, "", "1.0.0", "partner") == []
+    assert cached == []
+
+    # A generated report is cached under the key of the tarball, whatever its content
+    chartprreview.verify_report("", report_path, "", "1.0.0", "partner", chart_path)
+    assert cached[0][0] == chartprreview.verification_cache.get_cache_key(
+        chartprreview.digest.hash_file(chart_path), "1.13.0", "partner"
+    )
+    assert cached[0][3]
+
+    # Without chart-verifier, the verification isn't cached
+    def no_verifier():
+        raise FileNotFoundError("chart-verifier")
+
+    monkeypatch.setattr(
+        chartprreview.verification_cache, "get_verifier_version", no_verifier
+    )
+    chartprreview.verify_report("", report_path, "", "1.0.0", "partner", chart_path)
+    assert len(cached) == 1
+
+
+def test_check_report_success_community_manual_review(tmpdir, monkeypatch):
+    report_path = os.path.join(tmpdir, "report.yaml")
+    with open(report_path, "w") as fd:
+        fd.write("{}")
+    outputs = {}
+    monkeypatch.setattr(chartprreview.gitutils, "add_output", outputs.__setitem__)
+    monkeypatch.setattr(chartprreview.prartifact, "get_labels", lambda api_url: [])
+    report_info = chartprreview.report_info
+    monkeypatch.setattr(
+        report_info, "get_report_chart", lambda **kwargs: {"version": "1.0.0"}
+    )
+    monkeypatch.setattr(
+        report_info,
+        "get_report_metadata",
+        lambda **kwargs: {"profileVersion": "v1.1", "vendorType": "community"},
+    )
+    monkeypatch.setattr(
+        report_info,
+        "get_report_annotations",
+        lambda **kwargs: {
+            "charts.openshift.io/lastCertifiedTimestamp": "",
+            "charts.openshift.io/testedOpenShiftVersion": "4.13",
+            "charts.openshift.io/supportedOpenShiftVersions": ">=4.12",
+            "charts.openshift.io/digest": "sha256:0",
+        },
+    )
+    monkeypatch.setattr(
+        report_info,
+        "get_report_results",
+        lambda **kwargs: {"failed": 0, "passed": 1, "message": []},
+    )
+
+    # The check fails without reporting any error
+    findings = chartprreview.check_report_success(
+        "", report_path, "", "1.0.0", "community"
+    )
+    assert outputs["community_manual_review_required"] == "True"
+    assert len(findings) == 1
+    assert findings[0].fatal
+    assert findings[0].messages == []
+
+    chartprreview.write_findings(tmpdir, findings)
+    assert not os.path.exists(os.path.join(tmpdir, "errors"))
+    assert os.path.exists(os.path.join(tmpdir, chartprreview.FINDINGS_FILE))
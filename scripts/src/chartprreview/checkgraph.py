@@ -0,0 +1,137 @@
+"""Execution of the checks of chart-pr-review.
+
+A CheckGraph holds checks, each with the checks it depends on. Independent checks run
+concurrently on a thread pool, and a check only starts once its dependencies have
+passed. The wall-clock time of a review is then the one of its longest chain of checks.
+
+A check returns the problems it finds as a list of Finding. A check fails if one of its
+findings is fatal, or if it raises. It doesn't stop the other checks: every check whose
+dependencies have passed is run, so that a pull request gets all its problems reported
+at once. The findings are returned in the order in which the checks were added, for the
+caller to write them to the errors file in one pass.
+
+Checks can also report problems with chartprreview.write_error_log or
+report_info.write_error_log: the error logs of a check are captured with
+tools.errorlog, and become findings of the check. A check can fail with sys.exit.
+"""
+
+import sys
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+sys.path.append("../")
+from tools import errorlog
+
+
+@dataclass
+class Finding:
+    """Problem found by a check.
+
+    Attributes:
+        messages (list[str]): Lines reported in the errors file
+        fatal (bool): Whether the problem fails the review. Other findings, such as
+                      warnings, are only reported. A fatal finding without messages
+                      fails the review without reporting an error.
+        check (str): Name of the check, set by CheckGraph
+    """
+
+    messages: list = field(default_factory=list)
+    fatal: bool = True
+    check: str = ""
+
+    def to_dict(self):
+        return {"check": self.check, "fatal": self.fatal, "messages": self.messages}
+
+
+class _Check:
+    def __init__(self, name, func, args, depends_on):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.depends_on = depends_on
+        self.findings = []
+        self.failed = False
+        self.skipped = False
+
+
+class CheckGraph:
+    """Checks of a pull request and their dependencies.
+
+    Args:
+        max_workers (int): Maximum number of checks running concurrently
+    """
+
+    def __init__(self, max_workers=None):
+        self._max_workers = max_workers
+        self._checks = {}
+
+    def add(self, name, func, *args, depends_on=()):
+        """Add a check, run as func(*args).
+
+        Args:
+            name (str): Name of the check
+            func (function): The check, returning a list of Finding or None
+            depends_on (list of str): Names of the checks that must pass before this
+                                      one runs. They must have been added already.
+        """
+        if name in self._checks:
+            raise ValueError(f"Check {name} was already added")
+        for dependency in depends_on:
+            if dependency not in self._checks:
+                raise ValueError(f"Check {name} depends on unknown check {dependency}")
+        self._checks[name] = _Check(name, func, args, tuple(depends_on))
+
+    @property
+    def failed(self):
+        """Whether a check failed, once the graph has run."""
+        return any(check.failed for check in self._checks.values())
+
+    def _run_check(self, check, dependencies):
+        for dependency in dependencies:
+            dependency.result()
+        if any(
+            self._checks[name].failed or self._checks[name].skipped
+            for name in check.depends_on
+        ):
+            print(f"[INFO] Skip check {check.name}, a check it depends on failed")
+            check.skipped = True
+            return
+
+        with errorlog.capture() as error_logs:
+            try:
+                findings = check.func(*check.args) or []
+            except SystemExit:
+                findings = []
+                check.failed = True
+            except Exception as err:
+                traceback.print_exc()
+                findings = [Finding([f"[ERROR] {err}"])]
+
+        check.findings = [
+            Finding(messages, fatal=check.failed) for messages in error_logs
+        ] + findings
+        for finding in check.findings:
+            finding.check = check.name
+        check.failed = check.failed or any(f.fatal for f in check.findings)
+
+    def run(self):
+        """Run all the checks whose dependencies pass.
+
+        Returns:
+            list[Finding]: The findings of all the checks, in the order in which the
+                           checks were added
+        """
+        futures = {}
+        # Checks are submitted after their dependencies, and the executor starts them
+        # in submission order: a check waiting on a dependency never blocks it.
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            for check in self._checks.values():
+                dependencies = [futures[name] for name in check.depends_on]
+                futures[check.name] = executor.submit(
+                    self._run_check, check, dependencies
+                )
+
+        return [
+            finding for check in self._checks.values() for finding in check.findings
+        ]
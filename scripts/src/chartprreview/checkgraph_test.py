@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+
+from chartprreview import checkgraph
+from tools import errorlog
+
+
+def fail(msg, delay=0):
+    time.sleep(delay)
+    return [checkgraph.Finding([msg])]
+
+
+def exit_with_error_log(msg):
+    """Like a helper calling chartprreview.write_error_log and sys.exit"""
+    assert errorlog.record(msg)
+    raise SystemExit(1)
+
+
+def test_independent_checks_run_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+    checks = checkgraph.CheckGraph()
+    checks.add("first", barrier.wait)
+    checks.add("second", barrier.wait)
+    assert checks.run() == []
+    assert not checks.failed
+
+
+def test_dependencies():
+    calls = []
+    checks = checkgraph.CheckGraph(max_workers=1)
+    checks.add("first", lambda: time.sleep(0.1) or calls.append("first"))
+    checks.add("second", calls.append, "second", depends_on=["first"])
+    checks.run()
+    assert calls == ["first", "second"]
+
+    with pytest.raises(ValueError):
+        checks.add("third", calls.append, "third", depends_on=["unknown"])
+
+
+def test_all_findings_in_order():
+    calls = []
+    checks = checkgraph.CheckGraph()
+    checks.add("warning", lambda: [checkgraph.Finding(["[WARNING] w"], fatal=False)])
+    checks.add("slow", fail, "[ERROR] slow", 0.2)
+    checks.add("fast", fail, "[ERROR] fast")
+    checks.add("exit", exit_with_error_log, "[ERROR] exit")
+    checks.add("raise", lambda: 1 / 0)
+    checks.add("dependent", calls.append, "dependent", depends_on=["slow"])
+    checks.add("independent", calls.append, "independent")
+
+    findings = checks.run()
+    assert checks.failed
+    assert [(f.check, f.fatal) for f in findings] == [
+        ("warning", False),
+        ("slow", True),
+        ("fast", True),
+        ("exit", True),
+        ("raise", True),
+    ]
+    assert findings[3].messages == ["[ERROR] exit"]
+    assert findings[4].to_dict()["messages"] == ["[ERROR] division by zero"]
+    assert calls == ["independent"]
+
+
+def test_warnings_only():
+    checks = checkgraph.CheckGraph()
+    checks.add("warning", lambda: [checkgraph.Finding(["[WARNING] w"], fatal=False)])
+    checks.add("dependent", lambda: None, depends_on=["warning"])
+    assert len(checks.run()) == 1
+    assert not checks.failed
+
+
+def test_error_log_outside_graph():
+    assert not errorlog.record("message")
@@ -0,0 +1,296 @@
+"""Prepare the releases and index entries of many charts at once.
+
+chart-repo-manager prepares the release of the one chart version submitted by a PR.
+This module runs the same preparation, see chartrepomanager.prepare_release, for
+every charts/<category>/<organization>/<chart>/<version> directory of the repository,
+or only for the ones under given paths or changed since a given git ref, e.g. to
+rebuild the releases after a change of the annotations policy.
+
+Releases are prepared across a pool of processes. The artifacts of each release are
+placed in its own directory, named after the release tag, under the output directory.
+One JSON line is written per prepared release on the standard output, in the order
+of the release paths, in the manifest format read by "update-index --manifest". Each
+line also holds the directory of the release. The releases that failed are left out
+of the manifest.
+
+The range of OCP versions of a release is derived from the kubeVersion of the chart
+in its report, like in revalidate-reports, unless a range is forced with
+--ocp-version-range.
+
+The logs of the releases are written on the standard error.
+"""
+
+import argparse
+import concurrent.futures
+import contextlib
+import functools
+import glob
+import json
+import os
+import sys
+
+from git import Repo
+
+sys.path.append("../")
+from chartrepomanager import chartrepomanager
+from owners import owners_file
+from report import revalidate, verifier_report
+from tools import artifactstore
+
+RELEASE_GLOB = os.path.join("charts", "*", "*", "*", "*")
+
+
+def _is_under(path, directory):
+    return path == directory or path.startswith(f"{directory}/")
+
+
+def find_releases(directory, paths=None, changed_since=None):
+    """Find the chart versions of the repository.
+
+    Args:
+        directory (str): Root of the repository
+        paths (list[str]): If set, only return the chart versions under these paths,
+                           relative to directory, e.g. charts/redhat
+        changed_since (str): If set, only return the chart versions with files changed
+                             since this git ref, including uncommitted changes
+
+    Returns:
+        list[str]: Sorted paths of the chart versions, relative to directory
+    """
+    releases = [
+        release
+        for release in glob.glob(RELEASE_GLOB, root_dir=directory)
+        if os.path.isdir(os.path.join(directory, release))
+    ]
+    if paths:
+        paths = [os.path.normpath(path) for path in paths]
+        releases = [
+            release
+            for release in releases
+            if any(_is_under(release, path) for path in paths)
+        ]
+    if changed_since:
+        diff = Repo(directory).git.diff("--name-only", changed_since, "--", "charts")
+        changed = diff.splitlines()
+        releases = [
+            release
+            for release in releases
+            if any(_is_under(path, release) for path in changed)
+        ]
+    return sorted(releases)
+
+
+@contextlib.contextmanager
+def _release_directory(directory, release_dir):
+    """Run in the directory of a release, where the charts of the repository are
+    available under charts/ like in its root directory."""
+    os.makedirs(release_dir, exist_ok=True)
+    charts_link = os.path.join(release_dir, "charts")
+    if not os.path.lexists(charts_link):
+        os.symlink(os.path.abspath(os.path.join(directory, "charts")), charts_link)
+
+    cwd = os.getcwd()
+    os.chdir(release_dir)
+    try:
+        yield
+    finally:
+        os.chdir(cwd)
+
+
+def _get_ocp_version_range(report_path):
+    is_valid_yaml, report_data = verifier_report.get_report_data(report_path)
+    if not is_valid_yaml:
+        raise ValueError(f"Report is not valid yaml: {report_path}")
+    try:
+        kube_version = revalidate.get_kube_version(report_data)
+    except ValueError as err:
+        raise ValueError(f"Report is malformed: {report_path}: {err}") from err
+    return revalidate.get_ocp_version_range(kube_version) if kube_version else "N/A"
+
+
+def release_chart(directory, output_dir, repository, release, ocp_version_range=None):
+    """Prepare the release of one chart version.
+
+    Args:
+        directory (str): Root of the repository
+        output_dir (str): Directory where to place the directory of the release
+        repository (str): Name of the git Repository
+        release (str): Path to the chart version, relative to directory
+        ocp_version_range (str): Range of supported OCP versions. Defaults to the range
+                                 derived from the kubeVersion of the chart.
+
+    Returns:
+        dict: The manifest line of the release, or its "error" if it failed
+    """
+    _, category, organization, chart, version = release.split("/")
+    release_tag = f"{organization}-{chart}-{version}"
+    release_dir = os.path.abspath(os.path.join(output_dir, release_tag))
+    result = {"release": release, "entry_name": chart, "version": version}
+
+    # Keep the standard output for the JSONL results
+    with contextlib.redirect_stdout(sys.stderr), _release_directory(
+        directory, release_dir
+    ):
+        try:
+            report_exists, report_path = chartrepomanager.check_report_exists(
+                category, organization, chart, version
+            )
+            if not report_exists:
+                raise ValueError(f"No report found: {report_path}")
+            if ocp_version_range is None:
+                ocp_version_range = _get_ocp_version_range(report_path)
+
+            owners_path = os.path.join(
+                "charts", category, organization, chart, "OWNERS"
+            )
+            web_catalog_only = owners_file.get_web_catalog_only(
+                owners_file.get_owner_data_from_file(owners_path)
+            )
+            chart_file_name = f"{chart}-{version}.tgz"
+            signed_chart = os.path.exists(
+                os.path.join(os.path.dirname(report_path), f"{chart_file_name}.prov")
+            )
+
+            chart_entry, chart_url, public_key_file = chartrepomanager.prepare_release(
+                repository,
+                category,
+                organization,
+                chart,
+                version,
+                ocp_version_range,
+                report_path,
+                signed_chart,
+                artifactstore.ArtifactStore(namespace=release_tag),
+            )
+        except Exception as err:
+            print(f"[ERROR] Failed to prepare the release of {release}: {err}")
+            result["error"] = str(err)
+            return result
+
+    result["chart_url"] = chart_url
+    result["chart_entry"] = chartrepomanager.encode_chart_entry(chart_entry)
+    result["web_catalog_only"] = web_catalog_only
+    result["release_dir"] = release_dir
+    if public_key_file:
+        result["public_key_file"] = os.path.join(release_dir, public_key_file)
+    return result
+
+
+def release_charts(
+    directory,
+    output_dir,
+    repository,
+    releases,
+    ocp_version_range=None,
+    max_workers=None,
+):
+    """Prepare the releases of chart versions across a pool of processes.
+
+    Args:
+        directory (str): Root of the repository
+        output_dir (str): Directory where to place the directories of the releases
+        repository (str): Name of the git Repository
+        releases (list[str]): Paths to the chart versions, relative to directory
+        ocp_version_range (str): See release_chart
+        max_workers (int): Number of processes, defaults to the number of CPUs
+
+    Yields:
+        dict: The manifest line of each release, in the order of releases
+    """
+    release = functools.partial(
+        release_chart,
+        directory,
+        output_dir,
+        repository,
+        ocp_version_range=ocp_version_range,
+    )
+    max_workers = max_workers or os.cpu_count() or 1
+    # Large chunks amortize the transfers between processes, while still leaving a
+    # few chunks per process to balance the load
+    chunksize = max(1, len(releases) // (4 * max_workers))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        yield from executor.map(release, releases, chunksize=chunksize)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Prepare the releases and index entries of many chart versions"
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        help="Only prepare the chart versions under these paths, relative to the "
+        "root directory, e.g. charts/redhat",
+    )
+    parser.add_argument(
+        "-d",
+        "--directory",
+        dest="directory",
+        type=str,
+        default=".",
+        help="Root directory of the repository",
+    )
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        dest="output_dir",
+        type=str,
+        required=True,
+        help="Directory where to place the artifacts of each release",
+    )
+    parser.add_argument(
+        "-r",
+        "--repository",
+        dest="repository",
+        type=str,
+        required=True,
+        help="Git Repository",
+    )
+    parser.add_argument(
+        "--changed-since",
+        dest="changed_since",
+        type=str,
+        default=None,
+        help="Only prepare the chart versions changed since this git ref",
+    )
+    parser.add_argument(
+        "--ocp-version-range",
+        dest="ocp_version_range",
+        type=str,
+        default=None,
+        help="Range of supported OCP versions of all the chart versions, instead of "
+        "the range derived from the kubeVersion of each chart",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        dest="jobs",
+        type=int,
+        default=None,
+        help="Number of processes, defaults to the number of CPUs",
+    )
+    args = parser.parse_args()
+
+    releases = find_releases(args.directory, args.paths, args.changed_since)
+    print(f"[INFO] Preparing {len(releases)} releases", file=sys.stderr)
+
+    failed = 0
+    for result in release_charts(
+        args.directory,
+        args.output_dir,
+        args.repository,
+        releases,
+        args.ocp_version_range,
+        args.jobs,
+    ):
+        if "error" in result:
+            failed += 1
+        else:
+            print(json.dumps(result), flush=True)
+
+    print(
+        f"[INFO] {len(releases) - failed} releases prepared, {failed} failed",
+        file=sys.stderr,
+    )
+    if failed:
+        sys.exit(1)
@@ -0,0 +1,105 @@
+"""Unit tests for the bulk preparation of the chart releases
+
+The repository is a temporary git repository holding the vault 0.17.0 tarball and
+report of tests/data, and a chart version without report, which fails.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import shutil
+
+import pytest
+from git import Repo
+
+from chartrepomanager import bulkrelease
+from tools import artifactstore
+
+TESTS_DATA_DIR = os.path.join(os.path.dirname(__file__), "../../../tests/data")
+
+vault_release = "charts/partners/hashicorp/vault/0.17.0"
+missing_report_release = "charts/partners/acme/awesome/0.1.0"
+
+
+@pytest.fixture
+def repository(tmp_path, monkeypatch):
+    monkeypatch.setenv(artifactstore.ARTIFACT_STORE_DIR_ENV, str(tmp_path / "store"))
+
+    repo_dir = tmp_path / "repo"
+    os.makedirs(repo_dir / vault_release)
+    shutil.copy(
+        os.path.join(TESTS_DATA_DIR, "vault-0.17.0.tgz"), repo_dir / vault_release
+    )
+    shutil.copy(
+        os.path.join(TESTS_DATA_DIR, "common/partner/report.yaml"),
+        repo_dir / vault_release / "report.yaml",
+    )
+    (repo_dir / vault_release / "../OWNERS").write_text(
+        "chart:\n  name: vault\nvendor:\n  name: HashiCorp\n"
+    )
+    os.makedirs(repo_dir / missing_report_release)
+    (repo_dir / missing_report_release / "awesome-0.1.0.tgz").write_bytes(b"")
+
+    repo = Repo.init(repo_dir)
+    repo.config_writer().set_value("user", "name", "test").release()
+    repo.config_writer().set_value("user", "email", "test@example.com").release()
+    repo.git.add("charts")
+    repo.git.commit("-m", "Add charts")
+    return str(repo_dir)
+
+
+def test_find_releases(repository):
+    assert bulkrelease.find_releases(repository) == [
+        missing_report_release,
+        vault_release,
+    ]
+    assert bulkrelease.find_releases(repository, ["charts/partners/hashicorp/"]) == [
+        vault_release
+    ]
+    assert bulkrelease.find_releases(repository, ["charts/partners/acme/awe"]) == []
+    assert bulkrelease.find_releases(repository, changed_since="HEAD") == []
+
+    with open(os.path.join(repository, vault_release, "report.yaml"), "a") as fd:
+        fd.write("\n")
+    assert bulkrelease.find_releases(repository, changed_since="HEAD") == [
+        vault_release
+    ]
+
+
+def test_release_charts(repository, tmp_path):
+    output_dir = tmp_path / "output"
+    results = list(
+        bulkrelease.release_charts(
+            repository,
+            str(output_dir),
+            "acme/charts",
+            [missing_report_release, vault_release],
+            ocp_version_range=">=4.2",
+            max_workers=2,
+        )
+    )
+
+    assert results[0]["release"] == missing_report_release
+    assert "No report found" in results[0]["error"]
+
+    result = results[1]
+    release_dir = output_dir / "hashicorp-vault-0.17.0"
+    assert "error" not in result
+    assert result["entry_name"] == "vault"
+    assert result["version"] == "0.17.0"
+    assert result["chart_url"] == (
+        "https://github.com/acme/charts/releases/download/"
+        "hashicorp-vault-0.17.0/vault-0.17.0.tgz"
+    )
+    assert not result["web_catalog_only"]
+    assert result["release_dir"] == str(release_dir)
+
+    chart_entry = json.loads(base64.b64decode(result["chart_entry"]))
+    annotations = chart_entry["annotations"]
+    assert annotations["charts.openshift.io/providerType"] == "partner"
+    assert annotations["charts.openshift.io/provider"] == "HashiCorp"
+
+    package = release_dir / ".cr-release-packages" / "vault-0.17.0.tgz"
+    assert chart_entry["digest"] == hashlib.sha256(package.read_bytes()).hexdigest()
+    assert (release_dir / "report.yaml").exists()
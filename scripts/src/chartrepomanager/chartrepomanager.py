@@ -27,7 +27,6 @@ import re
 import shutil
 import subprocess
 import sys
-import tempfile
 import time
 import urllib.parse
 
@@ -35,22 +34,21 @@ import yaml
 from environs import Env
 
 try:
-    from yaml import CDumper as Dumper
     from yaml import CSafeLoader as SafeLoader
 except ImportError:
-    from yaml import Dumper, SafeLoader
+    from yaml import SafeLoader
 
 sys.path.append("../")
 from pullrequest import prartifact
 from reporegex import matchers
 from report import report_info
 from signedchart import signedchart
-from tools import gitutils
+from tools import artifactstore, chartarchive, gitutils
 
 from chartrepomanager import indexannotations
 
 
-def _encode_chart_entry(chart_entry):
+def encode_chart_entry(chart_entry):
     """Encode the chart_entry to base64. This is needed to pass it as an argument to
     the update index step.
 
@@ -157,15 +155,21 @@ def generate_report():
 def prepare_chart_source_for_release(category, organization, chart, version):
     """Create an archive file of the Chart for the GitHub release.
 
-    When the PR contains the chart's source, we package it using "helm package" and
-    place the archive file in the ".cr-release-packages" directory. This directory will
-    contain all assets that should be uploaded as a GitHub Release.
+    When the PR contains the chart's source, we package it using "helm package". The
+    archive is added to the artifact store once its annotations are updated, see
+    update_chart_annotation.
+
+    The archive is normalized so that it only depends on the chart's source: packaging
+    the same source again produces the same bytes, and thus the same digest.
 
     Args:
         category (str): Type of profile (community, partners, or redhat)
         organization (str): Name of the organization (ex: hashicorp)
         chart (str): Name of the chart (ex: vault)
         version (str): The version of the chart (ex: 1.4.0)
+
+    Returns:
+        str: Path to the archive file
     """
     print(
         "[INFO] prepare chart source for release. %s, %s, %s, %s"
@@ -176,20 +180,19 @@ def prepare_chart_source_for_release(category, organization, chart, version):
     print(out.stdout.decode("utf-8"))
     print(out.stderr.decode("utf-8"))
     chart_file_name = f"{chart}-{version}.tgz"
-    try:
-        os.remove(os.path.join(".cr-release-packages", chart_file_name))
-    except FileNotFoundError:
-        pass
-    shutil.copy(f"{chart}-{version}.tgz", f".cr-release-packages/{chart_file_name}")
+    chartarchive.normalize_package(chart_file_name, chart_file_name)
+    return chart_file_name
 
 
 def prepare_chart_tarball_for_release(
-    category, organization, chart, version, signed_chart
+    category, organization, chart, version, signed_chart, store
 ):
-    """Move the provided tarball (and signing key if needed) to the release directory
+    """Prepare the provided tarball (and signing key if needed) for the release
 
-    The tarball is moved to the ".cr-release-packages" directory. If the archive has
-    been signed with "helm package --sign", the provenance file is also included.
+    The tarball is added to the artifact store once its annotations are updated, see
+    update_chart_annotation. If the archive has been signed with "helm package --sign",
+    the provenance file is added to the store and linked in the ".cr-release-packages"
+    directory.
 
     Args:
         category (str): Type of profile (community, partners, or redhat)
@@ -197,9 +200,11 @@ def prepare_chart_tarball_for_release(
         chart (str): Name of the chart (ex: vault)
         version (str): The version of the chart (ex: 1.4.0)
         signed_chart (bool): Set to True if the tarball chart is signed.
+        store (ArtifactStore): Store of the release artifacts
 
     Returns:
-        str: Path to the public key file used to sign the tarball
+        (str, str): Path to the provided tarball, and path to the public key file used
+                    to sign the tarball
     """
     print(
         "[INFO] prepare chart tarball for release. %s, %s, %s, %s"
@@ -210,31 +215,17 @@ def prepare_chart_tarball_for_release(
     path = os.path.join(
         "charts", category, organization, chart, version, chart_file_name
     )
-    try:
-        os.remove(os.path.join(".cr-release-packages", chart_file_name))
-    except FileNotFoundError:
-        pass
-    shutil.copy(path, f".cr-release-packages/{chart_file_name}")
-    shutil.copy(path, chart_file_name)
 
     if signed_chart:
         print("[INFO] Signed chart - include PROV file")
         prov_file_name = f"{chart_file_name}.prov"
-        path = os.path.join(
+        prov_path = os.path.join(
             "charts", category, organization, chart, version, prov_file_name
         )
-        try:
-            os.remove(os.path.join(".cr-release-packages", prov_file_name))
-        except FileNotFoundError:
-            pass
-        shutil.copy(path, f".cr-release-packages/{prov_file_name}")
-        shutil.copy(path, prov_file_name)
-        gitutils.add_output(
-            "prov_file_name",
-            os.path.join(os.getcwd(), ".cr-release-packages", prov_file_name),
-        )
-        return get_key_file(category, organization, chart, version)
-    return ""
+        store.add(prov_file_name, prov_path)
+        store.link(prov_file_name, ".cr-release-packages")
+        return path, get_key_file(category, organization, chart, version)
+    return path, ""
 
 
 def get_key_file(category, organization, chart, version):
@@ -248,32 +239,29 @@ def get_key_file(category, organization, chart, version):
     return ""
 
 
-def create_index_from_chart(chart_file_name):
+def create_index_from_chart(chart_file_name, store):
     """Prepare the index entry for this chart
 
     Given that a chart tarball could be created (i.e. the user provided either the
-    chart's source or tarball), the content of Chart.yaml is used for the index entry.
+    chart's source or tarball), the Chart.yaml of the tarball is used for the index
+    entry. It is read from the tarball directly, keeping only the non-empty fields known
+    to Helm, see chartarchive.get_chart_metadata. The digest of the tarball is the one
+    recorded in the artifact store, the tarball isn't hashed again.
 
     Args:
         chart_file_name (str): Name of the chart's archive
+        store (ArtifactStore): Store of the release artifacts
 
     Returns:
-        dict: content of Chart.yaml, to be used as index entry.
+        dict: content of Chart.yaml and digest of the archive, to be used as index
+              entry.
     """
     print("[INFO] create index from chart. %s" % (chart_file_name))
-    out = subprocess.run(
-        [
-            "helm",
-            "show",
-            "chart",
-            os.path.join(".cr-release-packages", chart_file_name),
-        ],
-        capture_output=True,
-    )
-    p = out.stdout.decode("utf-8")
-    print(p)
-    print(out.stderr.decode("utf-8"))
-    crt = yaml.load(p, Loader=SafeLoader)
+    package_digest = store.get_digest(chart_file_name)
+    chart_yaml = chartarchive.get_chart_yaml(store.blob_path(package_digest))
+    crt = chartarchive.get_chart_metadata(chart_yaml)
+    print(yaml.dump(crt))
+    crt["digest"] = package_digest
     return crt
 
 
@@ -333,10 +321,19 @@ def create_index_from_report(category, ocp_version_range, report_path):
 
 
 def update_chart_annotation(
-    category, organization, chart_file_name, chart, ocp_version_range, report_path
+    category,
+    organization,
+    chart_file_name,
+    chart,
+    ocp_version_range,
+    report_path,
+    chart_path,
+    store,
 ):
-    """Untar the helm release that was placed under .cr-release-packages, update the
-    chart's annotations, and repackage the Helm release.
+    """Update the chart's annotations in the Chart.yaml of the helm release, add the
+    result to the artifact store and link it under .cr-release-packages. The release
+    is rewritten in a single streaming pass, see chartarchive.rewrite_chart_yaml, and
+    written to the store only once.
 
     In particular, following manipulations are performed on annotations:
     * Gets the dict of annotations from the report file.
@@ -354,13 +351,13 @@ def update_chart_annotation(
         chart (str): Name of the chart (ex: vault)
         ocp_version_range (str): Range of supported OCP versions
         report_path (str): Path to the report.yaml file
+        chart_path (str): Path to the chart's archive, as packaged or provided
+        store (ArtifactStore): Store of the release artifacts
     """
     print(
         "[INFO] Update chart annotation. %s, %s, %s, %s, %s"
         % (category, organization, chart_file_name, chart, ocp_version_range)
     )
-    dr = tempfile.mkdtemp(prefix="annotations-")
-
     annotations = indexannotations.getIndexAnnotations(ocp_version_range, report_path)
 
     print("category:", category)
@@ -380,47 +377,105 @@ def update_chart_annotation(
         vendor_name = out["vendor"]["name"]
         annotations["charts.openshift.io/provider"] = vendor_name
 
-    out = subprocess.run(
-        [
-            "tar",
-            "zxvf",
-            os.path.join(".cr-release-packages", f"{chart_file_name}"),
-            "-C",
-            dr,
-        ],
-        capture_output=True,
-    )
-    print(out.stdout.decode("utf-8"))
-    print(out.stderr.decode("utf-8"))
+    def update(data):
+        if "annotations" not in data:
+            data["annotations"] = annotations
+        else:
+            # merge the existing annotations with our new ones, overwriting
+            # values for overlapping keys with our own.
+            # Overwriting is important because the chart may contain values that we
+            # must override, such as the providerType which changes in redhat-to-community cases.
+            # |= syntax requires py3.9
+            data["annotations"] |= annotations
+        return data
+
+    new_path = store.new_path(chart_file_name)
+    chartarchive.rewrite_chart_yaml(chart_path, new_path, update)
+    store.add(chart_file_name, new_path, move=True)
+    store.link(chart_file_name, ".cr-release-packages")
+
+
+def prepare_release(
+    repository,
+    category,
+    organization,
+    chart,
+    version,
+    ocp_version_range,
+    report_path,
+    signed_chart=False,
+    store=None,
+):
+    """Prepare the artifacts of a chart release and its index entry.
 
-    fd = open(os.path.join(dr, chart, "Chart.yaml"))
-    data = yaml.load(fd, Loader=SafeLoader)
+    The artifacts are placed in the working directory: the report is copied to
+    report.yaml, and if the chart's source or tarball was provided, the annotated
+    archive is added to the artifact store and linked under ".cr-release-packages".
 
-    if "annotations" not in data:
-        data["annotations"] = annotations
-    else:
-        # merge the existing annotations with our new ones, overwriting
-        # values for overlapping keys with our own.
-        # Overwriting is important because the chart may contain values that we
-        # must override, such as the providerType which changes in redhat-to-community cases.
-        # |= syntax requires py3.9
-        data["annotations"] |= annotations
-    out = yaml.dump(data, Dumper=Dumper)
-    with open(os.path.join(dr, chart, "Chart.yaml"), "w") as fd:
-        fd.write(out)
-
-    out = subprocess.run(
-        ["helm", "package", os.path.join(dr, chart)], capture_output=True
+    Args:
+        repository (str): Name of the git Repository
+        category (str): Type of profile (community, partners, or redhat)
+        organization (str): Name of the organization (ex: hashicorp)
+        chart (str): Name of the chart (ex: vault)
+        version (str): The version of the chart (ex: 1.4.0)
+        ocp_version_range (str): Range of supported OCP versions
+        report_path (str): Path to the report.yaml file, submitted or generated
+        signed_chart (bool): Set to True if the provided tarball is signed.
+        store (ArtifactStore): Store of the release artifacts, defaults to the store
+                               of the cache directory
+
+    Returns:
+        (dict, str, str): The index entry, the URL of the chart, and the path to the
+                          public key file used to sign the chart, if any
+    """
+    chart_source_exists, chart_tarball_exists = check_chart_source_or_tarball_exists(
+        category, organization, chart, version
     )
-    print(out.stdout.decode("utf-8"))
-    print(out.stderr.decode("utf-8"))
+    if not os.path.exists("report.yaml") or not os.path.samefile(
+        report_path, "report.yaml"
+    ):
+        shutil.copy(report_path, "report.yaml")
+
+    public_key_file = ""
+    if chart_source_exists or chart_tarball_exists:
+        store = store or artifactstore.ArtifactStore()
+        if chart_source_exists:
+            chart_path = prepare_chart_source_for_release(
+                category, organization, chart, version
+            )
+        if chart_tarball_exists:
+            chart_path, public_key_file = prepare_chart_tarball_for_release(
+                category, organization, chart, version, signed_chart, store
+            )
+
+        chart_file_name = f"{chart}-{version}.tgz"
+        print("[INFO] Updating chart annotation")
+        update_chart_annotation(
+            category,
+            organization,
+            chart_file_name,
+            chart,
+            ocp_version_range,
+            report_path,
+            chart_path,
+            store,
+        )
+        if chart_source_exists:
+            # Only the package in the store has the new annotations
+            os.remove(chart_path)
 
-    try:
-        os.remove(os.path.join(".cr-release-packages", chart_file_name))
-    except FileNotFoundError:
-        pass
+        chart_url = f"https://github.com/{repository}/releases/download/{organization}-{chart}-{version}/{chart_file_name}"
+        print("[INFO] Creating index from chart")
+        chart_entry = create_index_from_chart(chart_file_name, store)
+    else:
+        print(f"[INFO] Report only PR: {report_path}")
+        if signedchart.check_report_for_signed_chart(report_path):
+            public_key_file = get_key_file(category, organization, chart, version)
+        print("[INFO] Creating index from report")
+        chart_url = report_info.get_report_chart_url(report_path)
+        chart_entry = create_index_from_report(category, ocp_version_range, report_path)
 
-    shutil.move(chart_file_name, ".cr-release-packages")
+    return chart_entry, chart_url, public_key_file
 
 
 def main():
@@ -453,57 +508,37 @@ def main():
 
     print(f"[INFO] webCatalogOnly/providerDelivery is {web_catalog_only}")
 
-    public_key_file = ""
     print("[INFO] Report Content : ", os.environ.get("REPORT_CONTENT"))
-    if chart_source_exists or chart_tarball_exists:
-        if chart_source_exists:
-            prepare_chart_source_for_release(category, organization, chart, version)
-        if chart_tarball_exists:
-            signed_chart = signedchart.is_chart_signed(args.api_url, "")
-            public_key_file = prepare_chart_tarball_for_release(
-                category, organization, chart, version, signed_chart
-            )
+    print("[INFO] Check if report exist as part of the commit")
+    report_exists, report_path = check_report_exists(
+        category, organization, chart, version
+    )
+    if not report_exists and (chart_source_exists or chart_tarball_exists):
+        print("[INFO] Generate report")
+        report_path = generate_report()
 
+    signed_chart = chart_tarball_exists and signedchart.is_chart_signed(
+        args.api_url, ""
+    )
+    chart_entry, chart_url, public_key_file = prepare_release(
+        args.repository,
+        category,
+        organization,
+        chart,
+        version,
+        ocp_version_range,
+        report_path,
+        signed_chart,
+    )
+
+    if chart_source_exists or chart_tarball_exists:
         chart_file_name = f"{chart}-{version}.tgz"
         tarball_path = os.path.join(
             os.getcwd(), ".cr-release-packages", chart_file_name
         )
         gitutils.add_output("path_to_chart_tarball", tarball_path)
-
-        print("[INFO] Check if report exist as part of the commit")
-        report_exists, report_path = check_report_exists(
-            category, organization, chart, version
-        )
-
-        if report_exists:
-            shutil.copy(report_path, "report.yaml")
-        else:
-            print("[INFO] Generate report")
-            report_path = generate_report()
-
-        print("[INFO] Updating chart annotation")
-        update_chart_annotation(
-            category,
-            organization,
-            chart_file_name,
-            chart,
-            ocp_version_range,
-            report_path,
-        )
-        chart_url = f"https://github.com/{args.repository}/releases/download/{organization}-{chart}-{version}/{chart_file_name}"
-        print("[INFO] Creating index from chart")
-        chart_entry = create_index_from_chart(chart_file_name)
-    else:
-        report_path = os.path.join(
-            "charts", category, organization, chart, version, "report.yaml"
-        )
-        print(f"[INFO] Report only PR: {report_path}")
-        shutil.copy(report_path, "report.yaml")
-        if signedchart.check_report_for_signed_chart(report_path):
-            public_key_file = get_key_file(category, organization, chart, version)
-        print("[INFO] Creating index from report")
-        chart_url = report_info.get_report_chart_url(report_path)
-        chart_entry = create_index_from_report(category, ocp_version_range, report_path)
+        if signed_chart:
+            gitutils.add_output("prov_file_name", f"{tarball_path}.prov")
 
     if not web_catalog_only:
         current_dir = os.getcwd()
@@ -512,7 +547,7 @@ def main():
             print(f"[INFO] Add key file for release : {current_dir}/{public_key_file}")
             gitutils.add_output("public_key_file", f"{current_dir}/{public_key_file}")
 
-    gitutils.add_output("chart_entry", _encode_chart_entry(chart_entry))
+    gitutils.add_output("chart_entry", encode_chart_entry(chart_entry))
     gitutils.add_output("chart_url", chart_url)
     gitutils.add_output("version", version)
 
@@ -1,9 +1,8 @@
 import sys
 
-import semantic_version
-
 sys.path.append("../")
 from report import report_info
+from tools import versions
 
 
 def getIndexAnnotations(ocp_version_range, report_path):
@@ -29,8 +28,8 @@ def getIndexAnnotations(ocp_version_range, report_path):
     for annotation in annotations:
         if annotation == "charts.openshift.io/certifiedOpenShiftVersions":
             full_version = annotations[annotation]
-            if full_version != "N/A" and semantic_version.validate(full_version):
-                ver = semantic_version.Version(full_version)
+            if full_version != "N/A" and versions.is_valid(full_version):
+                ver = versions.parse(full_version)
                 set_annotations["charts.openshift.io/testedOpenShiftVersion"] = (
                     f"{ver.major}.{ver.minor}"
                 )
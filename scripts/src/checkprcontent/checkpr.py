@@ -5,20 +5,14 @@ import re
 import sys
 
 import requests
-import semver
-import yaml
 from reporegex import matchers
 
-try:
-    from yaml import CLoader as Loader
-except ImportError:
-    from yaml import Loader
-
 sys.path.append("../")
+from indexfile import fetch
 from owners import owners_file
 from pullrequest import prartifact
 from report import verifier_report
-from tools import gitutils
+from tools import gitutils, versions
 
 ALLOW_CI_CHANGES = "allow/ci-changes"
 
@@ -200,7 +194,7 @@ def ensure_only_chart_is_modified(api_url, repository, branch):
         gitutils.add_output("organization", organization)
         gitutils.add_output("chart-name", chart)
 
-        if not semver.VersionInfo.is_valid(version):
+        if not versions.is_valid(version):
             msg = (
                 f"[ERROR] Helm chart version is not a valid semantic version: {version}"
             )
@@ -223,24 +217,15 @@ def ensure_only_chart_is_modified(api_url, repository, branch):
 
         # Check the index.yaml for the existence of this chart at this version.
         print("Downloading index.yaml", category, organization, chart, version)
-        r = requests.get(
-            f"https://raw.githubusercontent.com/{repository}/{branch}/index.yaml"
-        )
-
-        if r.status_code == 200:
-            data = yaml.load(r.text, Loader=Loader)
-        else:
-            data = {"apiVersion": "v1", "entries": {}}
+        index = fetch.fetch_repository_index(repository, branch)
 
         entry_name = chart
-        d = data["entries"].get(entry_name, [])
         gitutils.add_output("chart-entry-name", entry_name)
-        for v in d:
-            if v["version"] == version:
-                msg = f"[ERROR] Helm chart release already exists in the index.yaml: {version}"
-                print(msg)
-                gitutils.add_output("pr-content-error-message", msg)
-                sys.exit(1)
+        if index.found and index.view.has_version(entry_name, version):
+            msg = f"[ERROR] Helm chart release already exists in the index.yaml: {version}"
+            print(msg)
+            gitutils.add_output("pr-content-error-message", msg)
+            sys.exit(1)
 
         tag_name = f"{organization}-{chart}-{version}"
         gitutils.add_output("release_tag", tag_name)
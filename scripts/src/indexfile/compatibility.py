@@ -0,0 +1,305 @@
+"""OpenShift compatibility matrix of the charts of a Helm repository index.
+
+The range of OpenShift versions supported by a chart comes from its
+supportedOpenShiftVersions annotation or, if it is not set, from its kubeVersion,
+mapped to the matching OpenShift versions. Each range is parsed once into a union of
+version intervals, and the matrix records, for each chart and each OpenShift minor
+version, whether that version falls in one of the intervals.
+
+The matrix is published next to the index, as <name>.ocp-compat.json, so that
+questions such as "which charts don't support OCP 4.N" are a lookup rather than a
+rescan of the whole index.
+"""
+
+import bisect
+import json
+import os
+
+import semantic_version
+from semantic_version import base
+
+from tools import versions
+
+COMPAT_EXTENSION = ".ocp-compat.json"
+
+SUPPORTED_OCP_ANNOTATION = "charts.openshift.io/supportedOpenShiftVersions"
+
+# Kubernetes minor version of the OpenShift releases that don't follow the
+# "Kubernetes 1.<OCP minor + 13>" rule.
+_KUBE_MINOR_BY_OCP_MINOR = {1: 13, 2: 14, 3: 16, 4: 17, 5: 18}
+
+# Last OpenShift minor version included in the matrix by default
+MAX_OCP_MINOR = 20
+
+
+def get_kube_version(ocp_version):
+    """Return the Kubernetes version shipped with an OpenShift 4.x minor version.
+
+    Args:
+        ocp_version (str): OpenShift minor version, such as "4.12"
+
+    Returns:
+        str: Kubernetes minor version, such as "1.25"
+    """
+    minor = versions.coerce(ocp_version).minor
+    return f"1.{_KUBE_MINOR_BY_OCP_MINOR.get(minor, minor + 13)}"
+
+
+def default_ocp_versions():
+    """Return the OpenShift minor versions the matrix covers by default."""
+    return [f"4.{minor}" for minor in range(1, MAX_OCP_MINOR + 1)]
+
+
+# An interval is a (low, low_inclusive, high, high_inclusive) tuple of Versions, where
+# a None bound is infinite. A range is a list of intervals, sorted by lower bound.
+_FULL_RANGE = [(None, False, None, False)]
+
+
+def _intersect(a, b):
+    low, low_inclusive = a[0], a[1]
+    if b[0] is not None and (low is None or b[0] > low):
+        low, low_inclusive = b[0], b[1]
+    elif b[0] is not None and b[0] == low:
+        low_inclusive = low_inclusive and b[1]
+
+    high, high_inclusive = a[2], a[3]
+    if b[2] is not None and (high is None or b[2] < high):
+        high, high_inclusive = b[2], b[3]
+    elif b[2] is not None and b[2] == high:
+        high_inclusive = high_inclusive and b[3]
+
+    if low is not None and high is not None:
+        if low > high or (low == high and not (low_inclusive and high_inclusive)):
+            return None
+    return (low, low_inclusive, high, high_inclusive)
+
+
+def _low_key(interval):
+    # Sort infinite lower bounds first
+    if interval[0] is None:
+        return (False, semantic_version.Version("0.0.0"))
+    return (True, interval[0])
+
+
+def _union(intervals):
+    return sorted(intervals, key=_low_key)
+
+
+def _clause_to_range(clause):
+    """Convert a semantic_version clause tree into a union of version intervals."""
+    if isinstance(clause, base.AnyOf):
+        return _union(
+            interval
+            for sub_clause in clause.clauses
+            for interval in _clause_to_range(sub_clause)
+        )
+    if isinstance(clause, base.AllOf):
+        result = _FULL_RANGE
+        for sub_clause in clause.clauses:
+            sub_range = _clause_to_range(sub_clause)
+            result = _union(
+                interval
+                for a in result
+                for b in sub_range
+                if (interval := _intersect(a, b)) is not None
+            )
+        return result
+    if isinstance(clause, base.Always):
+        return _FULL_RANGE
+    if isinstance(clause, base.Never):
+        return []
+
+    target = clause.target
+    return {
+        base.Range.OP_GTE: [(target, True, None, False)],
+        base.Range.OP_GT: [(target, False, None, False)],
+        base.Range.OP_LT: [(None, False, target, False)],
+        base.Range.OP_LTE: [(None, False, target, True)],
+        base.Range.OP_EQ: [(target, True, target, True)],
+        base.Range.OP_NEQ: [(None, False, target, False), (target, False, None, False)],
+    }[clause.operator]
+
+
+def parse_range(version_range):
+    """Parse an npm-style version range into a union of version intervals.
+
+    Raises:
+        ValueError if the range is not a valid npm range.
+    """
+    return _clause_to_range(versions.npm_spec(version_range).clause)
+
+
+def _covered_columns(version_range, points):
+    """Return the indexes of the sorted points that fall in the given range.
+
+    Each interval is located among the points by bisection, so the cost depends on
+    the number of intervals rather than on the number of points.
+    """
+    covered = set()
+    for low, low_inclusive, high, high_inclusive in version_range:
+        start = 0
+        if low is not None:
+            start = (bisect.bisect_left if low_inclusive else bisect.bisect_right)(
+                points, low
+            )
+        end = len(points)
+        if high is not None:
+            end = (bisect.bisect_right if high_inclusive else bisect.bisect_left)(
+                points, high
+            )
+        covered.update(range(start, end))
+    return covered
+
+
+def get_chart_range(chart):
+    """Return the version range that defines the OpenShift support of a chart.
+
+    Returns:
+        (str, str): The name of the field the range comes from, either
+                    "supportedOpenShiftVersions" or "kubeVersion", and the range. (None,
+                    None) if the chart doesn't define any.
+    """
+    supported = chart.get("annotations", {}).get(SUPPORTED_OCP_ANNOTATION, "")
+    if supported and supported != "N/A":
+        return "supportedOpenShiftVersions", supported
+    if chart.get("kubeVersion"):
+        return "kubeVersion", chart["kubeVersion"]
+    return None, None
+
+
+class CompatibilityMatrix:
+    """Chart x OpenShift minor version support matrix.
+
+    Rows are keyed by "<entry name>/<chart version>". A row is a string holding one
+    "1" or "0" character per OpenShift version of the matrix, or None if the chart
+    doesn't define a range, or if its range can't be parsed.
+
+    Args:
+        ocp_versions (list[str]): OpenShift minor versions, in increasing order
+        charts (dict): Rows of the matrix, see to_dict()
+    """
+
+    def __init__(self, ocp_versions, charts):
+        self.ocp_versions = ocp_versions
+        self.charts = charts
+        self._columns = {version: i for i, version in enumerate(ocp_versions)}
+
+    @classmethod
+    def build(cls, index_data, ocp_versions=None):
+        """Build the matrix of all the charts of an index.
+
+        Args:
+            index_data (dict): Content of the Helm repo index
+            ocp_versions (list[str]): OpenShift minor versions to cover, in increasing
+                                      order. Defaults to default_ocp_versions().
+        """
+        ocp_versions = ocp_versions or default_ocp_versions()
+        points = {
+            "supportedOpenShiftVersions": [versions.coerce(v) for v in ocp_versions],
+            "kubeVersion": [versions.coerce(get_kube_version(v)) for v in ocp_versions],
+        }
+
+        parsed_ranges = {}
+        charts = {}
+        for entry_name, entry_charts in index_data["entries"].items():
+            for chart in entry_charts:
+                source, version_range = get_chart_range(chart)
+                row = {"source": source, "range": version_range, "supported": None}
+                charts[f'{entry_name}/{chart["version"]}'] = row
+                if version_range is None:
+                    continue
+
+                # Charts of a given provider tend to share ranges: parse each once
+                if version_range not in parsed_ranges:
+                    try:
+                        parsed_ranges[version_range] = parse_range(version_range)
+                    except ValueError:
+                        parsed_ranges[version_range] = None
+                parsed = parsed_ranges[version_range]
+                if parsed is None:
+                    continue
+
+                covered = _covered_columns(parsed, points[source])
+                row["supported"] = "".join(
+                    "1" if i in covered else "0" for i in range(len(ocp_versions))
+                )
+
+        return cls(ocp_versions, charts)
+
+    def covers(self, ocp_version):
+        """Check if an OpenShift version is a column of the matrix."""
+        version = versions.coerce(ocp_version)
+        return f"{version.major}.{version.minor}" in self._columns
+
+    def _column(self, ocp_version):
+        version = versions.coerce(ocp_version)
+        return self._columns[f"{version.major}.{version.minor}"]
+
+    def is_supported(self, entry_name, version, ocp_version):
+        """Check if a chart supports an OpenShift version.
+
+        Returns:
+            bool: True or False, or None if the support of the chart is unknown.
+
+        Raises:
+            KeyError if the chart or the OpenShift version are not in the matrix.
+        """
+        supported = self.charts[f"{entry_name}/{version}"]["supported"]
+        if supported is None:
+            return None
+        return supported[self._column(ocp_version)] == "1"
+
+    def unsupported_charts(self, ocp_version):
+        """Return the keys of the charts that don't support an OpenShift version.
+
+        Charts whose support is unknown are not included.
+
+        Raises:
+            KeyError if the OpenShift version is not in the matrix.
+        """
+        column = self._column(ocp_version)
+        return [
+            key
+            for key, row in self.charts.items()
+            if row["supported"] is not None and row["supported"][column] == "0"
+        ]
+
+    def to_dict(self):
+        return {"ocpVersions": self.ocp_versions, "charts": self.charts}
+
+
+def get_compat_path(index_path):
+    """Return the path or URL of the compatibility matrix of an index file."""
+    return os.path.splitext(index_path)[0] + COMPAT_EXTENSION
+
+
+def write_matrix(index_data, index_file, index_digest):
+    """Build the compatibility matrix of an index and write it next to the index.
+
+    Args:
+        index_data (dict): Content of the Helm repo index
+        index_file (str): Path to the YAML index file
+        index_digest (str): sha256 digest of the YAML index file
+    """
+    matrix = CompatibilityMatrix.build(index_data)
+    with open(get_compat_path(index_file), "w") as fd:
+        json.dump(
+            {"digest": index_digest} | matrix.to_dict(), fd, separators=(",", ":")
+        )
+
+
+def load_matrix(content, index_digest):
+    """Load a published compatibility matrix.
+
+    Args:
+        content (bytes): Content of the matrix file
+        index_digest (str): sha256 digest of the YAML index
+
+    Returns:
+        CompatibilityMatrix: the matrix, or None if it doesn't match the YAML index.
+    """
+    matrix = json.loads(content)
+    if matrix.get("digest") != index_digest:
+        print("[INFO] Compatibility matrix does not match the index, ignoring it")
+        return None
+    return CompatibilityMatrix(matrix["ocpVersions"], matrix["charts"])
@@ -0,0 +1,97 @@
+"""Unit tests for the OpenShift compatibility matrix"""
+
+import json
+
+import pytest
+import semantic_version
+
+from indexfile import compatibility
+
+ranges = [
+    ">=4.7",
+    ">4.7",
+    "<=4.10",
+    "<4.10",
+    "4.8 - 4.12",
+    "4.8.x",
+    "~4.10",
+    "^4.9",
+    "=4.11",
+    ">=4.9 <4.11 || 4.13.x || >4.17",
+    ">=4.11 <4.9",
+    "*",
+]
+
+kube_ranges = [">=1.20.0-0", ">=1.19.0 <1.25.0", "~1.23.0", "1.16.x || >=1.27"]
+
+
+def make_chart(version, supported_ocp=None, kube_version=None):
+    chart = {"name": "chart", "version": version, "annotations": {}}
+    if supported_ocp is not None:
+        chart["annotations"][compatibility.SUPPORTED_OCP_ANNOTATION] = supported_ocp
+    if kube_version is not None:
+        chart["kubeVersion"] = kube_version
+    return chart
+
+
+@pytest.mark.parametrize("version_range", ranges)
+def test_matches_npm_spec(version_range):
+    index_data = {"entries": {"acme-chart": [make_chart("1.0.0", version_range)]}}
+    matrix = compatibility.CompatibilityMatrix.build(index_data)
+
+    spec = semantic_version.NpmSpec(version_range)
+    for ocp_version in matrix.ocp_versions:
+        expected = semantic_version.Version.coerce(ocp_version) in spec
+        assert matrix.is_supported("acme-chart", "1.0.0", ocp_version) == expected
+
+
+@pytest.mark.parametrize("kube_range", kube_ranges)
+def test_kube_version(kube_range):
+    index_data = {
+        "entries": {
+            "acme-chart": [
+                make_chart("1.0.0", kube_version=kube_range),
+                make_chart("1.0.1", supported_ocp="N/A", kube_version=kube_range),
+            ]
+        }
+    }
+    matrix = compatibility.CompatibilityMatrix.build(index_data)
+
+    spec = semantic_version.NpmSpec(kube_range)
+    for ocp_version in matrix.ocp_versions:
+        kube_version = compatibility.get_kube_version(ocp_version)
+        expected = semantic_version.Version.coerce(kube_version) in spec
+        for chart_version in ["1.0.0", "1.0.1"]:
+            supported = matrix.is_supported("acme-chart", chart_version, ocp_version)
+            assert supported == expected
+
+
+def test_get_kube_version():
+    assert compatibility.get_kube_version("4.3") == "1.16"
+    assert compatibility.get_kube_version("4.6") == "1.19"
+    assert compatibility.get_kube_version("4.12") == "1.25"
+
+
+def test_unsupported_charts_and_persistence(tmp_path):
+    index_data = {
+        "entries": {
+            "acme-old": [make_chart("1.0.0", "4.8 - 4.10")],
+            "acme-new": [make_chart("2.0.0", ">=4.9")],
+            "acme-unknown": [make_chart("0.1.0"), make_chart("0.2.0", "not a range")],
+        }
+    }
+    index_file = tmp_path / "index.yaml"
+    compatibility.write_matrix(index_data, str(index_file), "0" * 64)
+
+    content = (tmp_path / "index.ocp-compat.json").read_bytes()
+    assert compatibility.load_matrix(content, "1" * 64) is None
+    matrix = compatibility.load_matrix(content, "0" * 64)
+
+    assert matrix.unsupported_charts("4.12") == ["acme-old/1.0.0"]
+    assert matrix.unsupported_charts("4.8") == ["acme-new/2.0.0"]
+    assert matrix.unsupported_charts("4.9") == []
+    assert matrix.is_supported("acme-unknown", "0.1.0", "4.9") is None
+    assert matrix.is_supported("acme-unknown", "0.2.0", "4.9") is None
+    assert json.loads(content)["charts"]["acme-old/1.0.0"]["supported"].startswith(
+        "0000000111000"
+    )
@@ -0,0 +1,286 @@
+"""Download the Helm repository index through a shared on-disk cache.
+
+The index is fetched by several steps of the workflow, sometimes several times in the
+same run. This module keeps the raw content of each downloaded index in a local cache directory
+laid out by URL, i.e. by repository and branch for indexes hosted on
+raw.githubusercontent.com:
+
+    <cache dir>/raw.githubusercontent.com/<repository>/<branch>/index.yaml
+
+Cached copies are revalidated with If-None-Match, so the index is only downloaded
+again when it has actually changed. Within a process, an index is fetched and parsed at
+most once. When the JSON sidecar published next to the index matches it, the index is
+loaded from the sidecar instead of being parsed as YAML (see indexfile.sidecar).
+
+Read-only callers may pass allow_stale=True to be served the cached copy when the
+index can't be revalidated because of a connection error. Callers that update the index
+never do so.
+
+Environment variables:
+INDEX_CACHE_DIR : location of the cache, defaults to <cache root>/index.
+INDEX_CACHE_OFFLINE : if set to "true", never reach the network and only serve the
+                      cached copies. Tests point INDEX_CACHE_DIR to a fixture directory
+                      and set this variable.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import urllib.parse
+from dataclasses import dataclass, field
+from functools import cached_property
+
+import requests
+import yaml
+from environs import Env
+
+try:
+    from yaml import CSafeLoader as Loader
+except ImportError:
+    from yaml import SafeLoader as Loader
+
+from indexfile import compatibility, sidecar
+from indexfile.view import IndexView
+from tools import cache
+
+INDEX_CACHE_DIR_ENV = "INDEX_CACHE_DIR"
+INDEX_CACHE_OFFLINE_ENV = "INDEX_CACHE_OFFLINE"
+
+# Indexes already fetched by this process, by URL
+_fetched = {}
+
+
+def get_index_url(repository, branch, index_file="index.yaml"):
+    """Return the URL of the index file hosted on a branch of a GitHub repository.
+
+    Args:
+        repository (str): Name of the GitHub repository (e.g. "openshift-helm-charts/charts")
+        branch (str): Git branch that hosts the Helm repository index
+        index_file (str): Path to the index file in the branch
+
+    Returns:
+        str: The URL of the raw index file
+    """
+    return f"https://raw.githubusercontent.com/{repository}/{branch}/{index_file}"
+
+
+def _get_cache_path(url):
+    parsed_url = urllib.parse.urlparse(url)
+    path = parsed_url.path.lstrip("/") or "index.yaml"
+    return os.path.join(
+        cache.get_cache_dir("index", INDEX_CACHE_DIR_ENV), parsed_url.netloc, path
+    )
+
+
+def _write_atomic(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+@dataclass
+class IndexDocument:
+    """A downloaded Helm repository index.
+
+    The parsed index is shared by all callers in the process: callers that modify it
+    must copy the parts they modify first.
+    """
+
+    url: str
+    status_code: int
+    content: bytes = None
+    cache_path: str = None
+    stale: bool = False
+    _data: dict = field(default=None, repr=False)
+
+    @property
+    def found(self):
+        return self.status_code == 200
+
+    @property
+    def text(self):
+        if self.content is None:
+            return None
+        return self.content.decode("utf-8")
+
+    @property
+    def digest(self):
+        return hashlib.sha256(self.content).hexdigest()
+
+    @property
+    def data(self):
+        """Parsed content of the index.
+
+        Raises:
+            yaml.YAMLError if the index is not valid YAML.
+        """
+        if self._data is None and self.content is not None:
+            self._data = self._load_data()
+        return self._data
+
+    @cached_property
+    def yaml_data(self):
+        """Content of the index parsed from the YAML, never loaded from the JSON
+        sidecar, whose timestamps are strings. Callers that write the index back must
+        use this form.
+
+        Raises:
+            yaml.YAMLError if the index is not valid YAML.
+        """
+        if self.content is None:
+            return None
+        return yaml.load(self.content, Loader=Loader)
+
+    @cached_property
+    def view(self):
+        """IndexView over the parsed index, built once and shared by all callers."""
+        return IndexView(self.data)
+
+    @cached_property
+    def compatibility(self):
+        """OpenShift compatibility matrix of the charts of the index.
+
+        The matrix published next to the index is used if it is up to date, otherwise
+        it is built from the parsed index.
+        """
+        if self.url.endswith(".yaml"):
+            try:
+                compat_document = fetch_index(compatibility.get_compat_path(self.url))
+                if compat_document.found:
+                    matrix = compatibility.load_matrix(
+                        compat_document.content, self.digest
+                    )
+                    if matrix is not None:
+                        return matrix
+            except (requests.exceptions.RequestException, ValueError) as err:
+                print(f"[WARNING] Ignoring compatibility matrix of {self.url}: {err}")
+        return compatibility.CompatibilityMatrix.build(self.data)
+
+    def _load_data(self):
+        if "yaml_data" in self.__dict__:
+            return self.yaml_data
+        data = self._load_json_sidecar(self.digest)
+        if data is None:
+            data = self.yaml_data
+        return data
+
+    def _load_json_sidecar(self, digest):
+        """Load the index from its JSON sidecar, if published and up to date."""
+        if not self.url.endswith(".yaml"):
+            return None
+
+        try:
+            json_document = fetch_index(sidecar.get_json_path(self.url))
+            if json_document.found:
+                return sidecar.load_json_sidecar(json_document.content, digest)
+        except (requests.exceptions.RequestException, ValueError) as err:
+            print(f"[WARNING] Ignoring JSON sidecar of {self.url}: {err}")
+        return None
+
+
+def _read_cache(cache_path):
+    metadata_path = f"{cache_path}.meta.json"
+    if not os.path.exists(cache_path) or not os.path.exists(metadata_path):
+        return None, {}
+
+    with open(cache_path, "rb") as f:
+        content = f.read()
+    with open(metadata_path) as f:
+        metadata = json.load(f)
+    return content, metadata
+
+
+def _write_cache(cache_path, content, etag):
+    _write_atomic(cache_path, content)
+    _write_atomic(
+        f"{cache_path}.meta.json",
+        json.dumps(
+            {"etag": etag, "digest": hashlib.sha256(content).hexdigest()}
+        ).encode(),
+    )
+
+
+def fetch_index(url, allow_stale=False):
+    """Retrieve the Helm repository index at the given URL.
+
+    Args:
+        url (str): URL of the index file
+        allow_stale (bool): Whether to serve the cached copy if the index can't be
+                            revalidated because of a connection error. Only for
+                            callers that don't update the index.
+
+    Returns:
+        IndexDocument: the retrieved index. Its status_code is the one of the
+                       download, 200 if the cached copy was served.
+
+    Raises:
+        requests.exceptions.ConnectionError if the index can't be downloaded, and no
+        cached copy may be served.
+    """
+    if url in _fetched and (allow_stale or not _fetched[url].stale):
+        return _fetched[url]
+
+    cache_path = _get_cache_path(url)
+    cached_content, metadata = _read_cache(cache_path)
+
+    env = Env()
+    if env.bool(INDEX_CACHE_OFFLINE_ENV, False):
+        print(f"[INFO] Offline mode, using cached index for {url}")
+        status_code = 200 if cached_content is not None else 404
+        document = IndexDocument(url, status_code, cached_content, cache_path)
+        _fetched[url] = document
+        return document
+
+    headers = {}
+    if cached_content is not None and metadata.get("etag"):
+        headers["If-None-Match"] = metadata["etag"]
+
+    try:
+        r = requests.get(url, headers=headers)
+    except requests.exceptions.ConnectionError as err:
+        if cached_content is None or not allow_stale:
+            raise
+        print(f"[WARNING] Failed to revalidate {url}, using cached index: {err}")
+        document = IndexDocument(url, 200, cached_content, cache_path, stale=True)
+    else:
+        if r.status_code == 304:
+            print(f"[INFO] Index not modified, using cached index for {url}")
+            document = IndexDocument(url, 200, cached_content, cache_path)
+        elif r.status_code == 200:
+            print(f"[INFO] Index downloaded from {url}")
+            _write_cache(cache_path, r.content, r.headers.get("ETag"))
+            document = IndexDocument(url, 200, r.content, cache_path)
+        else:
+            print(f"[INFO] Failed to download index from {url}: {r.status_code}")
+            document = IndexDocument(url, r.status_code)
+
+    _fetched[url] = document
+    return document
+
+
+def fetch_repository_index(
+    repository, branch, index_file="index.yaml", allow_stale=False
+):
+    """Retrieve the Helm repository index hosted on a branch of a GitHub repository.
+
+    Args:
+        repository (str): Name of the GitHub repository (e.g. "openshift-helm-charts/charts")
+        branch (str): Git branch that hosts the Helm repository index
+        index_file (str): Path to the index file in the branch
+        allow_stale (bool): See fetch_index
+
+    Returns:
+        IndexDocument: the retrieved index.
+    """
+    return fetch_index(get_index_url(repository, branch, index_file), allow_stale)
+
+
+def clear():
+    """Forget about the indexes already fetched by this process.
+
+    The on-disk cache is left untouched, and will be revalidated on next fetch.
+    """
+    _fetched.clear()
@@ -0,0 +1,133 @@
+"""Unit tests for the Helm repository index fetch layer"""
+
+import hashlib
+
+import pytest
+import requests
+import responses
+
+from indexfile import fetch
+
+repository = "my-fake-org/my-fake-repo"
+branch = "gh-pages"
+index_url = f"https://raw.githubusercontent.com/{repository}/{branch}/index.yaml"
+
+index_content = b"""\
+apiVersion: v1
+entries:
+  acme-awesome:
+  - name: awesome
+    version: 1.42.0
+generated: '2024-01-01T00:00:00+00:00'
+"""
+
+
+@pytest.fixture(autouse=True)
+def index_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv(fetch.INDEX_CACHE_DIR_ENV, str(tmp_path))
+    fetch.clear()
+    yield tmp_path
+    fetch.clear()
+
+
+@responses.activate
+def test_fetch_and_revalidate(index_cache_dir):
+    responses.get(index_url, body=index_content, headers={"ETag": '"v1"'})
+    responses.get(index_url.replace(".yaml", ".json"), status=404)
+
+    index = fetch.fetch_repository_index(repository, branch)
+    assert index.found
+    assert index.data["entries"]["acme-awesome"][0]["version"] == "1.42.0"
+
+    # The index is only fetched once per process
+    assert fetch.fetch_repository_index(repository, branch) is index
+    assert responses.assert_call_count(index_url, 1)
+
+    # Cached copy is revalidated in a new process
+    fetch.clear()
+    responses.replace(responses.GET, index_url, status=304)
+    index = fetch.fetch_repository_index(repository, branch)
+    assert responses.calls[-1].request.headers["If-None-Match"] == '"v1"'
+    assert index.found
+    assert index.content == index_content
+    assert index.data["entries"]["acme-awesome"][0]["name"] == "awesome"
+
+
+@responses.activate
+def test_fetch_missing_index():
+    responses.get(index_url, status=404)
+
+    index = fetch.fetch_repository_index(repository, branch)
+    assert not index.found
+    assert index.text is None
+    assert index.data is None
+
+
+@responses.activate
+def test_fetch_connection_error_uses_cache():
+    responses.get(index_url, body=index_content, headers={"ETag": '"v1"'})
+    fetch.fetch_repository_index(repository, branch)
+
+    fetch.clear()
+    responses.replace(
+        responses.GET, index_url, body=requests.exceptions.ConnectionError()
+    )
+    # Callers updating the index don't get the cached copy
+    with pytest.raises(requests.exceptions.ConnectionError):
+        fetch.fetch_repository_index(repository, branch)
+
+    index = fetch.fetch_repository_index(repository, branch, allow_stale=True)
+    assert index.found
+    assert index.stale
+    assert index.content == index_content
+    with pytest.raises(requests.exceptions.ConnectionError):
+        fetch.fetch_repository_index(repository, branch)
+
+
+def test_fetch_offline_fixture_directory(index_cache_dir, monkeypatch):
+    monkeypatch.setenv(fetch.INDEX_CACHE_OFFLINE_ENV, "true")
+
+    # Populate the fixture directory as a test would
+    cache_path = (
+        index_cache_dir
+        / "raw.githubusercontent.com"
+        / repository
+        / branch
+        / "index.yaml"
+    )
+    cache_path.parent.mkdir(parents=True)
+    cache_path.write_bytes(index_content)
+    cache_path.with_name("index.yaml.meta.json").write_text("{}")
+
+    index = fetch.fetch_repository_index(repository, branch)
+    assert index.found
+    assert "acme-awesome" in index.data["entries"]
+
+    index = fetch.fetch_repository_index(repository, "other-branch")
+    assert not index.found
+
+
+@responses.activate
+def test_fetch_uses_json_sidecar(monkeypatch):
+    responses.get(index_url, body=index_content)
+    index_digest = hashlib.sha256(index_content).hexdigest()
+    sidecar_data = {"apiVersion": "v1", "entries": {"from-sidecar": []}}
+    responses.get(
+        index_url.replace(".yaml", ".json"),
+        json={"digest": index_digest, "index": sidecar_data},
+    )
+
+    index = fetch.fetch_repository_index(repository, branch)
+    assert index.data == sidecar_data
+
+
+@responses.activate
+def test_fetch_ignores_stale_json_sidecar(monkeypatch):
+    responses.get(index_url, body=index_content)
+    responses.get(
+        index_url.replace(".yaml", ".json"),
+        json={"digest": "0" * 64, "index": {"entries": {}}},
+    )
+
+    index = fetch.fetch_repository_index(repository, branch)
+    assert "acme-awesome" in index.data["entries"]
@@ -1,44 +1,46 @@
-import json
 import sys
 
-import requests
-import semantic_version
-import yaml
-
 sys.path.append("../")
+from indexfile import compatibility, fetch, latest
+from tools import versions
 
 INDEX_FILE = "https://charts.openshift.io/index.yaml"
 
 
-def _make_http_request(url, body=None, params={}, headers={}, verbose=False):
-    response = requests.get(url, params=params, headers=headers, json=body)
-    if verbose:
-        print(json.dumps(headers, indent=4, sort_keys=True))
-        print(json.dumps(body, indent=4, sort_keys=True))
-        print(json.dumps(params, indent=4, sort_keys=True))
-        print(response.text)
-    return response.text
+def _load_index_yaml():
+    return fetch.fetch_index(INDEX_FILE, allow_stale=True).data
 
 
-def _load_index_yaml():
-    yaml_text = _make_http_request(INDEX_FILE)
-    dct = yaml.safe_load(yaml_text)
-    return dct
+def _load_index_view():
+    return fetch.fetch_index(INDEX_FILE, allow_stale=True).view
+
+
+def get_compatibility_matrix(ocp_version=None):
+    """Return the OpenShift compatibility matrix of the charts of the index.
+
+    Args:
+        ocp_version (str): OpenShift version that must be covered by the matrix. If the
+                           published matrix doesn't cover it, the matrix is rebuilt.
+    """
+    document = fetch.fetch_index(INDEX_FILE, allow_stale=True)
+    matrix = document.compatibility
+    if ocp_version and not matrix.covers(ocp_version):
+        version = versions.coerce(ocp_version)
+        ocp_versions = sorted(
+            set(matrix.ocp_versions) | {f"{version.major}.{version.minor}"},
+            key=versions.coerce,
+        )
+        matrix = compatibility.CompatibilityMatrix.build(document.data, ocp_versions)
+    return matrix
 
 
 def get_chart_info(tar_name):
-    index_dct = _load_index_yaml()
-    for entry, charts in index_dct["entries"].items():
-        if tar_name.startswith(entry):
-            for chart in charts:
-                index_tar_name = f"{entry}-{chart['version']}"
-                if tar_name == index_tar_name:
-                    print(f"[INFO] match found: {tar_name}")
-                    providerType = chart["annotations"][
-                        "charts.openshift.io/providerType"
-                    ]
-                    provider = chart["annotations"]["charts.openshift.io/provider"]
-                    return providerType, provider, chart["name"], chart["version"]
+    _, chart = _load_index_view().find_by_tar_name(tar_name)
+    if chart is not None:
+        print(f"[INFO] match found: {tar_name}")
+        providerType = chart["annotations"]["charts.openshift.io/providerType"]
+        provider = chart["annotations"]["charts.openshift.io/provider"]
+        return providerType, provider, chart["name"], chart["version"]
     print(f"[INFO] match not found: {tar_name}")
     return "", "", "", ""
 
@@ -50,6 +52,7 @@ def get_charts_info():
     for entry, charts in index_dct["entries"].items():
         for chart in charts:
             chart_info = {}
+            chart_info["entry"] = entry
             chart_info["name"] = chart["name"]
             chart_info["version"] = chart["version"]
             chart_info["providerType"] = chart["annotations"][
@@ -77,36 +80,13 @@ def get_latest_charts():
 
     print(f"{len(chart_list)} charts found in Index file")
 
-    chart_in_process = {"name": ""}
-    chart_latest_version = ""
-    latest_charts = []
-
-    for index, chart in enumerate(chart_list):
-        chart_name = chart["name"]
-        # print(f'[INFO] look for latest chart : {chart_name} {chart["version"]}')
-        if chart_name == chart_in_process["name"]:
-            new_version = semantic_version.Version.coerce(chart["version"])
-            # print(f'   [INFO] compare chart versions : {new_version}({chart["version"]}) : {chart_latest_version}')
-            if new_version > chart_latest_version:
-                # print(f'   [INFO] a new latest chart version : {new_version}')
-                chart_latest_version = new_version
-                chart_in_process = chart
-        else:
-            if chart_in_process["name"] != "":
-                # print(f'   [INFO] chart completed : {chart_in_process["name"]} {chart_in_process["version"]}')
-                latest_charts.append(chart_in_process)
-
-                # print(f'[INFO] new  chart found : {chart_name} {chart["version"]}')
-                chart_in_process = chart
-                chart_version = chart["version"]
-                if chart_version.startswith("v"):
-                    chart_version = chart_version[1:]
-                chart_latest_version = semantic_version.Version.coerce(chart_version)
-            else:
-                chart_in_process = chart
+    return latest.get_latest(chart_list)
+
 
-        if index + 1 == len(chart_list):
-            # print(f'   [INFO] last chart completed : {chart_in_process["name"]} {chart_in_process["version"]}')
-            latest_charts.append(chart_in_process)
+def get_charts_history():
+    """Return all the versions of each chart of the index, from oldest to latest.
 
-    return latest_charts
+    Returns:
+        dict: Mapping of (provider, name) to the list of versions of this chart
+    """
+    return latest.group_by_chart(get_charts_info())
@@ -0,0 +1,64 @@
+"""Resolution of the latest version of each chart of the index.
+
+Chart versions are grouped by (provider, chart name) in a single pass, regardless of
+the order in which they appear in the index, and each version string is parsed once
+into a sort key.
+"""
+
+import functools
+
+import semantic_version
+
+from tools import versions
+
+
+@functools.lru_cache(maxsize=None)
+def version_key(version):
+    """Return the sort key of a chart version.
+
+    A leading "v" is ignored, and versions that can't be coerced into a semantic
+    version sort before all others.
+
+    Args:
+        version (str): Version of the chart, as found in the index
+
+    Returns:
+        semantic_version.Version: the sort key
+    """
+    try:
+        return versions.coerce(str(version).removeprefix("v"))
+    except ValueError:
+        return semantic_version.Version("0.0.0")
+
+
+def group_by_chart(chart_infos):
+    """Group chart versions by chart, and sort the versions of each chart.
+
+    Args:
+        chart_infos (iterable[dict]): Chart versions, holding at least a "provider",
+                                      "name" and "version" key, in any order.
+
+    Returns:
+        dict: Mapping of (provider, name) to the list of versions of this chart, from
+              the oldest to the latest. Charts are in order of first appearance.
+    """
+    histories = {}
+    for chart_info in chart_infos:
+        key = (chart_info["provider"], chart_info["name"])
+        histories.setdefault(key, []).append(chart_info)
+
+    for history in histories.values():
+        history.sort(key=lambda chart_info: version_key(chart_info["version"]))
+    return histories
+
+
+def get_latest(chart_infos):
+    """Return the latest version of each chart.
+
+    Args:
+        chart_infos (iterable[dict]): Chart versions, see group_by_chart
+
+    Returns:
+        list[dict]: The latest version of each chart, in order of first appearance.
+    """
+    return [history[-1] for history in group_by_chart(chart_infos).values()]
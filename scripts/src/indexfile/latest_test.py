@@ -0,0 +1,40 @@
+"""Unit tests for the latest chart version resolution"""
+
+from indexfile import latest
+
+
+def make_chart_info(provider, name, version):
+    return {"provider": provider, "name": name, "version": version}
+
+
+def test_group_by_chart_interleaved():
+    chart_infos = [
+        make_chart_info("acme", "awesome", "1.9.0"),
+        make_chart_info("acme", "other", "0.1.0"),
+        make_chart_info("acme", "awesome", "v1.10.0"),
+        make_chart_info("redhat", "awesome", "3.0.0"),
+        make_chart_info("acme", "awesome", "1.2.0+build.1"),
+        make_chart_info("acme", "other", "not-a-version"),
+    ]
+
+    histories = latest.group_by_chart(chart_infos)
+    assert list(histories) == [
+        ("acme", "awesome"),
+        ("acme", "other"),
+        ("redhat", "awesome"),
+    ]
+    assert [c["version"] for c in histories[("acme", "awesome")]] == [
+        "1.2.0+build.1",
+        "1.9.0",
+        "v1.10.0",
+    ]
+    assert [c["version"] for c in histories[("acme", "other")]] == [
+        "not-a-version",
+        "0.1.0",
+    ]
+
+    assert [c["version"] for c in latest.get_latest(chart_infos)] == [
+        "v1.10.0",
+        "0.1.0",
+        "3.0.0",
+    ]
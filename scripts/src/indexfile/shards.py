@@ -0,0 +1,100 @@
+"""Per-provider and per-provider-type shards of the Helm repository index.
+
+Helm clients that only consume a subset of the charts can add a shard of the index
+as their repository instead of the whole index. Next to <dir>/<name>.yaml, the
+following shards are written, all from the same in-memory index data:
+
+* <dir>/<provider type directory>/<name>.yaml, i.e. partners/, redhat/ and community/
+* <dir>/providers/<provider>/<name>.yaml
+
+Each shard is also written gzip-compressed (<name>.yaml.gz) and, if the brotli
+package is installed, brotli-compressed (<name>.yaml.br), so that they can be served
+precompressed.
+"""
+
+import gzip
+import os
+
+import yaml
+
+from indexfile.view import PROVIDER_TYPE_ANNOTATION
+
+try:
+    from yaml import CDumper as Dumper
+except ImportError:
+    from yaml import Dumper
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PROVIDER_TYPE_DIRS = {
+    "partner": "partners",
+    "redhat": "redhat",
+    "community": "community",
+}
+PROVIDERS_DIR = "providers"
+
+
+def split_index(index_data):
+    """Split the entries of an index by provider type and by provider, in one pass.
+
+    Args:
+        index_data (dict): Content of the Helm repo index
+
+    Returns:
+        dict: Mapping of shard directories, relative to the index directory, to the
+              entries of the shard.
+    """
+    shards = {}
+    for entry_name, charts in index_data["entries"].items():
+        for chart in charts:
+            provider_type = chart.get("annotations", {}).get(PROVIDER_TYPE_ANNOTATION)
+            provider = entry_name.removesuffix(f'-{chart.get("name")}')
+
+            shard_dirs = [os.path.join(PROVIDERS_DIR, provider)]
+            if provider_type in PROVIDER_TYPE_DIRS:
+                shard_dirs.append(PROVIDER_TYPE_DIRS[provider_type])
+
+            for shard_dir in shard_dirs:
+                shards.setdefault(shard_dir, {}).setdefault(entry_name, []).append(
+                    chart
+                )
+    return shards
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as fd:
+        fd.write(content)
+
+
+def write_shards(index_data, index_file):
+    """Write the shards of an index, and their compressed variants.
+
+    Args:
+        index_data (dict): Content of the Helm repo index
+        index_file (str): Path to the YAML index file
+
+    Returns:
+        list: Paths to the written files
+    """
+    index_dir, index_name = os.path.split(index_file)
+    paths = []
+    for shard_dir, entries in sorted(split_index(index_data).items()):
+        shard_data = {k: v for k, v in index_data.items() if k != "entries"}
+        shard_data["entries"] = entries
+        content = yaml.dump(shard_data, Dumper=Dumper).encode()
+
+        shard_path = os.path.join(index_dir, shard_dir, index_name)
+        _write(shard_path, content)
+        # mtime=0 keeps the archive identical for an identical shard
+        _write(f"{shard_path}.gz", gzip.compress(content, mtime=0))
+        paths += [shard_path, f"{shard_path}.gz"]
+        if brotli is not None:
+            _write(f"{shard_path}.br", brotli.compress(content))
+            paths.append(f"{shard_path}.br")
+
+    print(f"[INFO] {len(paths)} shard files written for {index_file}")
+    return paths
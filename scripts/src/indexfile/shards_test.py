@@ -0,0 +1,68 @@
+"""Unit tests for the shards of the Helm repository index"""
+
+import gzip
+
+import yaml
+
+from indexfile import shards
+
+try:
+    from yaml import CLoader as Loader
+except ImportError:
+    from yaml import Loader
+
+
+def make_chart(name, version, provider_type):
+    return {
+        "name": name,
+        "version": version,
+        "annotations": {"charts.openshift.io/providerType": provider_type},
+    }
+
+
+index_data = {
+    "apiVersion": "v1",
+    "entries": {
+        "acme-awesome": [
+            make_chart("awesome", "1.0.0", "partner"),
+            make_chart("awesome", "1.1.0", "partner"),
+        ],
+        "acme-other": [make_chart("other", "0.1.0", "partner")],
+        "redhat-thing": [make_chart("thing", "2.0.0", "redhat")],
+        "legacy": [make_chart("legacy", "0.0.1", "unknown")],
+    },
+    "generated": "2024-01-01T00:00:00+00:00",
+}
+
+
+def test_split_index():
+    split = shards.split_index(index_data)
+    assert sorted(split) == [
+        "partners",
+        "providers/acme",
+        "providers/legacy",
+        "providers/redhat",
+        "redhat",
+    ]
+    assert sorted(split["partners"]) == ["acme-awesome", "acme-other"]
+    assert (
+        split["providers/acme"]["acme-awesome"] == index_data["entries"]["acme-awesome"]
+    )
+
+
+def test_write_shards(tmp_path):
+    index_file = tmp_path / "index.yaml"
+    paths = shards.write_shards(index_data, str(index_file))
+    assert str(tmp_path / "redhat" / "index.yaml") in paths
+
+    shard_path = tmp_path / "partners" / "index.yaml"
+    shard = yaml.load(shard_path.read_text(), Loader=Loader)
+    assert shard["generated"] == index_data["generated"]
+    assert sorted(shard["entries"]) == ["acme-awesome", "acme-other"]
+
+    compressed = (tmp_path / "partners" / "index.yaml.gz").read_bytes()
+    assert gzip.decompress(compressed) == shard_path.read_bytes()
+
+    # Compressed shards are reproducible
+    shards.write_shards(index_data, str(index_file))
+    assert (tmp_path / "partners" / "index.yaml.gz").read_bytes() == compressed
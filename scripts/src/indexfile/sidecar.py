@@ -0,0 +1,100 @@
+"""Fast-loading sidecars published next to the Helm repository index.
+
+Helm clients only read index.yaml, but our own tooling loads the index far faster from
+a format that doesn't require a YAML parser. Next to <name>.yaml, update-index
+publishes, from the same in-memory data:
+
+* <name>.json: {"digest": <sha256 of <name>.yaml>, "index": <content of the index>}.
+  This is what internal consumers load instead of the YAML, see indexfile.fetch.
+* <name>.ocp-compat.json: the OpenShift compatibility matrix of the charts of the
+  index, see indexfile.compatibility.
+
+Timestamps of the index, such as "created", are written as ISO 8601 strings, and are
+loaded back as strings: the JSON sidecar is only meant for reading the index. Writing
+the index back requires the timestamps parsed from the YAML.
+
+A sidecar is only used if its recorded digest matches the digest of the YAML index it
+is published with, so a stale or partially published sidecar is never trusted.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+
+from indexfile import compatibility
+
+JSON_EXTENSION = ".json"
+
+
+def get_json_path(index_path):
+    """Return the path or URL of the JSON sidecar of an index file."""
+    return os.path.splitext(index_path)[0] + JSON_EXTENSION
+
+
+def get_sidecar_paths(index_path):
+    """Return the paths of all the sidecars of an index file."""
+    return [get_json_path(index_path), compatibility.get_compat_path(index_path)]
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _dump_json(index_data, index_digest):
+    return json.dumps(
+        {"digest": index_digest, "index": index_data},
+        separators=(",", ":"),
+        default=_json_default,
+    )
+
+
+def write_json_sidecar(index_data, index_file, index_digest):
+    """Write the JSON sidecar of an index file.
+
+    Args:
+        index_data (dict): Content of the Helm repo index
+        index_file (str): Path to the YAML index file
+        index_digest (str): sha256 digest of the YAML index file
+    """
+    json_path = get_json_path(index_file)
+    with open(json_path, "w") as fd:
+        fd.write(_dump_json(index_data, index_digest))
+
+
+def write_sidecars(index_data, index_file, index_content):
+    """Write all sidecars of an index file.
+
+    Args:
+        index_data (dict): Content of the Helm repo index
+        index_file (str): Path to the YAML index file
+        index_content (str): Content of the YAML index file, as written to disk
+
+    Returns:
+        list: Paths to the sidecar files
+    """
+    index_digest = hashlib.sha256(index_content.encode()).hexdigest()
+    write_json_sidecar(index_data, index_file, index_digest)
+    compatibility.write_matrix(index_data, index_file, index_digest)
+    print(f"[INFO] Sidecars written for {index_file}, digest: {index_digest}")
+    return get_sidecar_paths(index_file)
+
+
+def load_json_sidecar(content, index_digest):
+    """Load the content of the index from its JSON sidecar.
+
+    Args:
+        content (bytes): Content of the JSON sidecar
+        index_digest (str): sha256 digest of the YAML index
+
+    Returns:
+        dict: the content of the index, or None if the sidecar doesn't match the YAML
+              index.
+    """
+    sidecar = json.loads(content)
+    if sidecar.get("digest") != index_digest:
+        print("[INFO] JSON sidecar does not match the index, ignoring it")
+        return None
+    return sidecar["index"]
@@ -0,0 +1,96 @@
+"""Lookup structures over the content of a Helm repository index.
+
+An IndexView is built once per loaded index, in a single pass over its entries, and
+answers the questions the workflows ask about the index in constant time instead of
+scanning the entries for each of them.
+"""
+
+from indexfile.latest import version_key
+
+PROVIDER_TYPE_ANNOTATION = "charts.openshift.io/providerType"
+PROVIDER_ANNOTATION = "charts.openshift.io/provider"
+
+
+class IndexView:
+    """Read-only view over the entries of a Helm repository index.
+
+    The index entries are keyed by entry name. Depending on how the index was
+    populated, an entry name is either the name of the chart or "<provider>-<chart>".
+
+    Args:
+        index_data (dict): Content of the Helm repo index
+
+    Raises:
+        KeyError if the index doesn't contain an "entries" section.
+    """
+
+    def __init__(self, index_data):
+        self._entries = index_data["entries"]
+        self._by_version = {}
+        self._by_tar_name = {}
+        self._by_provider = {}
+        self._latest = {}
+
+        for entry_name, charts in self._entries.items():
+            for chart in charts:
+                version = chart.get("version")
+                self._by_version[(entry_name, version)] = chart
+                self._by_tar_name[f"{entry_name}-{version}"] = (entry_name, chart)
+
+                provider = entry_name.removesuffix(f'-{chart.get("name")}')
+                self._by_provider.setdefault(provider, []).append((entry_name, chart))
+
+    def __len__(self):
+        return len(self._by_version)
+
+    def entry_names(self):
+        """Return the names of all the entries of the index."""
+        return self._entries.keys()
+
+    def get_entries(self, entry_name):
+        """Return the list of charts of the given entry, or an empty list."""
+        return self._entries.get(entry_name, [])
+
+    def has_version(self, entry_name, version):
+        """Check if the given version of a chart is present in the index."""
+        return (entry_name, version) in self._by_version
+
+    def get_version(self, entry_name, version):
+        """Return the index entry for the given version of a chart, or None."""
+        return self._by_version.get((entry_name, version))
+
+    def find_by_tar_name(self, tar_name):
+        """Resolve the name of a chart archive, without its extension, to its entry.
+
+        Args:
+            tar_name (str): "<entry name>-<version>", i.e. the name of the release of a
+                            chart.
+
+        Returns:
+            (str, dict): the entry name and the chart's index entry, or (None, None) if
+                         the archive doesn't match any entry.
+        """
+        return self._by_tar_name.get(tar_name, (None, None))
+
+    def get_provider_charts(self, provider):
+        """Return the (entry name, chart) pairs of all charts of a provider.
+
+        The provider is derived from the entry name, i.e. it is the organization the
+        chart is submitted under.
+        """
+        return self._by_provider.get(provider, [])
+
+    def providers(self):
+        """Return the names of all the providers present in the index."""
+        return self._by_provider.keys()
+
+    def get_latest(self, entry_name):
+        """Return the index entry of the latest version of a chart, or None."""
+        if entry_name not in self._latest:
+            charts = self.get_entries(entry_name)
+            self._latest[entry_name] = (
+                max(charts, key=lambda chart: version_key(chart["version"]))
+                if charts
+                else None
+            )
+        return self._latest[entry_name]
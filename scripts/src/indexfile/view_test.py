@@ -0,0 +1,70 @@
+"""Unit tests for the IndexView lookup structures"""
+
+import pytest
+
+from indexfile.view import IndexView
+
+
+def make_chart(name, version, provider_type="partner"):
+    return {
+        "name": name,
+        "version": version,
+        "annotations": {
+            "charts.openshift.io/provider": "Acme Inc.",
+            "charts.openshift.io/providerType": provider_type,
+        },
+    }
+
+
+index_data = {
+    "apiVersion": "v1",
+    "entries": {
+        "acme-awesome": [
+            make_chart("awesome", "1.9.0"),
+            make_chart("awesome", "1.10.0"),
+            make_chart("awesome", "v1.2.0"),
+        ],
+        "acme-awesome-operator": [make_chart("awesome-operator", "0.1.0")],
+        "redhat-redhat-thing": [make_chart("redhat-thing", "2.0.0", "redhat")],
+    },
+}
+
+
+def test_has_version():
+    view = IndexView(index_data)
+    assert view.has_version("acme-awesome", "1.10.0")
+    assert not view.has_version("acme-awesome", "1.11.0")
+    assert not view.has_version("acme-other", "1.10.0")
+    assert view.get_version("acme-awesome", "1.9.0")["version"] == "1.9.0"
+    assert len(view) == 5
+
+
+def test_find_by_tar_name():
+    view = IndexView(index_data)
+    entry_name, chart = view.find_by_tar_name("acme-awesome-operator-0.1.0")
+    assert entry_name == "acme-awesome-operator"
+    assert chart["name"] == "awesome-operator"
+    assert view.find_by_tar_name("acme-awesome-0.1.0") == (None, None)
+
+
+def test_get_provider_charts():
+    view = IndexView(index_data)
+    assert sorted(view.providers()) == ["acme", "redhat"]
+    assert [c["version"] for _, c in view.get_provider_charts("acme")] == [
+        "1.9.0",
+        "1.10.0",
+        "v1.2.0",
+        "0.1.0",
+    ]
+    assert view.get_provider_charts("unknown") == []
+
+
+def test_get_latest():
+    view = IndexView(index_data)
+    assert view.get_latest("acme-awesome")["version"] == "1.10.0"
+    assert view.get_latest("acme-other") is None
+
+
+def test_malformed_index():
+    with pytest.raises(KeyError):
+        IndexView({})
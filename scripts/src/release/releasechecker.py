@@ -28,7 +28,6 @@ import os
 import re
 import sys
 
-import semver
 from reporegex import matchers
 
 from release import release_info, releaser
@@ -36,7 +35,7 @@ from release import release_info, releaser
 sys.path.append("../")
 from owners import checkuser
 from pullrequest import prartifact
-from tools import gitutils
+from tools import gitutils, versions
 
 VERSION_FILE = "release/release_info.json"
 CHARTS_PR_BASE_REPO = gitutils.CHARTS_REPO
@@ -104,7 +103,7 @@ def check_if_dev_release_branch(sender, pr_branch, pr_body, api_url, pr_head_rep
         return False
 
     version = pr_branch.removeprefix(releaser.DEV_PR_BRANCH_NAME_PREFIX)
-    if not semver.VersionInfo.is_valid(version):
+    if not versions.is_valid(version):
         print(
             f"Release part ({version}) of branch name {pr_branch} is not a valid semantic version."
         )
@@ -139,7 +138,7 @@ def check_if_charts_release_branch(sender, pr_branch, pr_body, api_url, pr_head_
         return False
 
     version = pr_branch.removeprefix(releaser.CHARTS_PR_BRANCH_NAME_PREFIX)
-    if not semver.VersionInfo.is_valid(version):
+    if not versions.is_valid(version):
         print(
             f"Release part ({version}) of branch name {pr_branch} is not a valid semantic version."
         )
@@ -300,7 +299,7 @@ def main():
         version = release_info.get_version("./")
         if args.version:
             # should be on main branch
-            if semver.compare(args.version, version) > 0:
+            if versions.compare(args.version, version) > 0:
                 print(
                     f"[INFO] Release {args.version} found in PR files is newer than: {version}."
                 )
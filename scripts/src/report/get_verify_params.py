@@ -1,9 +1,11 @@
 import argparse
 import os
+import subprocess
 import sys
 
 sys.path.append("../")
 from chartprreview import chartprreview
+from report import verification_cache
 from signedchart import signedchart
 from tools import gitutils
 
@@ -70,6 +72,28 @@ def generate_verify_options(directory, category, organization, chart, version):
         return "", "", False, False, report_provided
 
 
+def lookup_cached_verification(category, flags, chart_uri):
+    """Look for a previous verification of a chart tarball, with the default flags,
+    in the verification cache.
+
+    Returns:
+        VerificationEntry: the cached verification, or None if there isn't any.
+    """
+    if (
+        not chart_uri.endswith(".tgz")
+        or flags != f"--set profile.vendortype={category}"
+    ):
+        return None
+
+    vendor_type = "partner" if category == "partners" else category
+    try:
+        cache_key = verification_cache.get_chart_cache_key(chart_uri, vendor_type)
+    except (OSError, subprocess.CalledProcessError) as err:
+        print(f"[WARNING] Can't compute the verification cache key of the chart: {err}")
+        return None
+    return verification_cache.lookup(cache_key)
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument(
@@ -107,6 +131,22 @@ def main():
         "provided_report_relative_path",
         get_report_relative_path(category, organization, chart, version),
     )
+    cached_verification = None
+    if report_needed and not report_provided:
+        cached_verification = lookup_cached_verification(category, flags, chart_uri)
+    if cached_verification is not None:
+        outcome = "passed" if cached_verification.passed else "failed"
+        print(
+            f"[INFO] chart-verifier already ran on this chart, reusing its report (checks {outcome})"
+        )
+        gitutils.add_output("report_cached", True)
+        gitutils.add_output("cached_report_file", cached_verification.report_path)
+        gitutils.add_output(
+            "cached_report_info_file", cached_verification.report_info_path
+        )
+        report_needed = False
+        cluster_needed = False
+
     gitutils.add_output("report_needed", report_needed)
     gitutils.add_output("cluster_needed", cluster_needed)
     if report_needed:
@@ -0,0 +1,234 @@
+"""Native access to the read-only information of a chart-verifier report.
+
+The annotations, digests and metadata of a report are plain fields of report.yaml.
+ReportDocument parses the report once and exposes them in the same shapes as
+"chart-verifier report <type>", without starting a chart-verifier process or
+container. chart-verifier is still required to compute the results of a report under
+a given profile, see report_info.get_report_results.
+
+Note that, unlike chart-verifier, ReportDocument doesn't check the reportDigest of
+the report against its content. The digest is a hash of chart-verifier's in-memory
+report structures ("uint64:<hash>"), not of the report file, so it can't be recomputed
+here. has_wellformed_digest only rejects the digests that can't match any content.
+
+Reports are loaded with ReportLoader, which keeps floats and timestamps as written, the
+way chart-verifier reads these fields as strings: an unquoted testedOpenShiftVersion
+of 4.10 stays "4.10" instead of becoming 4.1.
+"""
+
+import hashlib
+import re
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+
+class ReportLoader(SafeLoader):
+    """SafeLoader keeping the text of floats and timestamps."""
+
+
+ReportLoader.add_constructor("tag:yaml.org,2002:float", ReportLoader.construct_yaml_str)
+ReportLoader.add_constructor(
+    "tag:yaml.org,2002:timestamp", ReportLoader.construct_yaml_str
+)
+
+ANNOTATIONS_PREFIX = "charts.openshift.io"
+
+# Format of the reportDigest written by chart-verifier: a decimal uint64
+_REPORT_DIGEST_PATTERN = re.compile(r"uint64:(0|[1-9][0-9]*)")
+_UINT64_MAX = 2**64 - 1
+
+# report.yaml field name -> name in the JSON output of chart-verifier, for the fields
+# of the Chart.yaml metadata of the chart. All fields are omitted when empty.
+_CHART_FIELDS = {
+    "name": "name",
+    "home": "home",
+    "sources": "sources",
+    "version": "version",
+    "description": "description",
+    "keywords": "keywords",
+    "maintainers": "maintainers",
+    "icon": "icon",
+    "apiversion": "apiVersion",
+    "condition": "condition",
+    "tags": "tags",
+    "appversion": "appVersion",
+    "deprecated": "deprecated",
+    "annotations": "annotations",
+    "kubeversion": "kubeVersion",
+    "dependencies": "dependencies",
+    "type": "type",
+}
+_CHART_STRING_FIELDS = {"version", "appversion", "kubeversion", "apiversion"}
+
+_DEPENDENCY_FIELDS = {
+    "name": "name",
+    "version": "version",
+    "repository": "repository",
+    "condition": "condition",
+    "tags": "tags",
+    "enabled": "enabled",
+    "importvalues": "import-values",
+    "alias": "alias",
+}
+
+
+def _omit_empty(fields, data):
+    """Rename the fields of a mapping, and drop the empty ones, the way Go's
+    encoding/json does for fields tagged "omitempty"."""
+    return {
+        fields.get(key, key): value
+        for key, value in (data or {}).items()
+        if value not in (None, "", [], {}, False)
+    }
+
+
+class ReportDocument:
+    """Parsed chart-verifier report.
+
+    Args:
+        report_data (dict): Content of the report.yaml file
+    """
+
+    def __init__(self, report_data):
+        self._data = report_data
+        self._tool = report_data["metadata"]["tool"]
+        self._chart = report_data["metadata"]["chart"]
+
+    @classmethod
+    def from_content(cls, content):
+        """Parse the content of a report.yaml file.
+
+        Raises:
+            yaml.YAMLError if the report is not valid YAML.
+            KeyError if the report doesn't have the metadata of a chart-verifier
+            report.
+        """
+        return cls(yaml.load(content, Loader=ReportLoader))
+
+    @classmethod
+    def load(cls, report_path):
+        """Parse a report.yaml file. A given report content is only parsed once."""
+        with open(report_path, "rb") as fd:
+            content = fd.read()
+        digest = hashlib.sha256(content).hexdigest()
+        if digest not in _documents:
+            _documents[digest] = cls.from_content(content)
+        return _documents[digest]
+
+    @property
+    def data(self):
+        """The raw content of the report."""
+        return self._data
+
+    @property
+    def report_digest(self):
+        return self._tool.get("reportDigest", "")
+
+    def has_wellformed_digest(self):
+        """Return False if the reportDigest of the report is missing or isn't in the
+        format written by chart-verifier. chart-verifier fails such a report with
+        report_info.SHA_ERROR, whatever its content."""
+        match = _REPORT_DIGEST_PATTERN.fullmatch(str(self.report_digest))
+        return match is not None and int(match.group(1)) <= _UINT64_MAX
+
+    @property
+    def profile_vendor_type(self):
+        return self._tool.get("profile", {}).get("VendorType", "")
+
+    @property
+    def profile_version(self):
+        return self._tool.get("profile", {}).get("version", "")
+
+    @property
+    def web_catalog_only(self):
+        return bool(
+            self._tool.get("webCatalogOnly")
+            or self._tool.get("providerControlledDelivery")
+        )
+
+    def get_annotations(self):
+        """Return the annotations of the report, as a mapping of names to values,
+        like report_info.get_report_annotations."""
+        annotations = {
+            f"{ANNOTATIONS_PREFIX}/digest": self._tool.get("digests", {}).get(
+                "chart", ""
+            ),
+            f"{ANNOTATIONS_PREFIX}/lastCertifiedTimestamp": str(
+                self._tool.get("lastCertifiedTimestamp", "")
+            ),
+        }
+        if "testedOpenShiftVersion" in self._tool:
+            annotations[f"{ANNOTATIONS_PREFIX}/testedOpenShiftVersion"] = str(
+                self._tool["testedOpenShiftVersion"]
+            )
+        else:
+            annotations[f"{ANNOTATIONS_PREFIX}/certifiedOpenShiftVersions"] = str(
+                self._tool.get("certifiedOpenShiftVersions", "")
+            )
+        annotations[f"{ANNOTATIONS_PREFIX}/supportedOpenShiftVersions"] = str(
+            self._tool.get("supportedOpenShiftVersions", "")
+        )
+
+        for name, value in (self._chart.get("annotations") or {}).items():
+            if name.startswith(f"{ANNOTATIONS_PREFIX}/"):
+                annotations[name] = value
+        return annotations
+
+    def get_digests(self):
+        """Return the digests of the report, like report_info.get_report_digests."""
+        digests = self._tool.get("digests") or {}
+        return {
+            "chart": digests.get("chart", ""),
+            "package": digests.get("package", ""),
+        } | _omit_empty({}, {"publicKey": digests.get("publicKey")})
+
+    def get_chart(self):
+        """Return the Chart.yaml metadata of the chart, like
+        report_info.get_report_chart."""
+        chart = {
+            key: str(value) if key in _CHART_STRING_FIELDS else value
+            for key, value in self._chart.items()
+        }
+        chart = _omit_empty(_CHART_FIELDS, chart)
+        if "maintainers" in chart:
+            chart["maintainers"] = [_omit_empty({}, m) for m in chart["maintainers"]]
+        if "dependencies" in chart:
+            chart["dependencies"] = [
+                _omit_empty(_DEPENDENCY_FIELDS, d) for d in chart["dependencies"]
+            ]
+        return chart
+
+    def get_chart_url(self):
+        """Return the URL of the chart, like report_info.get_report_chart_url."""
+        return self._tool.get("chart-uri", "")
+
+    def get_metadata(self):
+        """Return the metadata of the report, like report_info.get_report_metadata."""
+        return {
+            "vendorType": self.profile_vendor_type,
+            "profileVersion": self.profile_version,
+            "webCatalogOnly": self.web_catalog_only,
+            "chart-uri": self.get_chart_url(),
+            "chart": self.get_chart(),
+        }
+
+    def to_report_info(self):
+        """Return the report information in the format of "chart-verifier report
+        all", except for the results."""
+        return {
+            "annotations": [
+                {"name": name, "value": value}
+                for name, value in self.get_annotations().items()
+            ],
+            "digests": self.get_digests(),
+            "metadata": self.get_metadata(),
+        }
+
+
+# Parsed reports, by digest of their content
+_documents = {}
@@ -0,0 +1,159 @@
+"""Parity tests of the native report parser with chart-verifier
+
+The golden files in testdata/ hold the output of "chart-verifier report all" on
+reports of tests/data, along with the version of chart-verifier that produced it. They
+are regenerated with a real chart-verifier, installed on the PATH, by running this
+module from scripts/src:
+
+    python -m report.report_document_test
+
+If chart-verifier is installed, the parser is also compared to its live output on
+every report in tests/data.
+"""
+
+import glob
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from report import verification_cache
+from report.report_document import ReportDocument
+
+TESTS_DATA_DIR = os.path.join(os.path.dirname(__file__), "../../../tests/data")
+GOLDEN_DIR = os.path.join(os.path.dirname(__file__), "testdata")
+
+# Reports of tests/data with a golden file, by name of the golden file
+golden_reports = {
+    "HC-10-signed_chart-partner": "HC-10/signed_chart/report/partner/report.yaml",
+    "HC-17-dash-in-version-partner": "HC-17/dash-in-version/partner/report.yaml",
+}
+
+
+def as_comparable(report_info):
+    """Annotations are output in a non-deterministic order by chart-verifier."""
+    report_info = dict(report_info)
+    report_info.pop("results", None)
+    report_info["annotations"] = sorted(
+        report_info["annotations"], key=lambda annotation: annotation["name"]
+    )
+    return report_info
+
+
+def run_chart_verifier(report_path):
+    """Return the output of "chart-verifier report all", or None if chart-verifier
+    rejects the report."""
+    out = subprocess.run(
+        ["chart-verifier", "report", "all", os.path.abspath(report_path)],
+        capture_output=True,
+    )
+    if out.returncode != 0:
+        return None
+    return json.loads(out.stdout)
+
+
+def regenerate_golden_files():
+    """Write the golden files with the output of the installed chart-verifier."""
+    verifier_version = verification_cache.get_verifier_version()
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    for golden_name, report in golden_reports.items():
+        report_info = run_chart_verifier(os.path.join(TESTS_DATA_DIR, report))
+        if report_info is None:
+            raise RuntimeError(f"chart-verifier rejected {report}")
+        report_info.pop("results", None)
+        golden_path = os.path.join(GOLDEN_DIR, f"{golden_name}.json")
+        with open(golden_path, "w") as fd:
+            json.dump(
+                {
+                    "verifierVersion": verifier_version,
+                    "report": report,
+                    "reportInfo": report_info,
+                },
+                fd,
+                indent=2,
+                sort_keys=True,
+            )
+            fd.write("\n")
+        print(f"[INFO] {golden_path} written with chart-verifier {verifier_version}")
+
+
+@pytest.mark.parametrize(
+    "golden_path", sorted(glob.glob(os.path.join(GOLDEN_DIR, "*.json")))
+)
+def test_golden_report_info(golden_path):
+    with open(golden_path) as fd:
+        golden = json.load(fd)
+    assert golden["verifierVersion"]
+
+    document = ReportDocument.load(os.path.join(TESTS_DATA_DIR, golden["report"]))
+    assert as_comparable(document.to_report_info()) == as_comparable(
+        golden["reportInfo"]
+    )
+
+
+def test_getters():
+    report_path = os.path.join(
+        TESTS_DATA_DIR, golden_reports["HC-10-signed_chart-partner"]
+    )
+    document = ReportDocument.load(report_path)
+    assert ReportDocument.load(report_path) is document
+
+    assert document.get_digests()["publicKey"].startswith("678b498c")
+    assert document.get_annotations()["charts.openshift.io/testedOpenShiftVersion"] == (
+        "4.13"
+    )
+    assert document.get_metadata()["vendorType"] == "partner"
+    assert document.get_chart()["kubeVersion"] == ">= 1.14.0-0"
+    assert "deprecated" not in document.get_chart()
+
+
+@pytest.mark.skipif(
+    shutil.which("chart-verifier") is None, reason="chart-verifier is not installed"
+)
+@pytest.mark.parametrize(
+    "report_path",
+    sorted(glob.glob(os.path.join(TESTS_DATA_DIR, "**/report.yaml"), recursive=True)),
+)
+def test_live_verifier_parity(report_path):
+    expected = run_chart_verifier(report_path)
+    if expected is None:
+        pytest.skip(f"chart-verifier rejected {report_path}")
+
+    document = ReportDocument.load(report_path)
+    assert as_comparable(document.to_report_info()) == as_comparable(expected)
+
+
+@pytest.mark.parametrize(
+    "report_path",
+    sorted(glob.glob(os.path.join(TESTS_DATA_DIR, "**/report.yaml"), recursive=True)),
+)
+def test_wellformed_digest(report_path):
+    assert ReportDocument.load(report_path).has_wellformed_digest()
+
+
+def test_unquoted_scalars():
+    document = ReportDocument.from_content(b"""\
+kind: verify-report
+metadata:
+  tool:
+    lastCertifiedTimestamp: 2023-06-01T10:30:00.123456789Z
+    testedOpenShiftVersion: 4.10
+    supportedOpenShiftVersions: 4.10
+  chart:
+    name: awesome
+    version: 1.10
+results: []
+""")
+    annotations = document.get_annotations()
+    assert annotations["charts.openshift.io/testedOpenShiftVersion"] == "4.10"
+    assert annotations["charts.openshift.io/supportedOpenShiftVersions"] == "4.10"
+    assert annotations["charts.openshift.io/lastCertifiedTimestamp"] == (
+        "2023-06-01T10:30:00.123456789Z"
+    )
+    assert document.get_chart()["version"] == "1.10"
+
+
+if __name__ == "__main__":
+    regenerate_golden_files()
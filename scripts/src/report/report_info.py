@@ -1,19 +1,37 @@
+import copy
+import hashlib
 import json
 import os
-import subprocess
 import sys
+import threading
 
-import docker
+import yaml
+
+sys.path.append("../")
+from report import verifier_worker
+from report.report_document import ReportDocument
+from tools import cache, errorlog
 
 REPORT_ANNOTATIONS = "annotations"
 REPORT_RESULTS = "results"
 REPORT_DIGESTS = "digests"
 REPORT_METADATA = "metadata"
+REPORT_ALL = "all"
 SHA_ERROR = "Digest in report did not match report content"
 
+REPORT_INFO_CACHE_DIR_ENV = "REPORT_INFO_CACHE_DIR"
+
+# Output of "chart-verifier report all", by report info file or by cache file
+_report_outs = {}
+
 
 def write_error_log(*msg):
+    """Print the messages and write them to the errors file of the workflow. In a check
+    run by a CheckGraph, the messages are recorded as a finding of the check instead,
+    see tools.errorlog."""
     directory = os.environ.get("WORKFLOW_WORKING_DIRECTORY")
+    if errorlog.record(*msg):
+        directory = None
     if directory:
         os.makedirs(directory, exist_ok=True)
         with open(os.path.join(directory, "errors"), "w") as fd:
@@ -25,88 +43,121 @@ def write_error_log(*msg):
         print(line)
 
 
+def _run_report_command(report_path, info_type, profile_type, profile_version):
+    """Run "chart-verifier report" on a report, see verifier_worker.
+
+    Returns:
+        str: The output of the command
+    """
+    set_values = ""
+    if profile_type:
+        set_values = "profile.vendortype=%s" % profile_type
+    if profile_version:
+        if set_values:
+            set_values = "%s,profile.version=%s" % (set_values, profile_version)
+        else:
+            set_values = "profile.version=%s" % profile_version
+
+    worker = verifier_worker.get_worker(report_path)
+    return worker.run_report(report_path, info_type, set_values)
+
+
+def _get_cache_path(report_path, profile_type, profile_version):
+    with open(report_path, "rb") as fd:
+        report_digest = hashlib.sha256(fd.read()).hexdigest()
+    key = f"{report_digest}-{profile_type or ''}-{profile_version or ''}"
+    return os.path.join(
+        cache.get_cache_dir("report-info", REPORT_INFO_CACHE_DIR_ENV), f"{key}.json"
+    )
+
+
+def _load_report_out(report_path, report_info_path, profile_type, profile_version):
+    """Return the information extracted from a report by "chart-verifier report all".
+
+    The verifier is run at most once per report content and profile: its output is
+    memoized in-process and on disk.
+    """
+    if report_info_path and len(report_info_path) > 0:
+        if report_info_path not in _report_outs:
+            print(f"[INFO] Using existing report info: {report_info_path}")
+            with open(report_info_path) as fd:
+                _report_outs[report_info_path] = json.load(fd)
+        return _report_outs[report_info_path]
+
+    cache_path = _get_cache_path(report_path, profile_type, profile_version)
+    if cache_path in _report_outs:
+        return _report_outs[cache_path]
+
+    if os.path.exists(cache_path):
+        print(f"[INFO] Using cached report info: {cache_path}")
+        with open(cache_path) as fd:
+            _report_outs[cache_path] = json.load(fd)
+        return _report_outs[cache_path]
+
+    output = _run_report_command(report_path, REPORT_ALL, profile_type, profile_version)
+
+    if SHA_ERROR in output:
+        msg = f"[ERROR] {SHA_ERROR}"
+        write_error_log(msg)
+        sys.exit(1)
+
+    try:
+        report_out = json.loads(output)
+    except BaseException as err:
+        msgs = []
+        msgs.append(f"[ERROR] loading report output: /n{output}")
+        msgs.append(f"[ERROR] exception was: {err=}, {type(err)=}")
+        write_error_log(*msgs)
+        sys.exit(1)
+
+    tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as fd:
+        json.dump(report_out, fd)
+    os.replace(tmp_path, cache_path)
+
+    _report_outs[cache_path] = report_out
+    return report_out
+
+
+def _load_native_report_out(report_path):
+    """Read the information that doesn't depend on a profile from the report itself,
+    see report_document. Returns None if the report can't be parsed natively."""
+    try:
+        return ReportDocument.load(report_path).to_report_info()
+    except (yaml.YAMLError, KeyError, TypeError, AttributeError) as err:
+        print(f"[WARNING] Failed to parse {report_path}, using chart-verifier: {err}")
+        return None
+
+
+def _check_report_digest(report_path):
+    """Fail with SHA_ERROR, without running chart-verifier, if the report digest can't
+    match the report content, see ReportDocument.has_wellformed_digest. Reports that
+    can't be parsed natively are left to chart-verifier."""
+    try:
+        document = ReportDocument.load(report_path)
+    except (yaml.YAMLError, KeyError, TypeError, AttributeError):
+        return
+    if not document.has_wellformed_digest():
+        write_error_log(f"[ERROR] {SHA_ERROR}")
+        sys.exit(1)
+
+
 def _get_report_info(
     report_path, report_info_path, info_type, profile_type, profile_version
 ):
-    if report_info_path and len(report_info_path) > 0:
-        print(f"[INFO] Using existing report info: {report_info_path}")
-        report_out = json.load(open(report_info_path))
-    else:
-        command = "report"
-        set_values = ""
-        if profile_type:
-            set_values = "profile.vendortype=%s" % profile_type
-        if profile_version:
-            if set_values:
-                set_values = "%s,profile.version=%s" % (set_values, profile_version)
-            else:
-                set_values = "profile.version=%s" % profile_version
-
-        if os.environ.get("VERIFIER_IMAGE"):
-            print(f"[INFO] Generate report info using docker  : {report_path}")
-            docker_command = (
-                f"{command} {info_type} /charts/{os.path.basename(report_path)}"
-            )
-            if set_values:
-                docker_command = "%s --set %s" % (docker_command, set_values)
-
-            client = docker.from_env()
-            report_directory = os.path.dirname(os.path.abspath(report_path))
-            print(
-                f'Call docker using image: {os.environ.get("VERIFIER_IMAGE")}, docker command: {docker_command}, report directory: {report_directory}'
-            )
-            output = client.containers.run(
-                os.environ.get("VERIFIER_IMAGE"),
-                docker_command,
-                stdin_open=True,
-                tty=True,
-                stdout=True,
-                volumes={report_directory: {"bind": "/charts/", "mode": "rw"}},
-            )
-        else:
-            print(
-                f"[INFO] Generate report info using chart-verifier on path : {os.path.abspath(report_path)}"
-            )
-            if set_values:
-                out = subprocess.run(
-                    [
-                        "chart-verifier",
-                        command,
-                        info_type,
-                        "--set",
-                        set_values,
-                        os.path.abspath(report_path),
-                    ],
-                    capture_output=True,
-                )
-            else:
-                out = subprocess.run(
-                    [
-                        "chart-verifier",
-                        command,
-                        info_type,
-                        os.path.abspath(report_path),
-                    ],
-                    capture_output=True,
-                )
-            output = out.stdout.decode("utf-8")
-
-        if SHA_ERROR in output:
-            msg = f"[ERROR] {SHA_ERROR}"
-            write_error_log(msg)
-            sys.exit(1)
-
-        try:
-            report_out = json.loads(output)
-        except BaseException as err:
-            msgs = []
-            msgs.append(f"[ERROR] loading report output: /n{output}")
-            msgs.append(f"[ERROR] exception was: {err=}, {type(err)=}")
-            write_error_log(*msgs)
-            sys.exit(1)
+    if not report_info_path:
+        _check_report_digest(report_path)
+
+    report_out = None
+    if info_type != REPORT_RESULTS and not report_info_path:
+        report_out = _load_native_report_out(report_path)
+    if report_out is None:
+        report_out = _load_report_out(
+            report_path, report_info_path, profile_type, profile_version
+        )
 
     if info_type not in report_out:
-        msg = f"Error extracting {info_type} from the report:", report_out.strip()
+        msg = f"Error extracting {info_type} from the report: {report_out}"
         write_error_log(msg)
         sys.exit(1)
 
@@ -117,7 +168,7 @@ def _get_report_info(
 
         return annotations
 
-    return report_out[info_type]
+    return copy.deepcopy(report_out[info_type])
 
 
 def get_report_annotations(report_path=None, report_info_path=None):
@@ -164,6 +215,19 @@ def get_report_chart(report_path=None, report_info_path=None):
     return metadata["chart"]
 
 
+def get_report_info(
+    report_path=None, profile_type=None, profile_version=None, report_info_path=None
+):
+    """Return all the information of a report, as output by "chart-verifier report
+    all" for the given profile."""
+    if not report_info_path:
+        _check_report_digest(report_path)
+    report_out = _load_report_out(
+        report_path, report_info_path, profile_type, profile_version
+    )
+    return copy.deepcopy(report_out)
+
+
 def main():
     print("\n\n\n\nDocker image results:\n")
     os.environ["VERIFIER_IMAGE"] = "quay.io/redhat-certification/chart-verifier:main"
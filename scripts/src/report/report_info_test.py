@@ -0,0 +1,164 @@
+"""Unit tests for the extraction of information from chart-verifier reports"""
+
+import json
+import os
+
+import pytest
+
+from chartprreview import checkgraph
+from report import report_info, verifier_worker
+
+report_out = {
+    "annotations": [
+        {"name": "charts.openshift.io/digest", "value": "sha256:0123"},
+        {"name": "charts.openshift.io/testedOpenShiftVersion", "value": "4.12"},
+    ],
+    "digests": {"chart": "sha256:0123", "package": "abcd"},
+    "metadata": {
+        "chart-uri": "https://example.com/awesome-1.0.0.tgz",
+        "chart": {"name": "awesome", "version": "1.0.0"},
+    },
+    "results": {"passed": "12", "failed": "0", "message": []},
+}
+
+
+class FakeVerifierWorker:
+    def __init__(self):
+        self.calls = []
+
+    def run_report(self, report_path, info_type, set_values=""):
+        self.calls.append((report_path, info_type, set_values))
+        return json.dumps(report_out)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def verifier_calls(tmp_path, monkeypatch):
+    monkeypatch.setenv(report_info.REPORT_INFO_CACHE_DIR_ENV, str(tmp_path / "cache"))
+    monkeypatch.setattr(report_info, "_report_outs", {})
+
+    worker = FakeVerifierWorker()
+    verifier_worker.set_worker(worker)
+    yield worker.calls
+    verifier_worker.clear()
+
+
+def test_verifier_runs_once(tmp_path, monkeypatch, verifier_calls):
+    report_path = tmp_path / "report.yaml"
+    report_path.write_text("kind: verify-report\n")
+    report = str(report_path)
+
+    assert report_info.get_report_results(report)["passed"] == 12
+    # Results are converted on a copy, the memoized output is unchanged
+    assert report_info.get_report_results(report)["passed"] == 12
+
+    assert len(verifier_calls) == 1
+    assert verifier_calls[0] == (report, "all", "")
+
+    # A different profile requires a new run
+    report_info.get_report_results(report, "community", "v1.1")
+    assert len(verifier_calls) == 2
+    assert "profile.vendortype=community,profile.version=v1.1" in verifier_calls[1]
+
+    # A later workflow step uses the on-disk cache
+    monkeypatch.setattr(report_info, "_report_outs", {})
+    report_info.get_report_results(report)
+    assert len(verifier_calls) == 2
+
+    # A modified report is extracted again
+    report_path.write_text("kind: verify-report\nmodified: true\n")
+    report_info.get_report_results(report)
+    assert len(verifier_calls) == 3
+
+
+def test_native_report_info(verifier_calls):
+    report = os.path.join(
+        os.path.dirname(__file__),
+        "../../../tests/data/HC-10/signed_chart/report/partner/report.yaml",
+    )
+
+    assert report_info.get_report_chart(report)["name"] == "vault"
+    assert report_info.get_report_chart_url(report).endswith(
+        "vault-0.17.0.tgz?raw=true"
+    )
+    assert report_info.get_report_digests(report)["package"].startswith("6fb1fea4")
+    annotations = report_info.get_report_annotations(report)
+    assert annotations["charts.openshift.io/testedOpenShiftVersion"] == "4.13"
+    assert report_info.get_report_metadata(report)["profileVersion"] == "v1.2"
+    assert verifier_calls == []
+
+
+def test_native_report_info_fallback(tmp_path, verifier_calls):
+    report_path = tmp_path / "report.yaml"
+    report_path.write_text("kind: verify-report\n")
+
+    assert report_info.get_report_chart(str(report_path))["name"] == "awesome"
+    assert len(verifier_calls) == 1
+
+
+def test_existing_report_info(tmp_path, verifier_calls):
+    report_info_path = tmp_path / "report_info.json"
+    report_info_path.write_text(json.dumps(report_out))
+
+    digests = report_info.get_report_digests(report_info_path=str(report_info_path))
+    assert digests == report_out["digests"]
+    assert verifier_calls == []
+
+
+@pytest.mark.parametrize(
+    "report_digest",
+    ["", "sha256:0123", "uint64:-1", "uint64:18446744073709551616", "uint64:012"],
+)
+def test_malformed_report_digest(tmp_path, verifier_calls, report_digest):
+    report_path = tmp_path / "report.yaml"
+    report_path.write_text(
+        "kind: verify-report\n"
+        "metadata:\n"
+        "  tool:\n"
+        f"    reportDigest: '{report_digest}'\n"
+        "  chart:\n"
+        "    name: awesome\n"
+    )
+
+    with pytest.raises(SystemExit):
+        report_info.get_report_results(str(report_path))
+    with pytest.raises(SystemExit):
+        report_info.get_report_chart(str(report_path))
+    assert verifier_calls == []
+
+
+def test_malformed_report_digest_in_check(tmp_path, monkeypatch, verifier_calls):
+    monkeypatch.setenv("WORKFLOW_WORKING_DIRECTORY", str(tmp_path / "pr"))
+    report_path = tmp_path / "report.yaml"
+    report_path.write_text(
+        "kind: verify-report\n"
+        "metadata:\n"
+        "  tool:\n"
+        "    reportDigest: ''\n"
+        "  chart:\n"
+        "    name: awesome\n"
+    )
+
+    checks = checkgraph.CheckGraph()
+    checks.add("report-success", report_info.get_report_results, str(report_path))
+    findings = checks.run()
+
+    # Reported as a finding of the check, not in the errors file
+    assert checks.failed
+    assert [(f.check, f.messages) for f in findings] == [
+        ("report-success", [f"[ERROR] {report_info.SHA_ERROR}"])
+    ]
+    assert not (tmp_path / "pr").exists()
+
+
+def test_wellformed_report_digest(verifier_calls):
+    # The digest is well-formed but doesn't match: left to chart-verifier
+    report = os.path.join(
+        os.path.dirname(__file__),
+        "../../../tests/data/HC-19/report_sha_bad/report.yaml",
+    )
+
+    assert report_info.get_report_results(report)["passed"] == 12
+    assert len(verifier_calls) == 1
@@ -0,0 +1,217 @@
+"""Re-run the validation of the submitted reports of the repository.
+
+Every charts/<category>/<organization>/<chart>/<version>/report.yaml file, or only
+the ones changed since a given git ref, is validated with
+verifier_report.validate_report, the same checks the PR workflow runs on a submitted
+report. Reports are validated across a pool of processes, and one JSON line is
+written per report on the standard output, in the order of the report paths.
+
+The range of OCP versions of a report is derived from the kubeVersion of its chart
+with get-ocp-range, like in the PR workflow, unless a range is forced with
+--ocp-version-range. get-ocp-range runs once per distinct kubeVersion and process.
+
+The logs of the checks are written on the standard error.
+"""
+
+import argparse
+import concurrent.futures
+import contextlib
+import functools
+import glob
+import json
+import os
+import subprocess
+import sys
+
+from git import Repo
+
+sys.path.append("../")
+from report import verifier_report
+
+REPORT_GLOB = os.path.join("charts", "*", "*", "*", "*", "report.yaml")
+
+
+def find_reports(directory, changed_since=None):
+    """Find the submitted reports of the repository.
+
+    Args:
+        directory (str): Root of the repository
+        changed_since (str): If set, only return the reports changed since this git
+                             ref, including uncommitted changes
+
+    Returns:
+        list[str]: Sorted paths of the reports, relative to directory
+    """
+    reports = glob.glob(REPORT_GLOB, root_dir=directory)
+    if changed_since:
+        diff = Repo(directory).git.diff("--name-only", changed_since, "--", "charts")
+        changed = set(diff.splitlines())
+        reports = [report for report in reports if report in changed]
+    return sorted(reports)
+
+
+@functools.lru_cache(maxsize=None)
+def get_ocp_version_range(kube_version, executable="get-ocp-range"):
+    """Translate a range of Kubernetes versions into a range of OCP versions.
+
+    Raises:
+        subprocess.CalledProcessError if get-ocp-range fails.
+    """
+    out = subprocess.run(
+        [executable, kube_version], capture_output=True, check=True, text=True
+    )
+    return out.stdout.strip()
+
+
+def get_kube_version(report_data):
+    """Return the kubeVersion of the chart of a report, or an empty string if the
+    report doesn't record one.
+
+    Raises:
+        ValueError if the report, its metadata or its chart section is not a mapping.
+    """
+    if not isinstance(report_data, dict):
+        raise ValueError("report is not a mapping")
+    metadata = report_data.get("metadata") or {}
+    if not isinstance(metadata, dict):
+        raise ValueError("metadata section is not a mapping")
+    chart = metadata.get("chart") or {}
+    if not isinstance(chart, dict):
+        raise ValueError("chart metadata section is not a mapping")
+    return str(chart.get("kubeversion") or "")
+
+
+def revalidate_report(directory, report_path, ocp_version_range=None):
+    """Validate one report.
+
+    Args:
+        directory (str): Root of the repository
+        report_path (str): Path to the report, relative to directory
+        ocp_version_range (str): Range of OCP versions to validate the report against.
+                                 Defaults to the range derived from the kubeVersion
+                                 of the chart.
+
+    Returns:
+        dict: The outcome of the validation, as written in the JSONL output
+    """
+    result = {"report": report_path, "valid": False, "errors": []}
+
+    # Keep the standard output for the JSONL results
+    with contextlib.redirect_stdout(sys.stderr):
+        is_valid_yaml, report_data = verifier_report.get_report_data(
+            os.path.join(directory, report_path)
+        )
+        if not is_valid_yaml:
+            result["errors"].append(f"Report is not valid yaml: {report_path}")
+            return result
+
+        try:
+            kube_version = get_kube_version(report_data)
+        except ValueError as err:
+            result["errors"].append(
+                f"Report is incomplete and cannot be processed: {report_path}: {err}"
+            )
+            return result
+
+        if ocp_version_range is None:
+            # Without kubeVersion, the has-kubeversion check fails and the range is
+            # not used
+            ocp_version_range = ""
+            if kube_version:
+                try:
+                    ocp_version_range = get_ocp_version_range(kube_version)
+                except (OSError, subprocess.CalledProcessError) as err:
+                    result["errors"].append(
+                        f"Failed to get the OCP version range of kubeVersion {kube_version}: {err}"
+                    )
+                    return result
+        result["ocpVersionRange"] = ocp_version_range
+
+        validation = verifier_report.validate_report(
+            report_data, ocp_version_range, report_path
+        )
+
+    result["valid"] = validation.valid
+    result["errors"] = validation.errors
+    if validation.tested_version is not None:
+        result["testedVersion"] = str(validation.tested_version)
+    return result
+
+
+def revalidate_reports(directory, reports, ocp_version_range=None, max_workers=None):
+    """Validate reports across a pool of processes.
+
+    Args:
+        directory (str): Root of the repository
+        reports (list[str]): Paths to the reports, relative to directory
+        ocp_version_range (str): See revalidate_report
+        max_workers (int): Number of processes, defaults to the number of CPUs
+
+    Yields:
+        dict: The outcome of the validation of each report, in the order of reports
+    """
+    validate = functools.partial(
+        revalidate_report, directory, ocp_version_range=ocp_version_range
+    )
+    max_workers = max_workers or os.cpu_count() or 1
+    # Large chunks amortize the transfers between processes, while still leaving a
+    # few chunks per process to balance the load
+    chunksize = max(1, len(reports) // (4 * max_workers))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        yield from executor.map(validate, reports, chunksize=chunksize)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Validate all the submitted reports of the repository"
+    )
+    parser.add_argument(
+        "-d",
+        "--directory",
+        dest="directory",
+        type=str,
+        default=".",
+        help="Root directory of the repository",
+    )
+    parser.add_argument(
+        "--changed-since",
+        dest="changed_since",
+        type=str,
+        default=None,
+        help="Only validate the reports changed since this git ref",
+    )
+    parser.add_argument(
+        "-r",
+        "--ocp-version-range",
+        dest="ocp_version_range",
+        type=str,
+        default=None,
+        help="Validate all reports against this range of OCP versions, instead of "
+        "the range derived from the kubeVersion of each chart",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        dest="jobs",
+        type=int,
+        default=None,
+        help="Number of processes, defaults to the number of CPUs",
+    )
+    args = parser.parse_args()
+
+    reports = find_reports(args.directory, args.changed_since)
+    print(f"[INFO] Validating {len(reports)} reports", file=sys.stderr)
+
+    invalid = 0
+    for result in revalidate_reports(
+        args.directory, reports, args.ocp_version_range, args.jobs
+    ):
+        print(json.dumps(result), flush=True)
+        invalid += not result["valid"]
+
+    print(
+        f"[INFO] {len(reports) - invalid} valid reports, {invalid} invalid reports",
+        file=sys.stderr,
+    )
+    if invalid:
+        sys.exit(1)
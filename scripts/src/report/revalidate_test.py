@@ -0,0 +1,122 @@
+"""Unit tests for the bulk validation of the reports of the repository
+
+The repository is a temporary git repository holding copies of the reports of
+tests/data, and get-ocp-range is replaced by a script translating every range of
+Kubernetes versions to ">=4.2".
+"""
+
+import os
+import shutil
+
+import pytest
+from git import Repo
+
+from report import revalidate
+
+TESTS_DATA_DIR = os.path.join(os.path.dirname(__file__), "../../../tests/data")
+
+valid_report = "charts/partners/acme/awesome/0.1.0/report.yaml"
+invalid_report = "charts/partners/acme/awesome/0.2.0/report.yaml"
+
+
+@pytest.fixture
+def repository(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    get_ocp_range = bin_dir / "get-ocp-range"
+    get_ocp_range.write_text("#!/bin/sh\necho '>=4.2'\n")
+    get_ocp_range.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    revalidate.get_ocp_version_range.cache_clear()
+
+    repo_dir = tmp_path / "repo"
+    for report in (valid_report, invalid_report):
+        os.makedirs(repo_dir / os.path.dirname(report))
+        shutil.copy(
+            os.path.join(TESTS_DATA_DIR, "common/partner/report.yaml"),
+            repo_dir / report,
+        )
+    # Tested OCP version outside of the supported range
+    report = (repo_dir / invalid_report).read_text()
+    (repo_dir / invalid_report).write_text(
+        report.replace(
+            'testedOpenShiftVersion: "4.13"', 'testedOpenShiftVersion: "4.1"'
+        )
+    )
+
+    repo = Repo.init(repo_dir)
+    repo.config_writer().set_value("user", "name", "test").release()
+    repo.config_writer().set_value("user", "email", "test@example.com").release()
+    repo.git.add("charts")
+    repo.git.commit("-m", "Add reports")
+    return str(repo_dir)
+
+
+def test_find_reports(repository):
+    assert revalidate.find_reports(repository) == [valid_report, invalid_report]
+    assert revalidate.find_reports(repository, "HEAD") == []
+
+    with open(os.path.join(repository, invalid_report), "a") as fd:
+        fd.write("\n")
+    assert revalidate.find_reports(repository, "HEAD") == [invalid_report]
+
+
+def test_revalidate_reports(repository):
+    results = list(
+        revalidate.revalidate_reports(
+            repository, [valid_report, invalid_report], max_workers=2
+        )
+    )
+    assert results == [
+        {
+            "report": valid_report,
+            "valid": True,
+            "errors": [],
+            "ocpVersionRange": ">=4.2",
+            "testedVersion": "4.13.0",
+        },
+        {
+            "report": invalid_report,
+            "valid": False,
+            "errors": [
+                "Tested OpenShift version 4.1.0 not within specified kube-versions : >=4.2",
+                "Tested OpenShift version 4.1.0 not within supported versions : >=4.2",
+            ],
+            "ocpVersionRange": ">=4.2",
+            "testedVersion": "4.1.0",
+        },
+    ]
+
+
+def test_revalidate_report_forced_range(repository):
+    result = revalidate.revalidate_report(repository, valid_report, ">=4.7")
+    assert not result["valid"]
+    assert result["ocpVersionRange"] == ">=4.7"
+
+
+def test_revalidate_report_get_ocp_range_failure(repository, monkeypatch):
+    monkeypatch.setenv("PATH", "")
+    revalidate.get_ocp_version_range.cache_clear()
+    result = revalidate.revalidate_report(repository, valid_report)
+    assert not result["valid"]
+    assert result["errors"][0].startswith(
+        "Failed to get the OCP version range of kubeVersion >= 1.14.0-0"
+    )
+
+
+@pytest.mark.parametrize(
+    "content", ["- a list\n", "metadata: not a mapping\n", "metadata:\n  chart: 1\n"]
+)
+def test_revalidate_malformed_report(repository, content):
+    with open(os.path.join(repository, invalid_report), "w") as fd:
+        fd.write(content)
+    results = list(
+        revalidate.revalidate_reports(
+            repository, [valid_report, invalid_report], max_workers=1
+        )
+    )
+    assert results[0]["valid"]
+    assert not results[1]["valid"]
+    assert results[1]["errors"][0].startswith(
+        f"Report is incomplete and cannot be processed: {invalid_report}"
+    )
@@ -0,0 +1,158 @@
+"""Cache of the verification of chart submissions.
+
+Re-runs of the PR workflow on an identical submission (draft toggle, label change,
+re-push of the same tarball) produce an identical report. The cache stores, for a
+given verification, the report, its report info (the output of "chart-verifier
+report all") and the outcome of chartprreview.check_report_success, so that the
+verification doesn't need to be run again.
+
+Only the verifications of chart tarballs run in the workflow are cached. An entry is
+keyed by:
+
+* the digest of the chart tarball,
+* the version of the installed chart-verifier,
+* the vendor type and the version of the profile the verifier was asked to use. An
+  empty profile version stands for the default profile of the vendor type, which is
+  determined by the version of chart-verifier.
+
+The key is never computed from the content of a report, which a PR author may have
+written: a submitted report can't be passed off as a verification run in the workflow.
+
+Entries live in <cache dir>/<key>/, where the cache dir can be overridden with the
+VERIFICATION_CACHE_DIR environment variable.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+from dataclasses import dataclass
+
+from tools import cache, digest
+
+VERIFICATION_CACHE_DIR_ENV = "VERIFICATION_CACHE_DIR"
+
+REPORT_FILE = "report.yaml"
+REPORT_INFO_FILE = "report_info.json"
+OUTCOME_FILE = "outcome.json"
+
+
+@dataclass
+class VerificationEntry:
+    """Cached verification.
+
+    Attributes:
+        report_path (str): Path to the cached report.yaml
+        report_info_path (str): Path to the cached report info
+        passed (bool): Whether check_report_success passed on this report
+    """
+
+    report_path: str
+    report_info_path: str
+    passed: bool
+
+
+def _normalize_version(version):
+    return str(version).strip().removeprefix("v")
+
+
+def get_cache_key(chart_digest, verifier_version, vendor_type, profile_version=""):
+    """Return the key of a verification.
+
+    Args:
+        chart_digest (str): sha256 digest of the chart tarball
+        verifier_version (str): Version of chart-verifier
+        vendor_type (str): Vendor type of the profile, such as "partner"
+        profile_version (str): Version of the profile, or "" for the default profile
+    """
+    key = json.dumps(
+        [
+            chart_digest,
+            _normalize_version(verifier_version),
+            vendor_type,
+            _normalize_version(profile_version) if profile_version else "",
+        ]
+    )
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def get_verifier_version(executable="chart-verifier"):
+    """Return the version of the installed chart-verifier.
+
+    Raises:
+        OSError if chart-verifier is not installed.
+        subprocess.CalledProcessError if chart-verifier fails.
+    """
+    out = subprocess.run(
+        [executable, "version"], capture_output=True, check=True, text=True
+    )
+    return _normalize_version(out.stdout.split()[-1])
+
+
+def get_chart_cache_key(chart_path, vendor_type):
+    """Return the key of the verification of a chart tarball by the installed
+    chart-verifier, with the default profile of the vendor type.
+
+    Raises:
+        OSError if the tarball can't be read or chart-verifier is not installed.
+        subprocess.CalledProcessError if chart-verifier fails.
+    """
+    return get_cache_key(
+        digest.hash_file(chart_path), get_verifier_version(), vendor_type
+    )
+
+
+def _get_entry_dir(key):
+    return os.path.join(
+        cache.get_cache_dir("verification", VERIFICATION_CACHE_DIR_ENV), key
+    )
+
+
+def lookup(key):
+    """Return the cached verification for a key, or None if there isn't any."""
+    entry_dir = _get_entry_dir(key)
+    try:
+        with open(os.path.join(entry_dir, OUTCOME_FILE)) as fd:
+            outcome = json.load(fd)
+    except (OSError, ValueError):
+        return None
+
+    print(f"[INFO] Verification found in cache: {key}")
+    return VerificationEntry(
+        os.path.join(entry_dir, REPORT_FILE),
+        os.path.join(entry_dir, REPORT_INFO_FILE),
+        outcome["passed"],
+    )
+
+
+def store(key, report_path, report_info, passed):
+    """Add a verification to the cache.
+
+    Args:
+        key (str): Key of the verification, see get_cache_key
+        report_path (str): Path to the report.yaml file
+        report_info (dict): Report info, as returned by report_info.get_report_info
+        passed (bool): Whether check_report_success passed on this report
+
+    Returns:
+        VerificationEntry: The cached verification
+    """
+    entry_dir = _get_entry_dir(key)
+    os.makedirs(entry_dir, exist_ok=True)
+    outcome_path = os.path.join(entry_dir, OUTCOME_FILE)
+    if os.path.exists(outcome_path):
+        os.remove(outcome_path)
+
+    cached_report_path = os.path.join(entry_dir, REPORT_FILE)
+    # The report is already in the cache if the verification was reused
+    if os.path.abspath(report_path) != os.path.abspath(cached_report_path):
+        shutil.copyfile(report_path, cached_report_path)
+    with open(os.path.join(entry_dir, REPORT_INFO_FILE), "w") as fd:
+        json.dump(report_info, fd)
+    # The outcome is written last: an entry without it is incomplete and ignored
+    with open(outcome_path, "w") as fd:
+        json.dump({"passed": passed}, fd)
+
+    print(f"[INFO] Verification added to cache: {key}")
+    return lookup(key)
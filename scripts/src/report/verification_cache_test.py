@@ -0,0 +1,61 @@
+"""Unit tests for the cache of the verification of chart submissions"""
+
+import hashlib
+import json
+import os
+
+import pytest
+
+from report import verification_cache
+
+REPORT_PATH = os.path.join(
+    os.path.dirname(__file__), "../../../tests/data/common/partner/report.yaml"
+)
+REPORT_INFO = {"results": {"passed": "1", "failed": "0", "message": []}}
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv(verification_cache.VERIFICATION_CACHE_DIR_ENV, str(tmp_path))
+    return tmp_path
+
+
+def test_get_cache_key():
+    key = verification_cache.get_cache_key("abc", "1.12.2", "partner", "v1.2")
+    assert key == verification_cache.get_cache_key("abc", "v1.12.2", "partner", "1.2")
+    assert key != verification_cache.get_cache_key("abc", "1.12.2", "partner")
+    assert key != verification_cache.get_cache_key("abc", "1.13.0", "partner", "v1.2")
+    assert key != verification_cache.get_cache_key("abd", "1.12.2", "partner", "v1.2")
+
+
+def test_get_chart_cache_key(tmp_path, monkeypatch):
+    chart_path = tmp_path / "chart-1.0.0.tgz"
+    chart_path.write_bytes(b"chart")
+    monkeypatch.setattr(verification_cache, "get_verifier_version", lambda: "1.13.0")
+
+    key = verification_cache.get_chart_cache_key(str(chart_path), "partner")
+    assert key == verification_cache.get_cache_key(
+        hashlib.sha256(b"chart").hexdigest(), "1.13.0", "partner"
+    )
+
+
+def test_store_and_lookup():
+    assert verification_cache.lookup("key") is None
+
+    entry = verification_cache.store("key", REPORT_PATH, REPORT_INFO, True)
+    assert entry == verification_cache.lookup("key")
+    assert entry.passed
+    with open(entry.report_path) as cached, open(REPORT_PATH) as report:
+        assert cached.read() == report.read()
+    with open(entry.report_info_path) as fd:
+        assert json.load(fd) == REPORT_INFO
+
+    # Storing the outcome of a reused verification
+    entry = verification_cache.store("key", entry.report_path, REPORT_INFO, False)
+    assert not verification_cache.lookup("key").passed
+
+
+def test_lookup_incomplete_entry(cache_dir):
+    os.makedirs(cache_dir / "key")
+    (cache_dir / "key" / verification_cache.REPORT_FILE).write_text("")
+    assert verification_cache.lookup("key") is None
@@ -24,17 +24,14 @@ These are not comprehensive lists - other certification checks will preform furt
 """
 
 import sys
+from dataclasses import dataclass, field
 
 import semantic_version
 import yaml
 
-try:
-    from yaml import CSafeLoader as SafeLoader
-except ImportError:
-    from yaml import SafeLoader
-
 sys.path.append("../")
-from report import report_info
+from report.report_document import ReportDocument, ReportLoader
+from tools import versions
 
 MIN_SUPPORTED_OPENSHIFT_VERSION = semantic_version.SimpleSpec(">=4.1.0")
 TESTED_VERSION_ANNOTATION = "charts.openshift.io/testedOpenShiftVersion"
@@ -50,6 +47,8 @@ class ConfigKeyMissing(Exception):
 def get_report_data(report_path):
     """Load and returns the report data contained in report.yaml
 
+    Floats and timestamps are kept as written, see report_document.ReportLoader.
+
     Args:
         report_path (str): Path to the report.yaml file.
 
@@ -59,7 +58,7 @@ def get_report_data(report_path):
     """
     try:
         with open(report_path) as report_data:
-            report_content = yaml.load(report_data, Loader=SafeLoader)
+            report_content = yaml.load(report_data, Loader=ReportLoader)
         return True, report_content
     except Exception as err:
         print(f"Exception 2 loading file: {err}")
@@ -211,6 +210,148 @@ def report_is_valid(report_data):
     return outcome
 
 
+@dataclass
+class ReportValidation:
+    """Outcome of the validation of a report.
+
+    Attributes:
+        errors (list[str]): Error messages of the checks that failed, in the order the
+                            checks are run. Checks that depend on a failed check are
+                            not run.
+        tested_version (semantic_version.Version): Tested OpenShift version, if valid
+        supported_versions (semantic_version.NpmSpec): Supported OpenShift versions, if
+                                                       valid
+    """
+
+    errors: list = field(default_factory=list)
+    tested_version: semantic_version.Version = None
+    supported_versions: semantic_version.NpmSpec = None
+
+    @property
+    def valid(self):
+        return not self.errors
+
+    @property
+    def message(self):
+        return self.errors[0] if self.errors else ""
+
+
+def validate_report(report_data, ocp_version_range, report_path=None):
+    """Run all the checks of validate against the content of a report.
+
+    The report is wrapped in a single ReportDocument, used by all the checks, and the
+    versions and version ranges are parsed once per process, see tools.versions.
+    Unlike validate, this doesn't stop at the first failed check when the following
+    checks don't depend on it.
+
+    Args:
+        report_data (dict): The content of report.yaml
+        ocp_version_range (str): Range of supported OCP versions
+        report_path (str): Path to the report.yaml file, only used in messages
+
+    Returns:
+        ReportValidation: the results of all the checks
+    """
+    validation = ReportValidation()
+
+    if not report_is_valid(report_data):
+        message = "Report is incomplete and cannot be processed"
+        if report_path:
+            message = f"{message}: {report_path}"
+        validation.errors.append(message)
+        return validation
+
+    # No value in checking if chart testing failed
+    chart_testing_outcome, _ = get_chart_testing_result(report_data)
+    if not chart_testing_outcome:
+        print("[INFO] Chart testing failed so skip report checking")
+        return validation
+
+    profile_version_string = get_profile_version(report_data)
+    try:
+        profile_version = versions.coerce(profile_version_string)
+    except ValueError:
+        message = f"Invalid profile version in report : {profile_version_string}"
+        print(message)
+        validation.errors.append(message)
+        return validation
+    v1_0_profile = profile_version.major == 1 and profile_version.minor == 0
+
+    document = ReportDocument(report_data)
+    annotations = document.get_annotations()
+
+    if v1_0_profile:
+        tested_version_annotation = CERTIFIED_VERSION_ANNOTATION
+    else:
+        tested_version_annotation = TESTED_VERSION_ANNOTATION
+
+    if tested_version_annotation not in annotations:
+        validation.errors.append(
+            f"No annotation provided for {tested_version_annotation}"
+        )
+        return validation
+    tested_version_string = annotations[tested_version_annotation]
+
+    try:
+        validation.tested_version = versions.coerce(tested_version_string)
+    except ValueError:
+        validation.errors.append(
+            f"{tested_version_annotation} {tested_version_string} is not a valid semantic version."
+        )
+        return validation
+    if validation.tested_version not in MIN_SUPPORTED_OPENSHIFT_VERSION:
+        validation.errors.append(
+            f"{tested_version_annotation} {tested_version_string} is not a supported OpenShift version."
+        )
+
+    if v1_0_profile:
+        return validation
+
+    # Without a kubeVersion, there is no range of OCP versions to check against. The
+    # failed has-kubeversion check is reported by the checks of the results.
+    has_kubeversion_outcome, reason = get_has_kubeversion_result(report_data)
+    if not has_kubeversion_outcome:
+        if reason == "Not Found":
+            validation.errors.append("Missing has-kubeversion check in report")
+        return validation
+
+    chart = document.get_chart()
+    kube_supported_versions = versions.npm_spec(ocp_version_range)
+    if validation.tested_version not in kube_supported_versions:
+        validation.errors.append(
+            f"Tested OpenShift version {str(validation.tested_version)} not within specified kube-versions : {ocp_version_range}"
+        )
+
+    if SUPPORTED_VERSIONS_ANNOTATION not in annotations:
+        validation.errors.append(
+            f"Missing annotation in report: {SUPPORTED_VERSIONS_ANNOTATION}"
+        )
+        return validation
+    supported_versions_string = annotations[SUPPORTED_VERSIONS_ANNOTATION]
+
+    try:
+        validation.supported_versions = versions.npm_spec(supported_versions_string)
+    except ValueError:
+        validation.errors.append(
+            f"{SUPPORTED_VERSIONS_ANNOTATION}: {supported_versions_string} is not a valid semantic version."
+        )
+        return validation
+
+    if validation.tested_version not in validation.supported_versions:
+        validation.errors.append(
+            f"Tested OpenShift version {str(validation.tested_version)} not within supported versions : {supported_versions_string}"
+        )
+
+    if supported_versions_string and supported_versions_string != str(
+        kube_supported_versions
+    ):
+        validation.errors.append(
+            f"Kube Version {chart.get(KUBE_VERSION_ATTRIBUTE)} -> {str(kube_supported_versions)} does not match supportedOpenShiftVersions: {supported_versions_string}"
+        )
+
+    return validation
+
+
 def validate(report_path, ocp_version_range):
     """Validate report.yaml by running a serie of checks.
 
@@ -221,6 +362,8 @@ def validate(report_path, ocp_version_range):
     * Checks that the expected annotation is present.
     * Checks that the reported version of OCP and Kubernetes are valid and are coherent.
 
+    The report is read and parsed once, see validate_report.
+
     Args:
         report_path (str): Path to the report.yaml file
         ocp_version_range (str): Range of supported OCP versions
@@ -228,101 +371,15 @@ def validate(report_path, ocp_version_range):
     Returns:
         (bool, str): if the checks all passed, this returns a bool set to True and an
                      empty str. Otherwise, this returns a bool set to True and the
-                     corresponding error message.
+                     message of the first failed check. The messages of the other
+                     failed checks are printed.
     """
     is_valid_yaml, report_data = get_report_data(report_path)
 
     if not is_valid_yaml:
         return False, f"Report is not valid yaml: {report_path}"
 
-    if not report_is_valid(report_data):
-        return False, f"Report is incomplete and cannot be processed: {report_path}"
-
-    # No value in checking if chart testing failed
-    chart_testing_outcome, _ = get_chart_testing_result(report_data)
-    if chart_testing_outcome:
-        profile_version_string = get_profile_version(report_data)
-
-        try:
-            profile_version = semantic_version.Version.coerce(profile_version_string)
-            v1_0_profile = False
-            if profile_version.major == 1 and profile_version.minor == 0:
-                v1_0_profile = True
-        except ValueError:
-            message = f"Invalid profile version in report : {profile_version_string}"
-            print(message)
-            return False, message
-
-        annotations = report_info.get_report_annotations(report_path)
-
-        if v1_0_profile:
-            tested_version_annotation = CERTIFIED_VERSION_ANNOTATION
-        else:
-            tested_version_annotation = TESTED_VERSION_ANNOTATION
-
-        if tested_version_annotation in annotations:
-            tested_version_string = annotations[tested_version_annotation]
-        else:
-            return False, f"No annotation provided for {tested_version_annotation}"
-
-        try:
-            tested_version = semantic_version.Version.coerce(tested_version_string)
-            if tested_version not in MIN_SUPPORTED_OPENSHIFT_VERSION:
-                return (
-                    False,
-                    f"{tested_version_annotation} {tested_version_string} is not a supported OpenShift version.",
-                )
-        except ValueError:
-            return (
-                False,
-                f"{tested_version_annotation} {tested_version_string} is not a valid semantic version.",
-            )
-
-        has_kubeversion_outcome, _ = get_chart_testing_result(report_data)
-        if has_kubeversion_outcome:
-            if not v1_0_profile:
-                chart = report_info.get_report_chart(report_path)
-                kube_supported_versions = semantic_version.NpmSpec(ocp_version_range)
-
-                if tested_version not in kube_supported_versions:
-                    return (
-                        False,
-                        f"Tested OpenShift version {str(tested_version)} not within specified kube-versions : {ocp_version_range}",
-                    )
-
-                if SUPPORTED_VERSIONS_ANNOTATION in annotations:
-                    supported_versions_string = annotations[
-                        SUPPORTED_VERSIONS_ANNOTATION
-                    ]
-                    try:
-                        supported_versions = semantic_version.NpmSpec(
-                            supported_versions_string
-                        )
-                    except ValueError:
-                        return (
-                            False,
-                            f"{SUPPORTED_VERSIONS_ANNOTATION}: {supported_versions_string} is not a valid semantic version.",
-                        )
-                else:
-                    return (
-                        False,
-                        f"Missing annotation in report: {SUPPORTED_VERSIONS_ANNOTATION}",
-                    )
-
-                if tested_version not in supported_versions:
-                    return (
-                        False,
-                        f"Tested OpenShift version {str(tested_version)} not within supported versions : {supported_versions_string}",
-                    )
-
-                if supported_versions_string and supported_versions_string != str(
-                    kube_supported_versions
-                ):
-                    return (
-                        False,
-                        f"Kube Version {chart[KUBE_VERSION_ATTRIBUTE]} -> {str(kube_supported_versions)} does not match supportedOpenShiftVersions: {supported_versions_string}",
-                    )
-    else:
-        print("[INFO] Chart testing failed so skip report checking")
-
-    return True, ""
+    validation = validate_report(report_data, ocp_version_range, report_path)
+    for error in validation.errors[1:]:
+        print(f"[ERROR] {error}")
+    return validation.valid, validation.message
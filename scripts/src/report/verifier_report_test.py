@@ -0,0 +1,82 @@
+"""Unit tests for the validation of report.yaml"""
+
+import copy
+import os
+
+import pytest
+
+from report import verifier_report
+
+REPORT_PATH = os.path.join(
+    os.path.dirname(__file__), "../../../tests/data/common/partner/report.yaml"
+)
+
+
+@pytest.fixture
+def report_data():
+    _, report_data = verifier_report.get_report_data(REPORT_PATH)
+    return copy.deepcopy(report_data)
+
+
+def test_validate():
+    assert verifier_report.validate(REPORT_PATH, ">=4.2") == (True, "")
+
+    valid, message = verifier_report.validate(REPORT_PATH, ">=4.7")
+    assert not valid
+    assert message == (
+        "Kube Version >= 1.14.0-0 -> >=4.7 does not match "
+        "supportedOpenShiftVersions: >=4.2"
+    )
+
+
+def test_validate_report(report_data):
+    validation = verifier_report.validate_report(report_data, ">=4.2")
+    assert validation.valid
+    assert str(validation.tested_version) == "4.13.0"
+    assert str(validation.supported_versions) == ">=4.2"
+
+
+def test_validate_report_incomplete(report_data):
+    del report_data["results"]
+    validation = verifier_report.validate_report(report_data, ">=4.2", REPORT_PATH)
+    assert validation.errors == [
+        f"Report is incomplete and cannot be processed: {REPORT_PATH}"
+    ]
+
+
+def test_validate_report_collects_errors(report_data):
+    report_data["metadata"]["tool"]["testedOpenShiftVersion"] = "4.1"
+    validation = verifier_report.validate_report(report_data, ">=4.7")
+
+    # All the OCP range checks are run, even after the first failure
+    assert validation.errors == [
+        "Tested OpenShift version 4.1.0 not within specified kube-versions : >=4.7",
+        "Tested OpenShift version 4.1.0 not within supported versions : >=4.2",
+        "Kube Version >= 1.14.0-0 -> >=4.7 does not match supportedOpenShiftVersions: >=4.2",
+    ]
+
+
+def test_validate_report_invalid_profile_version(report_data):
+    report_data["metadata"]["tool"]["profile"]["version"] = "vnext"
+    validation = verifier_report.validate_report(report_data, ">=4.2")
+    assert validation.errors == ["Invalid profile version in report : next"]
+
+
+def test_validate_report_chart_testing_failed(report_data):
+    for result in report_data["results"]:
+        if "chart-testing" in result["check"]:
+            result["outcome"] = "FAIL"
+    report_data["metadata"]["tool"]["testedOpenShiftVersion"] = "not a version"
+
+    # The report is not checked further
+    assert verifier_report.validate_report(report_data, ">=4.2").valid
+
+
+def test_validate_report_missing_has_kubeversion(report_data):
+    report_data["results"] = [
+        result
+        for result in report_data["results"]
+        if not result["check"].endswith("/has-kubeversion")
+    ]
+    validation = verifier_report.validate_report(report_data, ">=4.7")
+    assert validation.errors == ["Missing has-kubeversion check in report"]
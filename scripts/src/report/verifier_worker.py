@@ -0,0 +1,185 @@
+"""Workers running chart-verifier commands on behalf of report_info.
+
+When VERIFIER_IMAGE is set, chart-verifier runs in a container. Instead of creating a
+container for each command, a DockerVerifierWorker starts one long-lived container
+per report directory, bound read-only, and runs each command in it with "docker exec".
+The standard error of a failed command is logged. The image is
+pulled if it isn't available locally. The container is removed when the process
+exits. Workers are shared by the threads of the process, such as the checks of
+chart-pr-review.
+
+Otherwise, a LocalVerifierWorker runs the chart-verifier executable found on the
+PATH. It can also be pointed at another executable, for instance a fake verifier in
+tests.
+"""
+
+import atexit
+import os
+import subprocess
+import threading
+
+import docker
+
+VERIFIER_IMAGE_ENV = "VERIFIER_IMAGE"
+CHARTS_MOUNT = "/charts"
+
+
+def _report_args(info_type, report_path, set_values):
+    args = ["report", info_type]
+    if set_values:
+        args += ["--set", set_values]
+    return args + [report_path]
+
+
+def _log_failure(exit_code, stderr):
+    print(f"[ERROR] chart-verifier failed with exit code {exit_code}")
+    if stderr:
+        print(stderr.decode("utf-8", errors="replace"))
+
+
+class LocalVerifierWorker:
+    """Run chart-verifier commands with a local executable.
+
+    Args:
+        executable (str): Path to the chart-verifier executable
+    """
+
+    def __init__(self, executable="chart-verifier"):
+        self.executable = executable
+
+    def run_report(self, report_path, info_type, set_values=""):
+        """Run "chart-verifier report".
+
+        Args:
+            report_path (str): Path to the report file
+            info_type (str): Type of information to extract, such as "all"
+            set_values (str): Profile overrides, passed with --set
+
+        Returns:
+            str: The standard output of the command
+        """
+        print(
+            f"[INFO] Generate report info using chart-verifier on path : {os.path.abspath(report_path)}"
+        )
+        out = subprocess.run(
+            [self.executable]
+            + _report_args(info_type, os.path.abspath(report_path), set_values),
+            capture_output=True,
+        )
+        if out.returncode != 0:
+            _log_failure(out.returncode, out.stderr)
+        return out.stdout.decode("utf-8")
+
+    def close(self):
+        pass
+
+
+class DockerVerifierWorker:
+    """Run chart-verifier commands in a long-lived container.
+
+    The container is started on the first command. Its entrypoint is replaced to keep
+    it idle, and each command is run with the original entrypoint of the image.
+
+    Args:
+        image (str): chart-verifier image
+        charts_dir (str): Host directory bound read-only to /charts in the
+                          container. Reports must be located under this directory.
+        client (docker.DockerClient): Docker client, defaults to docker.from_env()
+    """
+
+    def __init__(self, image, charts_dir, client=None):
+        self.image = image
+        self.charts_dir = os.path.abspath(charts_dir)
+        self._client = client
+        self._container = None
+        self._entrypoint = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        if self._client is None:
+            self._client = docker.from_env()
+        try:
+            image = self._client.images.get(self.image)
+        except docker.errors.ImageNotFound:
+            print(f"[INFO] Pulling chart-verifier image: {self.image}")
+            image = self._client.images.pull(self.image)
+        self._entrypoint = image.attrs["Config"].get("Entrypoint") or ["chart-verifier"]
+        print(
+            f"[INFO] Starting chart-verifier worker using image: {self.image}, report directory: {self.charts_dir}"
+        )
+        self._container = self._client.containers.run(
+            self.image,
+            entrypoint=["sleep", "infinity"],
+            detach=True,
+            volumes={self.charts_dir: {"bind": f"{CHARTS_MOUNT}/", "mode": "ro"}},
+        )
+
+    def run_report(self, report_path, info_type, set_values=""):
+        """Run "chart-verifier report" in the container, see
+        LocalVerifierWorker.run_report."""
+        with self._lock:
+            if self._container is None:
+                self._start()
+
+        relative_path = os.path.relpath(os.path.abspath(report_path), self.charts_dir)
+        command = self._entrypoint + _report_args(
+            info_type, f"{CHARTS_MOUNT}/{relative_path}", set_values
+        )
+        print(f"[INFO] Generate report info using docker  : {report_path}")
+        result = self._container.exec_run(command, demux=True, workdir=CHARTS_MOUNT)
+        stdout, stderr = result.output
+        if result.exit_code != 0:
+            _log_failure(result.exit_code, stderr)
+        return (stdout or b"").decode("utf-8")
+
+    def close(self):
+        """Stop and remove the container, if started."""
+        with self._lock:
+            if self._container is not None:
+                try:
+                    self._container.remove(force=True)
+                except docker.errors.APIError as err:
+                    print(f"[WARNING] Failed to remove chart-verifier worker: {err}")
+                self._container = None
+
+
+# Containers by report directory, and the worker set with set_worker under None
+_workers = {}
+_workers_lock = threading.Lock()
+
+
+def set_worker(worker):
+    """Use the given worker for all reports, typically a fake worker in tests."""
+    _workers[None] = worker
+
+
+def clear():
+    """Close all the workers of the process."""
+    with _workers_lock:
+        for worker in _workers.values():
+            worker.close()
+        _workers.clear()
+
+
+atexit.register(clear)
+
+
+def get_worker(report_path):
+    """Return the worker to use for the given report.
+
+    With VERIFIER_IMAGE set, one container is started for each directory holding
+    reports, and shared by all the reports of the directory. Only that directory is
+    bound in the container.
+    """
+    if None in _workers:
+        return _workers[None]
+
+    image = os.environ.get(VERIFIER_IMAGE_ENV)
+    if not image:
+        return LocalVerifierWorker()
+
+    charts_dir = os.path.dirname(os.path.abspath(report_path))
+    with _workers_lock:
+        if charts_dir not in _workers:
+            _workers[charts_dir] = DockerVerifierWorker(image, charts_dir)
+        return _workers[charts_dir]
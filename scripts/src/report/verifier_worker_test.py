@@ -0,0 +1,160 @@
+"""Unit tests for the chart-verifier workers"""
+
+import json
+import os
+import threading
+
+import pytest
+
+from report import verifier_worker
+
+report_out = {"digests": {"chart": "sha256:0123", "package": "abcd"}}
+
+
+class FakeContainer:
+    def __init__(self, volumes):
+        self.volumes = volumes
+        self.commands = []
+        self.removed = False
+        self.result = (0, (json.dumps(report_out).encode(), None))
+
+    def exec_run(self, command, demux, workdir):
+        self.commands.append(command)
+        return verifier_worker.docker.models.containers.ExecResult(*self.result)
+
+    def remove(self, force):
+        self.removed = True
+
+
+class FakeImage:
+    attrs = {"Config": {"Entrypoint": ["/app/chart-verifier"]}}
+
+
+class FakeDockerClient:
+    """Stands in for docker.from_env(), recording the started containers."""
+
+    def __init__(self, local_images=("verifier:latest",)):
+        self.containers = self
+        self.images = self
+        self.local_images = set(local_images)
+        self.pulled = []
+        self.started = []
+
+    def get(self, image):
+        if image not in self.local_images:
+            raise verifier_worker.docker.errors.ImageNotFound(image)
+        return FakeImage()
+
+    def pull(self, image):
+        self.pulled.append(image)
+        self.local_images.add(image)
+        return FakeImage()
+
+    def run(self, image, entrypoint, detach, volumes):
+        container = FakeContainer(volumes)
+        self.started.append(container)
+        return container
+
+
+@pytest.fixture(autouse=True)
+def clear_workers():
+    yield
+    verifier_worker.clear()
+
+
+def test_docker_worker_reuses_container(tmp_path):
+    client = FakeDockerClient()
+    worker = verifier_worker.DockerVerifierWorker("verifier:latest", tmp_path, client)
+
+    for info_type in ["all", "results"]:
+        output = worker.run_report(tmp_path / "report" / "report.yaml", info_type)
+        assert json.loads(output) == report_out
+
+    assert len(client.started) == 1
+    container = client.started[0]
+    assert container.volumes == {str(tmp_path): {"bind": "/charts/", "mode": "ro"}}
+    assert container.commands == [
+        ["/app/chart-verifier", "report", "all", "/charts/report/report.yaml"],
+        ["/app/chart-verifier", "report", "results", "/charts/report/report.yaml"],
+    ]
+
+    worker.run_report(tmp_path / "report.yaml", "all", "profile.version=v1.1")
+    assert container.commands[-1][-3:] == [
+        "--set",
+        "profile.version=v1.1",
+        "/charts/report.yaml",
+    ]
+
+    worker.close()
+    assert container.removed
+
+
+def test_docker_worker_pulls_image(tmp_path):
+    client = FakeDockerClient(local_images=())
+    worker = verifier_worker.DockerVerifierWorker("verifier:latest", tmp_path, client)
+    worker.run_report(tmp_path / "report.yaml", "all")
+    assert client.pulled == ["verifier:latest"]
+    assert client.started[0].commands[0][0] == "/app/chart-verifier"
+
+
+def test_docker_worker_concurrent_start(tmp_path):
+    client = FakeDockerClient()
+    worker = verifier_worker.DockerVerifierWorker("verifier:latest", tmp_path, client)
+    threads = [
+        threading.Thread(target=worker.run_report, args=(tmp_path / "r.yaml", "all"))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(client.started) == 1
+
+
+def test_get_worker(tmp_path, monkeypatch):
+    monkeypatch.delenv(verifier_worker.VERIFIER_IMAGE_ENV, raising=False)
+    assert isinstance(
+        verifier_worker.get_worker("report.yaml"), verifier_worker.LocalVerifierWorker
+    )
+
+    monkeypatch.setenv(verifier_worker.VERIFIER_IMAGE_ENV, "verifier:latest")
+    worker = verifier_worker.get_worker(tmp_path / "a" / "report.yaml")
+    assert worker.charts_dir == str(tmp_path / "a")
+    assert verifier_worker.get_worker(tmp_path / "a" / "other.yaml") is worker
+
+    # Only the directory of the report is bound in the container
+    other = verifier_worker.get_worker(tmp_path / "b" / "report.yaml")
+    assert other.charts_dir == str(tmp_path / "b")
+
+
+def test_docker_worker_failure(tmp_path, capsys):
+    client = FakeDockerClient()
+    worker = verifier_worker.DockerVerifierWorker("verifier:latest", tmp_path, client)
+    worker.run_report(tmp_path / "report.yaml", "all")
+    client.started[0].result = (1, (None, b"Error: report not found"))
+
+    assert worker.run_report(tmp_path / "missing.yaml", "all") == ""
+    out = capsys.readouterr().out
+    assert "[ERROR] chart-verifier failed with exit code 1" in out
+    assert "Error: report not found" in out
+
+
+def test_local_worker_with_fake_verifier(tmp_path):
+    fake_verifier = tmp_path / "fake-chart-verifier"
+    fake_verifier.write_text(
+        "#!/bin/sh\n"
+        f'echo "$@" > {tmp_path}/args\n'
+        f"echo '{json.dumps(report_out)}'\n"
+    )
+    os.chmod(fake_verifier, 0o755)
+
+    worker = verifier_worker.LocalVerifierWorker(str(fake_verifier))
+    output = worker.run_report("report.yaml", "all", "profile.vendortype=partner")
+    assert json.loads(output) == report_out
+    assert (tmp_path / "args").read_text().split() == [
+        "report",
+        "all",
+        "--set",
+        "profile.vendortype=partner",
+        os.path.abspath("report.yaml"),
+    ]
@@ -1,19 +1,15 @@
 import os
 import re
 import requests
-import semver
 import yaml
 
-try:
-    from yaml import CLoader as Loader
-except ImportError:
-    from yaml import Loader
-
 from dataclasses import dataclass, field
 
 from checkprcontent import checkpr
+from indexfile import fetch
+from indexfile.view import IndexView
 from owners import owners_file
-from tools import gitutils
+from tools import gitutils, versions
 from reporegex import matchers
 from report import verifier_report
 
@@ -116,7 +112,7 @@ class Chart:
         self.name = name
 
         if version:
-            if not semver.VersionInfo.is_valid(version):
+            if not versions.is_valid(version):
                 msg = f"[ERROR] Helm chart version is not a valid semantic version: {version}"
                 raise VersionError(msg)
 
@@ -138,7 +134,7 @@ class Chart:
         """Check if the chart is present in the Helm index
 
         Args:
-            index (dict): Content of the Helm repo index
+            index (dict | IndexView): Content of the Helm repo index, or a view over it
 
         Raise:
             HelmIndexError if:
@@ -146,15 +142,15 @@ class Chart:
             * The Chart is already present in the index
 
         """
-        try:
-            chart_entry = index["entries"].get(self.name, [])
-        except KeyError as e:
-            raise HelmIndexError(f"Malformed index {index}") from e
+        if not isinstance(index, IndexView):
+            try:
+                index = IndexView(index)
+            except KeyError as e:
+                raise HelmIndexError(f"Malformed index {index}") from e
 
-        for chart in chart_entry:
-            if chart["version"] == self.version:
-                msg = f"[ERROR] Helm chart release already exists in the index.yaml: {self.version}"
-                raise HelmIndexError(msg)
+        if index.has_version(self.name, self.version):
+            msg = f"[ERROR] Helm chart release already exists in the index.yaml: {self.version}"
+            raise HelmIndexError(msg)
 
     def check_release_tag(self, repository: str):
         """Check for the existence of the chart's release tag on the provided repository.
@@ -596,16 +592,16 @@ def download_index_data(
         HelmIndexError if the index file is not valid YAML.
 
     """
-    index_url = f"https://raw.githubusercontent.com/{repository}/{branch}/index.yaml"
-    r = requests.get(index_url)
+    index = fetch.fetch_repository_index(repository, branch)
 
     data = {"apiVersion": "v1", "entries": {}}
-    if r.status_code != 200 and not ignore_missing:
-        raise HelmIndexError(f"Error retrieving index file at {index_url}")
+    if not index.found:
+        if not ignore_missing:
+            raise HelmIndexError(f"Error retrieving index file at {index.url}")
     else:
         try:
-            data = yaml.load(r.text, Loader=Loader)
+            data = index.data
         except yaml.YAMLError as e:
-            raise HelmIndexError(f"Error parsing index file at {index_url}") from e
+            raise HelmIndexError(f"Error parsing index file at {index.url}") from e
 
     return data
@@ -0,0 +1,192 @@
+"""Content-addressed store of the release artifacts.
+
+chart-repo-manager writes each artifact of a release (chart package, provenance file)
+into the store exactly once, as a blob named after its sha256 digest. The store keeps
+a manifest mapping the file name of each artifact, e.g. vault-0.17.0.tgz, to the digest
+of its current blob. The names expected by the release step, under
+".cr-release-packages", are hard links to the blobs, or copies if the store is on
+another file system.
+
+Blobs are read-only and never modified: an artifact is updated by adding a new blob
+and pointing its name at it. The digest of an artifact is thus computed once, when it
+is added, and later steps read it from the manifest instead of hashing the artifact
+again.
+
+The manifest is a directory holding one file per name, containing the digest of the
+blob, so that names are updated atomically and independently of each other, including
+by concurrent processes. Releases prepared concurrently, whose artifacts may have the
+same name, use separate namespaces of the manifest while sharing the blobs.
+
+The store lives in the on-disk cache directory shared by the workflow steps, see
+tools.cache, and can be moved with the ARTIFACT_STORE_DIR environment variable.
+"""
+
+import contextlib
+import hashlib
+import os
+import shutil
+import stat
+
+from tools import cache
+
+ARTIFACT_STORE_DIR_ENV = "ARTIFACT_STORE_DIR"
+CHUNK_SIZE = 1024 * 1024
+
+
+def _copy_and_hash(src_path, dst_path=None):
+    """Return the sha256 hex digest of a file, copying it to dst_path in the same pass
+    if given."""
+    sha256 = hashlib.sha256()
+    with open(src_path, "rb") as src, contextlib.ExitStack() as stack:
+        dst = stack.enter_context(open(dst_path, "wb")) if dst_path else None
+        for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+            sha256.update(chunk)
+            if dst:
+                dst.write(chunk)
+    return sha256.hexdigest()
+
+
+class ArtifactStore:
+    """Store of release artifacts, addressed by their sha256 digest.
+
+    Args:
+        root (str): Directory of the store, defaults to the "artifacts" cache directory
+        namespace (str): Namespace of the manifest, e.g. the tag of a release
+    """
+
+    def __init__(self, root=None, namespace=None):
+        self.root = root or cache.get_cache_dir("artifacts", ARTIFACT_STORE_DIR_ENV)
+        self._blobs_dir = os.path.join(self.root, "blobs", "sha256")
+        self._manifest_dir = os.path.join(self.root, "manifest")
+        if namespace:
+            self._manifest_dir = self._manifest_path(namespace)
+        os.makedirs(self._blobs_dir, exist_ok=True)
+        os.makedirs(self._manifest_dir, exist_ok=True)
+
+    def _tmp_path(self, name):
+        return os.path.join(self.root, f"{name}.{os.getpid()}.tmp")
+
+    def _manifest_path(self, name):
+        if not name or os.path.basename(name) != name or name.startswith("."):
+            raise ValueError(f"Invalid artifact name: {name}")
+        return os.path.join(self._manifest_dir, name)
+
+    def blob_path(self, digest):
+        """Return the path to the blob of the given sha256 hex digest."""
+        return os.path.join(self._blobs_dir, digest)
+
+    def new_path(self, name):
+        """Return a path, within the store, where to write a new version of an artifact
+        before adding it with add(..., move=True). Writing it there rather than in the
+        working directory makes the move a rename."""
+        return self._tmp_path(f"new-{name}")
+
+    def add(self, name, path, move=False):
+        """Add a file to the store under the given name, replacing the previous
+        version of the artifact if any.
+
+        Args:
+            name (str): File name of the artifact, e.g. vault-0.17.0.tgz
+            path (str): Path to the file
+            move (bool): Whether to move the file into the store rather than copying it
+
+        Returns:
+            str: The sha256 hex digest of the artifact
+        """
+        manifest_path = self._manifest_path(name)
+        tmp_path = self._tmp_path(f"blob-{name}")
+        try:
+            if move:
+                file_digest = _copy_and_hash(path)
+                shutil.move(path, tmp_path)
+            else:
+                file_digest = _copy_and_hash(path, tmp_path)
+            blob_path = self.blob_path(file_digest)
+            if not os.path.exists(blob_path):
+                os.chmod(tmp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+                os.replace(tmp_path, blob_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        tmp_path = self._tmp_path(f"manifest-{name}")
+        with open(tmp_path, "w") as fd:
+            fd.write(file_digest)
+        os.replace(tmp_path, manifest_path)
+        return file_digest
+
+    def get_digest(self, name):
+        """Return the sha256 hex digest of an artifact, or None if it is not in the
+        store."""
+        try:
+            with open(self._manifest_path(name)) as fd:
+                file_digest = fd.read().strip()
+        except FileNotFoundError:
+            return None
+        return file_digest if os.path.exists(self.blob_path(file_digest)) else None
+
+    def get_path(self, name):
+        """Return the path to the blob of an artifact, or None if it is not in the
+        store. The blob must not be modified."""
+        file_digest = self.get_digest(name)
+        return self.blob_path(file_digest) if file_digest else None
+
+    def get_manifest(self):
+        """Return the manifest of the store.
+
+        Returns:
+            dict: sha256 hex digest of each artifact, by name
+        """
+        manifest = {}
+        for entry in sorted(os.scandir(self._manifest_dir), key=lambda e: e.name):
+            name = entry.name
+            if entry.is_file() and not name.endswith(".tmp"):
+                file_digest = self.get_digest(name)
+                if file_digest:
+                    manifest[name] = file_digest
+        return manifest
+
+    def link(self, name, directory):
+        """Make an artifact available under its name in the given directory, as a hard
+        link to its blob, or a copy if a hard link can't be created. An existing file
+        is replaced atomically.
+
+        Args:
+            name (str): File name of the artifact
+            directory (str): Directory where to link the artifact
+
+        Returns:
+            str: Path to the artifact in the directory
+
+        Raises:
+            KeyError if the artifact is not in the store.
+        """
+        blob_path = self.get_path(name)
+        if not blob_path:
+            raise KeyError(f"Artifact {name} not found in {self.root}")
+
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            try:
+                os.link(blob_path, tmp_path)
+            except OSError:
+                shutil.copyfile(blob_path, tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return path
+
+    def get_linked_digest(self, path):
+        """Return the digest of the artifact linked at the given path, without reading
+        it, or None if the file isn't a hard link to the current blob of the artifact
+        of the same name."""
+        blob_path = self.get_path(os.path.basename(path))
+        try:
+            if blob_path and os.path.samefile(path, blob_path):
+                return os.path.basename(blob_path)
+        except OSError:
+            pass
+        return None
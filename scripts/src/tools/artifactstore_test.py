@@ -0,0 +1,99 @@
+"""Unit tests for the content-addressed store of release artifacts"""
+
+import hashlib
+import os
+
+import pytest
+
+from tools import artifactstore
+
+content = b"package content"
+content_digest = hashlib.sha256(content).hexdigest()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return artifactstore.ArtifactStore(str(tmp_path / "store"))
+
+
+def test_add_and_link(tmp_path, store):
+    path = tmp_path / "awesome-1.0.0.tgz"
+    path.write_bytes(content)
+
+    assert store.add(path.name, str(path)) == content_digest
+    assert path.exists()
+    assert store.get_digest(path.name) == content_digest
+    assert store.get_manifest() == {path.name: content_digest}
+
+    blob_path = store.get_path(path.name)
+    assert open(blob_path, "rb").read() == content
+    assert os.stat(blob_path).st_mode & 0o222 == 0
+
+    packages_dir = tmp_path / "packages"
+    linked_path = store.link(path.name, str(packages_dir))
+    assert linked_path == str(packages_dir / path.name)
+    assert os.path.samefile(linked_path, blob_path)
+    assert store.get_linked_digest(linked_path) == content_digest
+    assert store.get_linked_digest(str(path)) is None
+
+    # Linking again replaces the existing file
+    assert store.link(path.name, str(packages_dir)) == linked_path
+
+
+def test_update_artifact(tmp_path, store):
+    path = tmp_path / "awesome-1.0.0.tgz"
+    path.write_bytes(content)
+    store.add(path.name, str(path), move=True)
+    assert not path.exists()
+    linked_path = store.link(path.name, str(tmp_path))
+
+    new_path = store.new_path(path.name)
+    with open(new_path, "wb") as fd:
+        fd.write(b"new content")
+    new_digest = store.add(path.name, new_path, move=True)
+    assert new_digest == hashlib.sha256(b"new content").hexdigest()
+    assert store.get_manifest() == {path.name: new_digest}
+
+    # The previous version is untouched until linked again
+    assert open(linked_path, "rb").read() == content
+    assert store.get_linked_digest(linked_path) is None
+    store.link(path.name, str(tmp_path))
+    assert open(linked_path, "rb").read() == b"new content"
+
+    # No temporary file is left behind
+    assert sorted(os.listdir(store.root)) == ["blobs", "manifest"]
+
+
+def test_same_content(tmp_path, store):
+    for name in ("first.tgz", "second.tgz"):
+        (tmp_path / name).write_bytes(content)
+        store.add(name, str(tmp_path / name), move=True)
+    assert store.get_manifest() == {
+        "first.tgz": content_digest,
+        "second.tgz": content_digest,
+    }
+    blobs_dir = os.path.dirname(store.blob_path(content_digest))
+    assert os.listdir(blobs_dir) == [content_digest]
+
+
+def test_namespaces(tmp_path, store):
+    (tmp_path / "awesome-1.0.0.tgz").write_bytes(content)
+    first = artifactstore.ArtifactStore(store.root, "acme-awesome-1.0.0")
+    first.add("awesome-1.0.0.tgz", str(tmp_path / "awesome-1.0.0.tgz"))
+    second = artifactstore.ArtifactStore(store.root, "other-awesome-1.0.0")
+    assert second.get_digest("awesome-1.0.0.tgz") is None
+    assert store.get_manifest() == {}
+    assert first.get_manifest() == {"awesome-1.0.0.tgz": content_digest}
+
+
+def test_missing_artifact(tmp_path, store):
+    assert store.get_digest("missing.tgz") is None
+    with pytest.raises(KeyError):
+        store.link("missing.tgz", str(tmp_path))
+    with pytest.raises(ValueError):
+        store.get_digest("../missing.tgz")
+
+
+def test_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv(artifactstore.ARTIFACT_STORE_DIR_ENV, str(tmp_path / "store"))
+    assert artifactstore.ArtifactStore().root == str(tmp_path / "store")
@@ -0,0 +1,45 @@
+"""Location of the on-disk caches shared by the workflow steps.
+
+All caches live under a common root, which defaults to the user cache directory and
+can be overridden with the CHART_TOOLS_CACHE_DIR environment variable. Each cache can
+additionally be pointed at its own directory using a dedicated environment variable,
+typically to use a fixture directory in tests.
+"""
+
+import os
+
+CACHE_ROOT_ENV = "CHART_TOOLS_CACHE_DIR"
+
+
+def get_cache_root():
+    """Return the root directory of the on-disk caches.
+
+    Returns:
+        str: CHART_TOOLS_CACHE_DIR if set, "$XDG_CACHE_HOME/chart-tools" otherwise.
+    """
+    cache_root = os.environ.get(CACHE_ROOT_ENV)
+    if cache_root:
+        return cache_root
+
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(xdg_cache_home, "chart-tools")
+
+
+def get_cache_dir(name, env_var=None):
+    """Return the directory of a given cache, creating it if needed.
+
+    Args:
+        name (str): Name of the cache, used as sub-directory of the cache root.
+        env_var (str): Name of an environment variable that, if set, overrides the
+                       location of this cache.
+
+    Returns:
+        str: Path to the cache directory.
+    """
+    cache_dir = os.environ.get(env_var) if env_var else None
+    if not cache_dir:
+        cache_dir = os.path.join(get_cache_root(), name)
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
@@ -0,0 +1,222 @@
+"""Streaming manipulation of chart packages.
+
+A chart package is a gzipped tarball holding the chart under a top-level directory
+named after the chart, e.g. vault/Chart.yaml. The functions of this module read and
+write packages with tarfile in streaming mode: members are processed one at a time,
+in a single pass, and only Chart.yaml is ever held in memory.
+
+The packages written by this module are reproducible: their gzip header holds no
+file name nor timestamp, so that given members always produce the same bytes. See
+normalize_package for the packages created by "helm package".
+
+The gzip layer is handled by gzip.GzipFile rather than by tarfile: the streaming mode
+of tarfile doesn't skip the extra field that Helm writes in the gzip header of its
+packages before Python 3.12.
+"""
+
+import contextlib
+import gzip
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+
+import yaml
+
+try:
+    from yaml import CDumper as Dumper
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import Dumper, SafeLoader
+
+CHART_YAML = "Chart.yaml"
+CHUNK_SIZE = 1024 * 1024
+SOURCE_DATE_EPOCH_ENV = "SOURCE_DATE_EPOCH"
+
+
+# Fields of the Chart.yaml metadata known to Helm, and those of its dependencies and
+# maintainers. Helm drops the other fields, and the empty ones, when it outputs the
+# metadata of a chart.
+_CHART_FIELDS = (
+    "name",
+    "home",
+    "sources",
+    "version",
+    "description",
+    "keywords",
+    "maintainers",
+    "icon",
+    "apiVersion",
+    "condition",
+    "tags",
+    "appVersion",
+    "deprecated",
+    "annotations",
+    "kubeVersion",
+    "dependencies",
+    "type",
+)
+_CHART_STRING_FIELDS = {"version", "appVersion", "kubeVersion", "apiVersion"}
+_DEPENDENCY_FIELDS = (
+    "name",
+    "version",
+    "repository",
+    "condition",
+    "tags",
+    "enabled",
+    "import-values",
+    "alias",
+)
+_MAINTAINER_FIELDS = ("name", "email", "url")
+
+
+def _omit_empty(fields, data, string_fields=()):
+    return {
+        key: str(data[key]) if key in string_fields else data[key]
+        for key in fields
+        if data.get(key) not in (None, "", [], {}, False)
+    }
+
+
+def get_chart_metadata(chart_yaml):
+    """Return the metadata of a chart as output by "helm show chart", given the
+    content of its Chart.yaml."""
+    metadata = _omit_empty(_CHART_FIELDS, chart_yaml, _CHART_STRING_FIELDS)
+    if "maintainers" in metadata:
+        metadata["maintainers"] = [
+            _omit_empty(_MAINTAINER_FIELDS, maintainer)
+            for maintainer in metadata["maintainers"]
+        ]
+    if "dependencies" in metadata:
+        metadata["dependencies"] = [
+            _omit_empty(_DEPENDENCY_FIELDS, dependency, {"version"})
+            for dependency in metadata["dependencies"]
+        ]
+    return metadata
+
+
+def is_chart_yaml(member):
+    """Whether a member of a chart package is the Chart.yaml of the chart itself,
+    rather than the one of a dependency under <chart>/charts/."""
+    parts = member.name.split("/")
+    return member.isfile() and len(parts) == 2 and parts[1] == CHART_YAML
+
+
+@contextlib.contextmanager
+def open_package(path):
+    """Open a chart package for reading its members in order, in streaming mode."""
+    with gzip.open(path, "rb") as fileobj, tarfile.open(
+        fileobj=fileobj, mode="r|"
+    ) as tar:
+        yield tar
+
+
+@contextlib.contextmanager
+def _create_package(path):
+    """Create a chart package at path, replacing it atomically once all the members
+    have been added. The gzip header doesn't hold a file name or a timestamp."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as fd, gzip.GzipFile(
+            filename="", mode="wb", fileobj=fd, mtime=0
+        ) as fileobj, tarfile.open(fileobj=fileobj, mode="w|") as tar:
+            yield tar
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _member_order(member):
+    return (not is_chart_yaml(member), member.name)
+
+
+def _normalize_member(member, mtime):
+    member.mtime = mtime
+    member.uid = member.gid = 0
+    member.uname = member.gname = ""
+    member.pax_headers = {}
+    return member
+
+
+def get_chart_yaml(path):
+    """Read the Chart.yaml of a chart package. Members are decompressed up to
+    Chart.yaml only, which Helm places first.
+
+    Args:
+        path (str): Path to the chart package
+
+    Returns:
+        dict: The content of Chart.yaml
+
+    Raises:
+        ValueError if the package doesn't contain a Chart.yaml.
+    """
+    with open_package(path) as tar:
+        for member in tar:
+            if is_chart_yaml(member):
+                return yaml.load(tar.extractfile(member), Loader=SafeLoader)
+    raise ValueError(f"No {CHART_YAML} found in {path}")
+
+
+def rewrite_chart_yaml(src_path, dst_path, update):
+    """Copy a chart package, replacing the content of its Chart.yaml.
+
+    All the other members are copied through untouched. dst_path is replaced
+    atomically, and may be the same as src_path.
+
+    Args:
+        src_path (str): Path to the chart package
+        dst_path (str): Path to the new chart package
+        update (function): Called with the content of Chart.yaml, as a dict. Returns
+                           the new content.
+
+    Raises:
+        ValueError if the package doesn't contain a Chart.yaml.
+    """
+    found = False
+    with open_package(src_path) as src, _create_package(dst_path) as dst:
+        for member in src:
+            if not member.isfile():
+                dst.addfile(member)
+            elif is_chart_yaml(member) and not found:
+                found = True
+                data = yaml.load(src.extractfile(member), Loader=SafeLoader)
+                content = yaml.dump(update(data), Dumper=Dumper).encode("utf-8")
+                member.size = len(content)
+                dst.addfile(member, io.BytesIO(content))
+            else:
+                dst.addfile(member, src.extractfile(member))
+        if not found:
+            raise ValueError(f"No {CHART_YAML} found in {src_path}")
+
+
+def normalize_package(src_path, dst_path, mtime=None):
+    """Copy a chart package so that its bytes only depend on the content of the
+    chart, e.g. to make the output of "helm package" reproducible.
+
+    Members are sorted by name, after Chart.yaml. Their modification time is set to
+    mtime, their owner to root, and their extended headers are dropped. The package is
+    decompressed to a temporary file to sort its members, so memory usage doesn't
+    depend on its size.
+
+    Args:
+        src_path (str): Path to the chart package
+        dst_path (str): Path to the new chart package, may be the same as src_path
+        mtime (int): Modification time of the members, defaults to SOURCE_DATE_EPOCH
+                     if set, to 0 otherwise
+    """
+    if mtime is None:
+        mtime = int(os.environ.get(SOURCE_DATE_EPOCH_ENV, 0))
+
+    with tempfile.TemporaryFile() as spool:
+        with gzip.open(src_path, "rb") as fileobj:
+            shutil.copyfileobj(fileobj, spool, CHUNK_SIZE)
+        spool.seek(0)
+        with tarfile.open(fileobj=spool, mode="r:") as src, _create_package(
+            dst_path
+        ) as dst:
+            for member in sorted(src.getmembers(), key=_member_order):
+                fileobj = src.extractfile(member) if member.isfile() else None
+                dst.addfile(_normalize_member(member, mtime), fileobj)
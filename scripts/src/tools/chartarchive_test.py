@@ -0,0 +1,176 @@
+"""Unit tests for the streaming manipulation of chart packages"""
+
+import glob
+import io
+import os
+import shutil
+import subprocess
+import tarfile
+
+import pytest
+import yaml
+
+from tools import chartarchive
+
+CHART_PACKAGE = os.path.join(
+    os.path.dirname(__file__), "../../../tests/data/vault-0.17.0.tgz"
+)
+
+
+def add_annotation(data):
+    data.setdefault("annotations", {})["charts.openshift.io/provider"] = "HashiCorp"
+    return data
+
+
+def read_members(path):
+    with tarfile.open(path) as tar:
+        return {
+            member.name: tar.extractfile(member).read()
+            for member in tar
+            if member.isfile()
+        }
+
+
+def test_rewrite_chart_yaml(tmp_path):
+    package = tmp_path / "vault-0.17.0.tgz"
+    shutil.copy(CHART_PACKAGE, package)
+
+    chartarchive.rewrite_chart_yaml(str(package), str(package), add_annotation)
+
+    before = read_members(CHART_PACKAGE)
+    after = read_members(str(package))
+    assert list(after) == list(before)
+    for name in before:
+        if name != "vault/Chart.yaml":
+            assert after[name] == before[name]
+
+    chart = yaml.safe_load(after["vault/Chart.yaml"])
+    assert chart["annotations"]["charts.openshift.io/provider"] == "HashiCorp"
+    assert chart["name"] == "vault"
+    assert os.listdir(tmp_path) == ["vault-0.17.0.tgz"]
+
+
+def test_rewrite_chart_yaml_missing(tmp_path):
+    package = tmp_path / "empty.tgz"
+    with tarfile.open(package, "w:gz"):
+        pass
+
+    with pytest.raises(ValueError):
+        chartarchive.rewrite_chart_yaml(str(package), str(package), add_annotation)
+    assert os.listdir(tmp_path) == ["empty.tgz"]
+
+
+@pytest.mark.skipif(shutil.which("helm") is None, reason="helm is not installed")
+def test_helm_show_chart(tmp_path):
+    package = tmp_path / "vault-0.17.0.tgz"
+    chartarchive.rewrite_chart_yaml(CHART_PACKAGE, str(package), add_annotation)
+
+    out = subprocess.run(
+        ["helm", "show", "chart", str(package)], capture_output=True, check=True
+    )
+    chart = yaml.safe_load(out.stdout)
+    assert chart["annotations"]["charts.openshift.io/provider"] == "HashiCorp"
+
+
+def test_get_chart_yaml():
+    chart = chartarchive.get_chart_yaml(CHART_PACKAGE)
+    assert chart["name"] == "vault"
+    assert chart["version"] == "0.17.0"
+
+
+def test_get_chart_yaml_missing(tmp_path):
+    package = tmp_path / "empty.tgz"
+    with tarfile.open(package, "w:gz"):
+        pass
+
+    with pytest.raises(ValueError):
+        chartarchive.get_chart_yaml(str(package))
+
+
+def test_get_chart_metadata():
+    chart_yaml = {
+        "apiVersion": "v2",
+        "name": "awesome",
+        "version": 1.0,
+        "appVersion": 2,
+        "description": "",
+        "deprecated": False,
+        "maintainers": [{"name": "acme", "email": ""}],
+        "dependencies": [{"name": "common", "version": 1.2, "enabled": False}],
+        "custom": "dropped",
+    }
+    assert chartarchive.get_chart_metadata(chart_yaml) == {
+        "name": "awesome",
+        "version": "1.0",
+        "maintainers": [{"name": "acme"}],
+        "apiVersion": "v2",
+        "appVersion": "2",
+        "dependencies": [{"name": "common", "version": "1.2"}],
+    }
+
+
+@pytest.mark.skipif(shutil.which("helm") is None, reason="helm is not installed")
+@pytest.mark.parametrize(
+    "package",
+    sorted(
+        glob.glob(
+            os.path.join(os.path.dirname(__file__), "../../../tests/data/**/*.tgz"),
+            recursive=True,
+        )
+    ),
+)
+def test_helm_show_chart_parity(package):
+    out = subprocess.run(
+        ["helm", "show", "chart", package], capture_output=True, check=True
+    )
+    chart_yaml = chartarchive.get_chart_yaml(package)
+    assert chartarchive.get_chart_metadata(chart_yaml) == yaml.safe_load(out.stdout)
+
+
+def make_package(path, files, mtime):
+    with tarfile.open(path, "w:gz") as tar:
+        for name, content in files:
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            info.mtime = mtime
+            info.uid = 1000
+            info.uname = "builder"
+            tar.addfile(info, io.BytesIO(content))
+
+
+def test_normalize_package(tmp_path, monkeypatch):
+    files = [
+        ("awesome/values.yaml", b"replicas: 1\n"),
+        ("awesome/Chart.yaml", b"name: awesome\nversion: 1.0.0\n"),
+        ("awesome/.helmignore", b"*.tmp\n"),
+    ]
+    first = tmp_path / "first.tgz"
+    make_package(first, files, 1700000000)
+    second = tmp_path / "second.tgz"
+    make_package(second, reversed(files), 1800000000)
+    assert first.read_bytes() != second.read_bytes()
+
+    monkeypatch.delenv(chartarchive.SOURCE_DATE_EPOCH_ENV, raising=False)
+    chartarchive.normalize_package(str(first), str(first))
+    chartarchive.normalize_package(str(second), str(second))
+    assert first.read_bytes() == second.read_bytes()
+
+    with tarfile.open(first) as tar:
+        members = tar.getmembers()
+    assert [member.name for member in members] == [
+        "awesome/Chart.yaml",
+        "awesome/.helmignore",
+        "awesome/values.yaml",
+    ]
+    assert {(member.mtime, member.uid, member.uname) for member in members} == {
+        (0, 0, "")
+    }
+    assert sorted(os.listdir(tmp_path)) == ["first.tgz", "second.tgz"]
+
+
+def test_rewrite_chart_yaml_reproducible(tmp_path):
+    first = tmp_path / "first.tgz"
+    second = tmp_path / "second.tgz"
+    chartarchive.rewrite_chart_yaml(CHART_PACKAGE, str(first), add_annotation)
+    chartarchive.rewrite_chart_yaml(CHART_PACKAGE, str(second), add_annotation)
+    assert first.read_bytes() == second.read_bytes()
@@ -0,0 +1,119 @@
+"""Streaming computation of the sha256 digest of chart packages.
+
+Chart packages are hashed chunk by chunk, so memory usage doesn't depend on their
+size. Before downloading a package, its digest is looked up:
+
+* if the caller passes one, in a local directory of released packages, typically
+  ".cr-release-packages" where chart-repo-manager places them. If the package is
+  there, nothing is downloaded: the digest recorded in the artifact store is used if
+  the file is linked to it, see tools.artifactstore, otherwise the local file is
+  hashed. This is only suitable when the local package is known to be the one
+  served at the URL: checking an uploaded release asset requires downloading it.
+* in an on-disk cache keyed by the URL of the package and its strong ETag, so that a
+  given artifact is only ever downloaded and hashed once across workflow steps.
+  Packages served without a strong ETag are not cached, as a replaced artifact can't
+  be told apart from the previous one.
+"""
+
+import hashlib
+import json
+import os
+from urllib.parse import urlparse
+
+import requests
+
+from tools import artifactstore, cache
+
+DIGEST_CACHE_DIR_ENV = "DIGEST_CACHE_DIR"
+RELEASE_PACKAGES_DIR = ".cr-release-packages"
+CHUNK_SIZE = 1024 * 1024
+
+
+def hash_chunks(chunks):
+    """Return the sha256 hex digest of an iterable of bytes."""
+    sha256 = hashlib.sha256()
+    for chunk in chunks:
+        sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def hash_file(path):
+    """Return the sha256 hex digest of a file, reading it by chunks."""
+    with open(path, "rb") as fd:
+        return hash_chunks(iter(lambda: fd.read(CHUNK_SIZE), b""))
+
+
+def _get_local_package(url, packages_dir):
+    file_name = os.path.basename(urlparse(url).path)
+    path = os.path.join(packages_dir, file_name)
+    return path if file_name and os.path.isfile(path) else None
+
+
+def _get_cache_path(url, response):
+    etag = response.headers.get("ETag")
+    # Weak ETags don't guarantee that the content is byte-identical
+    if not etag or etag.startswith("W/"):
+        return None
+    key = hashlib.sha256(f"{url}\n{etag}".encode()).hexdigest()
+    return os.path.join(
+        cache.get_cache_dir("digests", DIGEST_CACHE_DIR_ENV), f"{key}.json"
+    )
+
+
+def _read_cache(cache_path):
+    try:
+        with open(cache_path) as fd:
+            return json.load(fd)["digest"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _write_cache(cache_path, url, digest):
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as fd:
+        json.dump({"url": url, "digest": digest}, fd)
+    os.replace(tmp_path, cache_path)
+
+
+def get_package_digest(url, packages_dir=None):
+    """Compute the sha256 digest of the chart package available at the given URL.
+
+    Args:
+        url (str): URL of the chart package
+        packages_dir (str): Directory holding the locally released packages, e.g.
+                            RELEASE_PACKAGES_DIR. The package is looked up there only
+                            if set.
+
+    Returns:
+        str: The sha256 hex digest of the package, or None if the package is not
+             accessible.
+    """
+    local_path = packages_dir and _get_local_package(url, packages_dir)
+    if local_path:
+        digest = artifactstore.ArtifactStore().get_linked_digest(local_path)
+        digest = digest or hash_file(local_path)
+        print(f"[INFO] Digest of local package {local_path}: {digest}")
+        return digest
+
+    head = requests.head(url, allow_redirects=True)
+    print(f"[DEBUG]: response code from head request: {head.status_code}")
+    if head.status_code != 200:
+        return None
+
+    cache_path = _get_cache_path(url, head)
+    if cache_path:
+        digest = _read_cache(cache_path)
+        if digest:
+            print(f"[INFO] Digest of {url} found in cache: {digest}")
+            return digest
+
+    with requests.get(url, allow_redirects=True, stream=True) as response:
+        print(f"[DEBUG]: response code get request: {response.status_code}")
+        if response.status_code != 200:
+            return None
+        digest = hash_chunks(response.iter_content(CHUNK_SIZE))
+
+    print(f"[DEBUG]: calculated digest : {digest}")
+    if cache_path:
+        _write_cache(cache_path, url, digest)
+    return digest
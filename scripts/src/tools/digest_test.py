@@ -0,0 +1,97 @@
+"""Unit tests for the streaming package digest computation"""
+
+import hashlib
+
+import pytest
+import responses
+
+from tools import artifactstore, digest
+
+package_url = "https://github.com/acme/charts/releases/download/acme-awesome-1.0.0/awesome-1.0.0.tgz"
+package_content = b"\x1f\x8b" + b"package content" * 100000
+package_digest = hashlib.sha256(package_content).hexdigest()
+
+
+@pytest.fixture(autouse=True)
+def digest_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv(digest.DIGEST_CACHE_DIR_ENV, str(tmp_path / "cache"))
+    monkeypatch.setenv(artifactstore.ARTIFACT_STORE_DIR_ENV, str(tmp_path / "store"))
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path / "cache"
+
+
+def test_hash_file(tmp_path):
+    path = tmp_path / "package.tgz"
+    path.write_bytes(package_content)
+    assert digest.hash_file(str(path)) == package_digest
+
+
+def test_local_package(tmp_path):
+    packages_dir = tmp_path / digest.RELEASE_PACKAGES_DIR
+    packages_dir.mkdir()
+    (packages_dir / "awesome-1.0.0.tgz").write_bytes(package_content)
+
+    # No HTTP request is made: responses would reject it
+    with responses.RequestsMock():
+        assert (
+            digest.get_package_digest(package_url, digest.RELEASE_PACKAGES_DIR)
+            == package_digest
+        )
+
+    # Without opting in, the package at the URL is checked
+    with responses.RequestsMock() as requests_mock:
+        requests_mock.head(package_url, status=404)
+        assert digest.get_package_digest(package_url) is None
+
+
+def test_linked_package(tmp_path, monkeypatch):
+    package = tmp_path / "awesome-1.0.0.tgz"
+    package.write_bytes(package_content)
+    store = artifactstore.ArtifactStore()
+    store.add(package.name, str(package), move=True)
+    store.link(package.name, str(tmp_path / digest.RELEASE_PACKAGES_DIR))
+
+    # The digest recorded in the store is used
+    monkeypatch.setattr(digest, "hash_file", None)
+    with responses.RequestsMock():
+        assert (
+            digest.get_package_digest(package_url, digest.RELEASE_PACKAGES_DIR)
+            == package_digest
+        )
+
+
+@responses.activate
+def test_digest_cache():
+    responses.head(package_url, headers={"ETag": '"v1"'})
+    responses.get(package_url, body=package_content)
+
+    assert digest.get_package_digest(package_url) == package_digest
+    assert digest.get_package_digest(package_url) == package_digest
+    assert responses.assert_call_count(package_url, 3)
+
+    # A new version of the artifact is hashed again
+    responses.replace(responses.HEAD, package_url, headers={"ETag": '"v2"'})
+    responses.replace(responses.GET, package_url, body=b"other content")
+    assert digest.get_package_digest(package_url) == (
+        hashlib.sha256(b"other content").hexdigest()
+    )
+
+
+@pytest.mark.parametrize(
+    "headers", [{"Content-Length": str(len(package_content))}, {"ETag": 'W/"v1"'}]
+)
+@responses.activate
+def test_no_digest_cache(headers):
+    responses.head(package_url, headers=headers)
+    responses.get(package_url, body=package_content)
+    assert digest.get_package_digest(package_url) == package_digest
+
+    # A replaced artifact of the same size is hashed again
+    responses.replace(responses.GET, package_url, body=b"\x1f\x8b" + b"x" * 1500000)
+    assert digest.get_package_digest(package_url) != package_digest
+
+
+@responses.activate
+def test_package_not_found():
+    responses.head(package_url, status=404)
+    assert digest.get_package_digest(package_url) is None
@@ -0,0 +1,42 @@
+"""Recording of the error logs of the code running in the current thread.
+
+The steps of the workflow report errors by writing them to an errors file. When a
+step runs several checks concurrently, such as chart-pr-review, it captures the error
+logs of each check instead, to report them as findings of the check, see
+chartprreview.checkgraph.
+"""
+
+import contextlib
+import threading
+
+# Error logs captured in the current thread, if any
+_local = threading.local()
+
+
+@contextlib.contextmanager
+def capture():
+    """Capture the error logs recorded in the current thread.
+
+    Yields:
+        list[list[str]]: The messages of each recorded error log
+    """
+    error_logs = []
+    _local.error_logs = error_logs
+    try:
+        yield error_logs
+    finally:
+        _local.error_logs = None
+
+
+def record(*msg):
+    """Record an error log, if the error logs of the current thread are captured.
+
+    Returns:
+        bool: False if the error logs of the current thread are not captured, in
+              which case the log must be written by the caller.
+    """
+    error_logs = getattr(_local, "error_logs", None)
+    if error_logs is None:
+        return False
+    error_logs.append(list(msg))
+    return True
@@ -0,0 +1,105 @@
+"""Parsing of semantic versions and version ranges, shared by all the scripts.
+
+Chart versions, OpenShift versions and version ranges are parsed with
+semantic_version, and each distinct string is only parsed once per process: the
+results are kept in LRU caches. semantic_version objects are immutable, so the cached
+objects can be shared by all callers.
+
+Containment checks of a version in a range are cached by (version, range) pair, on
+top of the parsed versions and ranges.
+"""
+
+import functools
+
+import semantic_version
+
+CACHE_SIZE = 65536
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def parse(version):
+    """Parse a strict semantic version, such as "1.2.3" or "1.2.3-rc.1+build".
+
+    Raises:
+        ValueError if the version is not a valid semantic version.
+    """
+    return semantic_version.Version(version)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def coerce(version):
+    """Coerce a version into a semantic version, for instance "4.13" into "4.13.0".
+
+    Raises:
+        ValueError if the version can't be coerced.
+    """
+    return semantic_version.Version.coerce(version)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def is_valid(version):
+    """Check that a version is a strict semantic version.
+
+    Args:
+        version (str): The version to check
+
+    Returns:
+        bool: True if the version is valid, False otherwise.
+    """
+    return bool(semantic_version.validate(version))
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def npm_spec(version_range):
+    """Parse an npm version range, such as ">=4.10" or ">=1.23.0-0 <1.27.0-0".
+
+    Raises:
+        ValueError if the range is not valid.
+    """
+    return semantic_version.NpmSpec(version_range)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def simple_spec(version_range):
+    """Parse a simple version range, such as ">=4.1.0".
+
+    Raises:
+        ValueError if the range is not valid.
+    """
+    return semantic_version.SimpleSpec(version_range)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def in_range(version, version_range):
+    """Check if a version belongs to an npm version range.
+
+    Args:
+        version (str): The version, coerced into a semantic version
+        version_range (str): The npm version range
+
+    Raises:
+        ValueError if the version or the range are not valid.
+    """
+    return coerce(version) in npm_spec(version_range)
+
+
+def compare(version1, version2):
+    """Compare two strict semantic versions.
+
+    Returns:
+        int: -1, 0 or 1 if version1 is respectively lower than, equal to or greater
+             than version2.
+
+    Raises:
+        ValueError if one of the versions is not valid.
+    """
+    v1, v2 = parse(version1), parse(version2)
+    return (v1 > v2) - (v1 < v2)
+
+
+def cache_info():
+    """Return the statistics of the caches, by function name."""
+    return {
+        function.__name__: function.cache_info()
+        for function in (parse, coerce, is_valid, npm_spec, simple_spec, in_range)
+    }
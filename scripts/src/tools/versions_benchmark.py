@@ -0,0 +1,157 @@
+"""Micro-benchmark of the version parsing of tools.versions.
+
+Parses every chart version, kubeVersion and supportedOpenShiftVersions range of a
+Helm repository index, and checks every tested OpenShift version against the range of
+its chart, once with semantic_version directly and then twice through tools.versions:
+with cold caches, then with warm caches, as a process handling the same index again
+would.
+
+Usage:
+    python -m tools.versions_benchmark [index.yaml path or URL]
+    python -m tools.versions_benchmark --synthetic 6000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import semantic_version
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+sys.path.append("../")
+from indexfile import fetch
+from indexfile.index import INDEX_FILE
+from tools import versions
+
+SUPPORTED_OCP_ANNOTATION = "charts.openshift.io/supportedOpenShiftVersions"
+TESTED_OCP_ANNOTATION = "charts.openshift.io/testedOpenShiftVersion"
+
+
+def load_index(location):
+    if os.path.exists(location):
+        with open(location) as fd:
+            return yaml.load(fd, Loader=SafeLoader)
+    return fetch.fetch_index(location, allow_stale=True).data
+
+
+def synthetic_index(size):
+    """Return an index of the given number of charts, with the shape of the real one:
+    a few providers sharing a few version ranges."""
+    entries = {}
+    for i in range(size):
+        chart = {
+            "name": f"chart{i % 300}",
+            "version": f"{i % 7}.{i % 13}.{i % 29}",
+            "kubeVersion": f">={1 + i % 2}.{20 + i % 8}.0-0",
+            "annotations": {
+                SUPPORTED_OCP_ANNOTATION: f">=4.{8 + i % 7}",
+                TESTED_OCP_ANNOTATION: f"4.{10 + i % 6}",
+            },
+        }
+        entries.setdefault(f"provider{i % 40}-chart{i % 300}", []).append(chart)
+    return {"apiVersion": "v1", "entries": entries}
+
+
+def collect(index_data):
+    """Return the chart versions, the ranges and the (tested version, range) pairs of
+    an index."""
+    chart_versions, ranges, checks = [], [], []
+    for charts in index_data["entries"].values():
+        for chart in charts:
+            chart_versions.append(str(chart.get("version", "")))
+            if chart.get("kubeVersion"):
+                ranges.append(chart["kubeVersion"])
+            annotations = chart.get("annotations") or {}
+            supported = annotations.get(SUPPORTED_OCP_ANNOTATION)
+            if supported and supported != "N/A":
+                ranges.append(supported)
+                tested = annotations.get(TESTED_OCP_ANNOTATION)
+                if tested:
+                    checks.append((tested, supported))
+    return chart_versions, ranges, checks
+
+
+def run(coerce, npm_spec, in_range, chart_versions, ranges, checks):
+    start = time.perf_counter()
+    for version in chart_versions:
+        try:
+            coerce(version)
+        except ValueError:
+            pass
+    for version_range in ranges:
+        try:
+            npm_spec(version_range)
+        except ValueError:
+            pass
+    for version, version_range in checks:
+        try:
+            in_range(version, version_range)
+        except ValueError:
+            pass
+    return time.perf_counter() - start
+
+
+def uncached_in_range(version, version_range):
+    return semantic_version.Version.coerce(version) in semantic_version.NpmSpec(
+        version_range
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "index",
+        nargs="?",
+        default=INDEX_FILE,
+        help="Path or URL of the index, defaults to the published index",
+    )
+    parser.add_argument(
+        "--synthetic",
+        type=int,
+        default=0,
+        help="Use a synthetic index with this number of charts instead",
+    )
+    args = parser.parse_args()
+
+    if args.synthetic:
+        index_data = synthetic_index(args.synthetic)
+    else:
+        index_data = load_index(args.index)
+    chart_versions, ranges, checks = collect(index_data)
+    print(
+        f"[INFO] {len(chart_versions)} versions, {len(ranges)} ranges "
+        f"({len(set(ranges))} distinct), {len(checks)} containment checks"
+    )
+
+    timings = {
+        "semantic_version": run(
+            semantic_version.Version.coerce,
+            semantic_version.NpmSpec,
+            uncached_in_range,
+            chart_versions,
+            ranges,
+            checks,
+        ),
+    }
+    for name in ("versions (cold)", "versions (warm)"):
+        timings[name] = run(
+            versions.coerce,
+            versions.npm_spec,
+            versions.in_range,
+            chart_versions,
+            ranges,
+            checks,
+        )
+
+    for name, timing in timings.items():
+        print(f"{name:>20}: {timing * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
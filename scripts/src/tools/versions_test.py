@@ -0,0 +1,47 @@
+"""Unit tests for the shared version parsing"""
+
+import pytest
+
+from tools import versions
+
+
+def test_parse():
+    assert str(versions.parse("1.2.3-rc.1+build")) == "1.2.3-rc.1+build"
+    assert versions.parse("1.2.3") is versions.parse("1.2.3")
+    with pytest.raises(ValueError):
+        versions.parse("4.13")
+
+
+def test_coerce():
+    assert str(versions.coerce("4.13")) == "4.13.0"
+    with pytest.raises(ValueError):
+        versions.coerce("latest")
+
+
+@pytest.mark.parametrize(
+    "version, valid",
+    [
+        ("1.0.0", True),
+        ("1.0.0-rc.1+build.1", True),
+        ("v1.0.0", False),
+        ("4.13", False),
+        ("01.0.0", False),
+        ("1.0.0-01", False),
+    ],
+)
+def test_is_valid(version, valid):
+    assert versions.is_valid(version) == valid
+
+
+def test_in_range():
+    assert versions.in_range("4.13", ">=4.10")
+    assert not versions.in_range("4.9", ">=4.10")
+    assert versions.npm_spec(">=4.10") is versions.npm_spec(">=4.10")
+    with pytest.raises(ValueError):
+        versions.in_range("4.13", "not a range")
+
+
+def test_compare():
+    assert versions.compare("1.0.10", "1.0.9") == 1
+    assert versions.compare("1.0.0-rc.1", "1.0.0") == -1
+    assert versions.compare("1.0.0+a", "1.0.0+b") == 0
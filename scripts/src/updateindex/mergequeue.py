@@ -0,0 +1,141 @@
+"""Optimistic-concurrency updates of the Helm repository index branch.
+
+Instead of serializing the index updates, each update reads the index from the tip of
+the index branch, records the SHA of the index blob it is based on, applies its
+entries and pushes. If the push is rejected because another update landed in the
+meantime, the entries are re-applied on top of the new tip of the branch, after a
+random delay, until the push succeeds or the attempts are exhausted.
+
+Reading the index from git, rather than from raw.githubusercontent.com, also makes
+sure an update is never based on a stale CDN-cached copy of the index.
+"""
+
+import os
+import random
+import time
+
+import yaml
+from git import GitCommandError, Repo
+
+from updateindex import updateindex
+
+try:
+    from yaml import CDumper as Dumper
+    from yaml import CLoader as Loader
+except ImportError:
+    from yaml import Dumper, Loader
+
+# Messages git prints when a push is rejected because the remote branch moved
+_REJECTED_PUSH_MARKERS = ("[rejected]", "non-fast-forward", "fetch first")
+
+
+class MergeQueueError(Exception):
+    """Raised when the index update couldn't be pushed."""
+
+    pass
+
+
+def _read_base_index(commit, index_file):
+    """Return the SHA and the content of the index blob in the given commit.
+
+    Returns:
+        (str, str): The SHA of the blob and its content, or (None, None) if the index
+                    doesn't exist yet.
+    """
+    try:
+        blob = commit.tree / index_file
+    except KeyError:
+        return None, None
+    return blob.hexsha, blob.data_stream.read().decode()
+
+
+def _is_rejected_push(error):
+    return any(marker in str(error.stderr) for marker in _REJECTED_PUSH_MARKERS)
+
+
+def push_index_update(
+    repo_dir,
+    remote,
+    branch,
+    index_file,
+    updates,
+    commit_message,
+    sidecars=False,
+    shards=False,
+    max_attempts=5,
+    retry_delay=2.0,
+):
+    """Apply a batch of updates to the index and push it to the index branch.
+
+    The digests of the packages are verified once, before the first attempt.
+
+    Args:
+        repo_dir (str): Path to a git worktree, in which the index branch is checked
+                        out (detached) and committed to.
+        remote (str): Name or URL of the remote hosting the index branch
+        branch (str): Name of the index branch
+        index_file (str): Path to the index file, relative to the root of the branch
+        updates (list[IndexUpdate]): The updates to apply, in order
+        commit_message (str): Message of the index commit
+        sidecars (bool): Set to True to also commit the sidecars of the index
+        shards (bool): Set to True to also commit the shards of the index
+        max_attempts (int): Number of pushes to attempt before giving up
+        retry_delay (float): Upper bound, in seconds, of the random delay before the
+                             second attempt. It is doubled for each further attempt.
+
+    Returns:
+        str: SHA of the pushed commit
+
+    Raises:
+        MergeQueueError if the push was still rejected after max_attempts attempts.
+        GitCommandError if a git operation failed for another reason.
+    """
+    updateindex.verify_package_digests(updates)
+
+    repo = Repo(repo_dir)
+    index_path = os.path.join(repo_dir, index_file)
+
+    for attempt in range(1, max_attempts + 1):
+        repo.git.fetch(remote, branch)
+        base_commit = repo.commit("FETCH_HEAD")
+        repo.git.checkout("--detach", "--force", base_commit.hexsha)
+
+        base_sha, index_text = _read_base_index(base_commit, index_file)
+        print(
+            f"[INFO] Attempt {attempt}/{max_attempts}: updating {index_file} "
+            f"(blob {base_sha}) from {branch} at {base_commit.hexsha}"
+        )
+        if index_text is None:
+            index_text = yaml.dump(
+                {"apiVersion": "v1", "entries": {}, "generated": updateindex._now()},
+                Dumper=Dumper,
+            )
+        base_data = None
+        if sidecars or shards:
+            base_data = yaml.load(index_text, Loader=Loader)
+        paths = updateindex._write_index_file_updates(
+            index_text, index_path, updates, base_data, sidecars, shards
+        )
+        repo.git.add(*paths)
+        repo.git.commit("-m", commit_message)
+
+        try:
+            repo.git.push(remote, f"HEAD:refs/heads/{branch}")
+        except GitCommandError as e:
+            if not _is_rejected_push(e):
+                raise
+            delay = random.uniform(0, retry_delay * 2 ** (attempt - 1))
+            print(
+                f"[WARNING] Push rejected, {branch} has moved since blob {base_sha}. "
+                f"Retrying in {delay:.1f}s"
+            )
+            time.sleep(delay)
+            continue
+
+        print(f"[INFO] Pushed {repo.head.commit.hexsha} to {branch}")
+        return repo.head.commit.hexsha
+
+    raise MergeQueueError(
+        f"Failed to push the update of {index_file} to {branch} "
+        f"after {max_attempts} attempts"
+    )
@@ -0,0 +1,148 @@
+"""Unit tests for the optimistic-concurrency update of the index branch
+
+The index branch is hosted in a local bare repository, and concurrent updates are
+simulated by pushing from another clone while an update is being applied.
+"""
+
+import pytest
+import yaml
+from git import GitCommandError, Repo
+
+from updateindex import mergequeue, updateindex
+
+try:
+    from yaml import CDumper as Dumper
+    from yaml import CLoader as Loader
+except ImportError:
+    from yaml import Dumper, Loader
+
+branch = "gh-pages"
+index_file = "index.yaml"
+
+
+def make_update(entry_name, version):
+    return updateindex.IndexUpdate(
+        entry_name,
+        version,
+        f"https://example.com/{entry_name}-{version}.tgz",
+        {
+            "name": entry_name.split("-", 1)[1],
+            "version": version,
+            "annotations": {},
+        },
+        True,
+    )
+
+
+def clone(remote, path):
+    repo = Repo.clone_from(remote, path, branch=branch)
+    repo.config_writer().set_value("user", "name", "test").release()
+    repo.config_writer().set_value("user", "email", "test@example.com").release()
+    return repo
+
+
+@pytest.fixture
+def remote(tmp_path):
+    remote_path = tmp_path / "remote.git"
+    Repo.init(remote_path, bare=True, initial_branch=branch)
+
+    seed = Repo.init(tmp_path / "seed", initial_branch=branch)
+    seed.config_writer().set_value("user", "name", "test").release()
+    seed.config_writer().set_value("user", "email", "test@example.com").release()
+    index = {"apiVersion": "v1", "entries": {}, "generated": "2024-01-01"}
+    (tmp_path / "seed" / index_file).write_text(yaml.dump(index, Dumper=Dumper))
+    seed.git.add(index_file)
+    seed.git.commit("-m", "Initial index")
+    seed.git.push(str(remote_path), f"HEAD:refs/heads/{branch}")
+    return str(remote_path)
+
+
+def read_remote_index(remote, tmp_path):
+    clone(remote, tmp_path / "check")
+    return yaml.load((tmp_path / "check" / index_file).read_text(), Loader=Loader)
+
+
+def test_push_index_update(remote, tmp_path):
+    clone(remote, tmp_path / "worker")
+    mergequeue.push_index_update(
+        str(tmp_path / "worker"),
+        remote,
+        branch,
+        index_file,
+        [make_update("acme-awesome", "1.0.0")],
+        "Add acme-awesome 1.0.0",
+        sidecars=True,
+        shards=True,
+    )
+
+    index = read_remote_index(remote, tmp_path)
+    assert [c["version"] for c in index["entries"]["acme-awesome"]] == ["1.0.0"]
+    assert (tmp_path / "check" / "index.json").exists()
+    assert (tmp_path / "check" / "providers" / "acme" / "index.yaml.gz").exists()
+
+
+def test_push_index_update_rejected(remote, tmp_path, monkeypatch):
+    clone(remote, tmp_path / "worker")
+    clone(remote, tmp_path / "other")
+    monkeypatch.setattr(mergequeue.time, "sleep", lambda _: None)
+
+    # Another update lands between the moment the index is read and the push
+    write_index_file_updates = updateindex._write_index_file_updates
+    calls = []
+
+    def concurrent_update(*args):
+        calls.append(args)
+        if len(calls) == 1:
+            mergequeue.push_index_update(
+                str(tmp_path / "other"),
+                remote,
+                branch,
+                index_file,
+                [make_update("acme-other", "0.1.0")],
+                "Add acme-other 0.1.0",
+            )
+        return write_index_file_updates(*args)
+
+    monkeypatch.setattr(updateindex, "_write_index_file_updates", concurrent_update)
+
+    mergequeue.push_index_update(
+        str(tmp_path / "worker"),
+        remote,
+        branch,
+        index_file,
+        [make_update("acme-awesome", "1.0.0")],
+        "Add acme-awesome 1.0.0",
+    )
+
+    # One attempt for each update, plus the retry of the rejected one
+    assert len(calls) == 3
+    index = read_remote_index(remote, tmp_path)
+    assert sorted(index["entries"]) == ["acme-awesome", "acme-other"]
+
+
+def test_push_index_update_gives_up(remote, tmp_path, monkeypatch):
+    clone(remote, tmp_path / "worker")
+    monkeypatch.setattr(mergequeue.time, "sleep", lambda _: None)
+
+    hook = tmp_path / "remote.git" / "hooks" / "pre-receive"
+    hook.write_text("#!/bin/sh\nexit 1\n")
+    hook.chmod(0o755)
+
+    def push():
+        mergequeue.push_index_update(
+            str(tmp_path / "worker"),
+            remote,
+            branch,
+            index_file,
+            [make_update("acme-awesome", "1.0.0")],
+            "Add acme-awesome 1.0.0",
+            max_attempts=2,
+        )
+
+    # A push declined for another reason than a concurrent update is not retried
+    with pytest.raises(GitCommandError):
+        push()
+
+    monkeypatch.setattr(mergequeue, "_is_rejected_push", lambda _: True)
+    with pytest.raises(mergequeue.MergeQueueError):
+        push()
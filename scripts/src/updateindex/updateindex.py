@@ -3,16 +3,19 @@
 
 import argparse
 import base64
-import hashlib
 import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timezone
 
-import requests
 import yaml
 from environs import Env
 
+from indexfile import fetch, shards, sidecar
+from tools import digest
+
 try:
     from yaml import CDumper as Dumper
     from yaml import CLoader as Loader
@@ -36,6 +39,10 @@ def _decode_chart_entry(chart_entry_encoded):
     return json.loads(chart_entry_str)
 
 
+def _now():
+    return datetime.now(timezone.utc).astimezone().isoformat()
+
+
 def download_index(index_file, repository, branch):
     """Download the index file to disk and retrieve its content.
 
@@ -48,13 +55,16 @@ def download_index(index_file, repository, branch):
         dict: The current content of the index
     """
     print(f"Downloading {index_file}")
-    r = requests.get(
-        f"https://raw.githubusercontent.com/{repository}/{branch}/{index_file}"
-    )
-    now = datetime.now(timezone.utc).astimezone().isoformat()
-
-    if r.status_code == 200:
-        data = yaml.load(r.text, Loader=Loader)
+    document = fetch.fetch_repository_index(repository, branch, index_file)
+    now = _now()
+
+    if document.found:
+        # The index is written back: it is parsed from the YAML rather than loaded
+        # from the JSON sidecar, whose timestamps are strings. The parsed index is
+        # shared with other users of the fetch layer: only copy the parts that are
+        # modified by update_index.
+        data = dict(document.yaml_data)
+        data["entries"] = dict(data["entries"])
         data["generated"] = now
     else:
         data = {"apiVersion": "v1", "generated": now, "entries": {}}
@@ -62,6 +72,103 @@ def download_index(index_file, repository, branch):
     return data
 
 
+def _get_entry_name():
+    entry_name = os.environ.get("CHART_ENTRY_NAME")
+    if not entry_name:
+        print("[ERROR] Internal error: missing chart entry name")
+        sys.exit(1)
+    return entry_name
+
+
+@dataclass
+class IndexUpdate:
+    """A chart version to add to the index.
+
+    Args:
+        entry_name (str): Name of the index entry, i.e. <provider>-<chart>
+        version (str): The version of the chart (ex: 1.4.0)
+        chart_url (str): URL of the Chart
+        chart_entry (dict): Index entry to add
+        web_catalog_only (bool): Set to True if the provider has chosen the Web Catalog
+                                 Only option.
+    """
+
+    entry_name: str
+    version: str
+    chart_url: str
+    chart_entry: dict
+    web_catalog_only: bool = False
+
+
+def read_manifest(manifest_file, web_catalog_only=False):
+    """Read a batch of index updates from a manifest file.
+
+    The manifest holds one JSON object per line, with the "entry_name", "version" and
+    "chart_url" of the chart, and its "chart_entry" base64-encoded the way
+    chart-repo-manager outputs it. An optional "web_catalog_only" boolean overrides
+    the default value.
+
+    Args:
+        manifest_file (str): Path to the manifest file
+        web_catalog_only (bool): Default value for the Web Catalog Only option
+
+    Returns:
+        list[IndexUpdate]: The updates to apply, in manifest order
+
+    Raises:
+        ValueError if a line of the manifest is malformed.
+    """
+    updates = []
+    with open(manifest_file) as fd:
+        for line_number, line in enumerate(fd, start=1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+                updates.append(
+                    IndexUpdate(
+                        entry_name=item["entry_name"],
+                        version=item["version"],
+                        chart_url=item["chart_url"],
+                        chart_entry=_decode_chart_entry(item["chart_entry"]),
+                        web_catalog_only=item.get("web_catalog_only", web_catalog_only),
+                    )
+                )
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(
+                    f"Malformed manifest line {line_number} in {manifest_file}: {e}"
+                ) from e
+    return updates
+
+
+def verify_package_digests(updates, max_workers=8):
+    """Set or check the digest of the chart packages of a batch of updates.
+
+    The packages are downloaded concurrently. Updates for Web Catalog Only charts are
+    skipped, as they don't have a package.
+
+    Args:
+        updates (list[IndexUpdate]): The updates to verify
+        max_workers (int): Maximum number of concurrent downloads
+
+    Raises:
+        Exception if a digest can't be computed or doesn't match, for the first such
+        update in the batch.
+    """
+    to_verify = [update for update in updates if not update.web_catalog_only]
+    if not to_verify:
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Consuming the results raises the first error in the order of the batch
+        list(
+            executor.map(
+                lambda update: set_package_digest(update.chart_entry, update.chart_url),
+                to_verify,
+            )
+        )
+
+
 def update_index(
     index_data,
     version,
@@ -80,26 +187,56 @@ def update_index(
                                  Only option.
 
     """
-    now = datetime.now(timezone.utc).astimezone().isoformat()
+    update = IndexUpdate(
+        _get_entry_name(), version, chart_url, chart_entry, web_catalog_only
+    )
+    update_index_batch(index_data, [update])
+
+
+def update_index_batch(index_data, updates):
+    """Add a batch of chart versions to the Helm repository index
 
-    print("[INFO] Updating the chart entry with new version")
+    Args:
+        index_data (dict): Content of the Helm repo index
+        updates (list[IndexUpdate]): The updates to apply, in order
+
+    """
+    verify_package_digests(updates)
+    _apply_updates(index_data, updates)
+
+
+def _apply_updates(index_data, updates):
+    for update in updates:
+        index_data["entries"][update.entry_name] = _merge_chart_entry(
+            index_data["entries"].get(update.entry_name, []), update
+        )
+
+
+def _merge_chart_entry(entries, update):
+    """Add the chart entry to the list of entries of a chart, replacing any existing
+    entry for the same version.
+
+    The digest of the package is expected to have been verified already.
+
+    Args:
+        entries (list): Current index entries for this chart
+        update (IndexUpdate): The chart version to add
+
+    Returns:
+        list: The new index entries for this chart
+    """
+    print(f"[INFO] Updating the chart entry {update.entry_name} with new version")
     crtentries = []
-    entry_name = os.environ.get("CHART_ENTRY_NAME")
-    if not entry_name:
-        print("[ERROR] Internal error: missing chart entry name")
-        sys.exit(1)
-    d = index_data["entries"].get(entry_name, [])
-    for v in d:
-        if v["version"] == version:
+    for v in entries:
+        if v["version"] == update.version:
             continue
         crtentries.append(v)
 
-    chart_entry["urls"] = [chart_url]
-    if not web_catalog_only:
-        set_package_digest(chart_entry, chart_url)
-    chart_entry["annotations"]["charts.openshift.io/submissionTimestamp"] = now
+    chart_entry = update.chart_entry
+    chart_entry["urls"] = [update.chart_url]
+    chart_entry["annotations"]["charts.openshift.io/submissionTimestamp"] = _now()
     crtentries.append(chart_entry)
-    index_data["entries"][entry_name] = crtentries
+    return crtentries
 
 
 def set_package_digest(chart_entry, chart_url):
@@ -115,17 +252,8 @@ def set_package_digest(chart_entry, chart_url):
 
     """
     print("[INFO] set package digests.")
-
-    head = requests.head(chart_url, allow_redirects=True)
     print(f"[DEBUG]: tgz url : {chart_url}")
-    print(f"[DEBUG]: response code from head request: {head.status_code}")
-
-    target_digest = ""
-    if head.status_code == 200:
-        response = requests.get(chart_url, allow_redirects=True)
-        print(f"[DEBUG]: response code get request: {response.status_code}")
-        target_digest = hashlib.sha256(response.content).hexdigest()
-        print(f"[DEBUG]: calculated digest : {target_digest}")
+    target_digest = digest.get_package_digest(chart_url)
 
     pkg_digest = ""
     if "digest" in chart_entry:
@@ -148,12 +276,21 @@ def set_package_digest(chart_entry, chart_url):
         )
 
 
-def write_index_file(index_data, index_file):
+def write_index_file(index_data, index_file, write_sidecars=False, write_shards=False):
     """Write the new content of the index to file
 
     Args:
         index_data (dict): Content of the Helm repo index
         index_file (str): Path to the index file to update
+        write_sidecars (bool): Set to True to also write the JSON sidecar and the
+                               compatibility matrix of the index (see
+                               indexfile.sidecar).
+        write_shards (bool): Set to True to also write the per-provider and
+                             per-provider type shards of the index (see
+                             indexfile.shards).
+
+    Returns:
+        list: Paths to the written files
 
     """
     out = yaml.dump(index_data, Dumper=Dumper)
@@ -161,6 +298,232 @@ def write_index_file(index_data, index_file):
     with open(index_file, "w") as fd:
         fd.write(out)
 
+    return [index_file] + _write_derived_files(
+        index_data, index_file, out, write_sidecars, write_shards
+    )
+
+
+def _write_derived_files(index_data, index_file, out, write_sidecars, write_shards):
+    paths = []
+    if write_sidecars:
+        paths += sidecar.write_sidecars(index_data, index_file, out)
+    if write_shards:
+        paths += shards.write_shards(index_data, index_file)
+    return paths
+
+
+class IndexLayoutError(Exception):
+    """Raised when the index file is not laid out the way yaml.dump writes it, and the
+    entry-scoped rewrite cannot be applied."""
+
+    pass
+
+
+def _dump_entries_block(entry_name, entries):
+    """Serialize entries[entry_name] exactly as it appears in a full dump of the index.
+
+    The block is rendered nested under "entries" so that the indentation and line
+    wrapping are identical to the ones of the full document.
+    """
+    out = yaml.dump({"entries": {entry_name: entries}}, Dumper=Dumper)
+    return out.split("\n", 1)[1]
+
+
+def _locate_entry(lines, entry_name):
+    """Find the lines of the index holding the entries of the given chart.
+
+    The index is expected in the layout produced by yaml.dump: sorted top-level keys,
+    and each chart of "entries" starting on a line indented by exactly two spaces.
+
+    Args:
+        lines (list): Lines of the index file, with their line endings
+        entry_name (str): Name of the chart entry to look for
+
+    Returns:
+        (int, int): Indexes of the first and last (excluded) lines of the entry block.
+                    If the chart is not in the index, both point to the line where its
+                    block must be inserted.
+
+    Raises:
+        IndexLayoutError if the layout of the index is not the expected one.
+    """
+    try:
+        start = lines.index("entries:\n") + 1
+    except ValueError as e:
+        raise IndexLayoutError("entries section not found") from e
+
+    key_repr = yaml.dump({entry_name: None}, Dumper=Dumper).rsplit(": null", 1)[0]
+    header = f"  {key_repr}:"
+
+    key_lines = []
+    end = start
+    while end < len(lines):
+        line = lines[end]
+        if line.strip() and not line.startswith(" "):
+            break
+        if line.startswith("  ") and line[2:3] not in (" ", "-", "\n", ""):
+            if line.startswith("  ? "):
+                raise IndexLayoutError(f"complex key found at line {end + 1}")
+            key_lines.append(end)
+        end += 1
+
+    for pos, line_number in enumerate(key_lines):
+        line = lines[line_number]
+        if line.startswith(header) and line[len(header) :][:1] in (" ", "\n"):
+            block_end = key_lines[pos + 1] if pos + 1 < len(key_lines) else end
+            return line_number, block_end
+
+    # The chart is not in the index yet: find where the block should be inserted
+    # to preserve the sorting of keys.
+    for line_number in key_lines:
+        key = next(iter(yaml.load(lines[line_number], Loader=Loader)))
+        if entry_name < key:
+            return line_number, line_number
+    return end, end
+
+
+def update_index_text(
+    index_text,
+    version,
+    chart_url,
+    chart_entry,
+    web_catalog_only,
+):
+    """Update the Helm repository index without loading nor dumping the whole document.
+
+    Only the block holding entries[CHART_ENTRY_NAME] and the "generated" field are
+    re-serialized and spliced into the index content; every other byte is left
+    untouched. Provided the index was written by write_index_file, the result is
+    identical to the one of a full load / update_index / write_index_file cycle.
+
+    Args:
+        index_text (str): Current content of the Helm repo index
+        version (str): The version of the chart (ex: 1.4.0)
+        chart_url (str): URL of the Chart
+        chart_entry (dict): Index entry to add
+        web_catalog_only (bool): Set to True if the provider has chosen the Web Catalog
+                                 Only option.
+
+    Returns:
+        (str, dict): The new content of the index, and the re-serialized part of the
+                     index, i.e. {"entries": {CHART_ENTRY_NAME: [...]}, "generated": ...}
+
+    Raises:
+        IndexLayoutError if the layout of the index is not the expected one.
+    """
+    update = IndexUpdate(
+        _get_entry_name(), version, chart_url, chart_entry, web_catalog_only
+    )
+    return update_index_text_batch(index_text, [update])
+
+
+def update_index_text_batch(index_text, updates):
+    """Entry-scoped equivalent of update_index_batch, see update_index_text.
+
+    Args:
+        index_text (str): Current content of the Helm repo index
+        updates (list[IndexUpdate]): The updates to apply, in order
+
+    Returns:
+        (str, dict): The new content of the index, and the re-serialized part of the
+                     index, i.e. {"entries": {...}, "generated": ...}
+
+    Raises:
+        IndexLayoutError if the layout of the index is not the expected one.
+    """
+    verify_package_digests(updates)
+    return _apply_updates_text(index_text, updates)
+
+
+def _locate_generated(lines):
+    for line_number, line in enumerate(lines):
+        if line.startswith("generated:"):
+            return line_number
+    raise IndexLayoutError("generated field not found")
+
+
+def _apply_updates_text(index_text, updates):
+    lines = index_text.splitlines(keepends=True)
+    _locate_generated(lines)
+
+    changes = {}
+    for update in updates:
+        start, end = _locate_entry(lines, update.entry_name)
+
+        entries = []
+        if start != end:
+            block = yaml.load("".join(["entries:\n"] + lines[start:end]), Loader=Loader)
+            entries = block["entries"][update.entry_name]
+
+        entries = _merge_chart_entry(entries, update)
+        new_block = _dump_entries_block(update.entry_name, entries)
+        print(f"[INFO] Updated index entry:\n{new_block}")
+
+        lines[start:end] = new_block.splitlines(keepends=True)
+        changes[update.entry_name] = entries
+
+    now = _now()
+    lines[_locate_generated(lines)] = yaml.dump({"generated": now}, Dumper=Dumper)
+    return "".join(lines), {"entries": changes, "generated": now}
+
+
+def write_index_file_incremental(
+    index_text,
+    index_file,
+    updates,
+    base_data=None,
+    write_sidecars=False,
+    write_shards=False,
+):
+    """Apply the entry-scoped update to the index content and write it to file.
+
+    Falls back to a full load / dump of the index if its layout does not allow the
+    entry-scoped rewrite.
+
+    Args:
+        index_text (str): Current content of the Helm repo index
+        index_file (str): Path to the index file to update
+        updates (list[IndexUpdate]): The updates to apply, in order
+        base_data (dict): Parsed content of index_text. Required to write the sidecars
+                          or the shards of the index.
+        write_sidecars (bool): Set to True to also write the sidecars of the index
+        write_shards (bool): Set to True to also write the shards of the index
+
+    Returns:
+        list: Paths to the written files
+
+    """
+    verify_package_digests(updates)
+    return _write_index_file_updates(
+        index_text, index_file, updates, base_data, write_sidecars, write_shards
+    )
+
+
+def _write_index_file_updates(
+    index_text, index_file, updates, base_data, write_sidecars, write_shards
+):
+    """write_index_file_incremental, for updates whose digest is already verified."""
+    try:
+        out, changes = _apply_updates_text(index_text, updates)
+    except IndexLayoutError as e:
+        print(f"[WARNING] Cannot update {index_file} incrementally: {e}")
+        index_data = yaml.load(index_text, Loader=Loader)
+        index_data["generated"] = _now()
+        _apply_updates(index_data, updates)
+        return write_index_file(index_data, index_file, write_sidecars, write_shards)
+
+    with open(index_file, "w") as fd:
+        fd.write(out)
+
+    if not (write_sidecars or write_shards):
+        return [index_file]
+
+    index_data = base_data | changes
+    index_data["entries"] = base_data["entries"] | changes["entries"]
+    return [index_file] + _write_derived_files(
+        index_data, index_file, out, write_sidecars, write_shards
+    )
+
 
 def main():
     parser = argparse.ArgumentParser()
@@ -193,7 +556,6 @@ def main():
         "--chart-url",
         dest="chart_url",
         type=str,
-        required=True,
         help="URL where the Chart is available",
     )
     parser.add_argument(
@@ -201,7 +563,6 @@ def main():
         "--chart-entry",
         dest="chart_entry_encoded",
         type=str,
-        required=True,
         help="Index entry to add",
     )
     parser.add_argument(
@@ -209,22 +570,108 @@ def main():
         "--version",
         dest="version",
         type=str,
-        required=True,
         help="Version of the chart being added",
     )
+    parser.add_argument(
+        "-m",
+        "--manifest",
+        dest="manifest",
+        type=str,
+        help="File listing a batch of index entries to add, one JSON object per line",
+    )
+    parser.add_argument(
+        "--incremental",
+        dest="incremental",
+        action="store_true",
+        help="Only rewrite the index entry of the chart instead of the whole index",
+    )
+    parser.add_argument(
+        "--sidecars",
+        dest="sidecars",
+        action="store_true",
+        help="Also write the JSON sidecar and the compatibility matrix of the index",
+    )
+    parser.add_argument(
+        "--shards",
+        dest="shards",
+        action="store_true",
+        help="Also write per-provider and per-provider type shards of the index",
+    )
+    parser.add_argument(
+        "--push",
+        dest="push_remote",
+        type=str,
+        help="Commit the index and push it to the index branch of this git remote, "
+        "re-applying the update on top of the latest index if the push is rejected",
+    )
+    parser.add_argument(
+        "--commit-message",
+        dest="commit_message",
+        type=str,
+        default="Update index",
+        help="Message of the index commit, used with --push",
+    )
     args = parser.parse_args()
 
-    chart_entry = _decode_chart_entry(args.chart_entry_encoded)
-
     env = Env()
     web_catalog_only = env.bool("WEB_CATALOG_ONLY", False)
 
+    if args.manifest:
+        updates = read_manifest(args.manifest, web_catalog_only)
+    elif args.chart_url and args.chart_entry_encoded and args.version:
+        updates = [
+            IndexUpdate(
+                _get_entry_name(),
+                args.version,
+                args.chart_url,
+                _decode_chart_entry(args.chart_entry_encoded),
+                web_catalog_only,
+            )
+        ]
+    else:
+        parser.error(
+            "either --manifest or all of --chart-url, --chart-entry and --version "
+            "are required"
+        )
+
+    print(f"[INFO] Adding {len(updates)} chart version(s) to {args.index_file}")
+
+    if args.push_remote:
+        # Imported here as it requires git, which the other modes don't need
+        from updateindex import mergequeue
+
+        try:
+            mergequeue.push_index_update(
+                os.getcwd(),
+                args.push_remote,
+                args.index_branch,
+                args.index_file,
+                updates,
+                args.commit_message,
+                args.sidecars,
+                args.shards,
+            )
+        except mergequeue.MergeQueueError as e:
+            print(f"[ERROR] {e}")
+            sys.exit(1)
+        return
+
+    if args.incremental:
+        print(f"Downloading {args.index_file}")
+        document = fetch.fetch_repository_index(
+            args.repository, args.index_branch, args.index_file
+        )
+        if document.found:
+            write_index_file_incremental(
+                document.text,
+                args.index_file,
+                updates,
+                document.yaml_data if args.sidecars or args.shards else None,
+                args.sidecars,
+                args.shards,
+            )
+            return
+
     index_data = download_index(args.index_file, args.repository, args.index_branch)
-    update_index(
-        index_data,
-        args.version,
-        args.chart_url,
-        chart_entry,
-        web_catalog_only,
-    )
-    write_index_file(index_data, args.index_file)
+    update_index_batch(index_data, updates)
+    write_index_file(index_data, args.index_file, args.sidecars, args.shards)
@@ -0,0 +1,336 @@
+"""Unit tests for the entry-scoped update of the Helm repository index
+
+The incremental path must produce a file that is byte-for-byte identical to the one
+written by the full load / update_index / write_index_file cycle.
+
+"""
+
+import base64
+import copy
+import hashlib
+import json
+from dataclasses import dataclass
+
+import pytest
+import responses
+import yaml
+
+from indexfile import fetch, sidecar
+from tools import digest
+from updateindex import updateindex
+
+try:
+    from yaml import CDumper as Dumper
+    from yaml import CLoader as Loader
+except ImportError:
+    from yaml import Dumper, Loader
+
+frozen_now = "2024-06-01T10:00:00.000000+00:00"
+
+
+def make_entry(name, version, provider="acme", extra_annotations=None):
+    return {
+        "apiVersion": "v2",
+        "name": name,
+        "version": version,
+        "description": f"The {name} chart.\nIt spans\n\nseveral lines.",
+        "kubeVersion": ">=1.20.0-0",
+        "annotations": {
+            "charts.openshift.io/provider": provider,
+            "charts.openshift.io/providerType": "partner",
+            "charts.openshift.io/submissionTimestamp": "2023-01-01T00:00:00+00:00",
+        }
+        | (extra_annotations or {}),
+        "urls": [f"https://example.com/{provider}-{name}-{version}/{name}.tgz"],
+        "digest": "0" * 64,
+    }
+
+
+def make_index():
+    long_value = "a very long annotation value " * 10
+    return {
+        "apiVersion": "v1",
+        "generated": "2024-01-01T00:00:00+00:00",
+        "entries": {
+            "'quoted": [make_entry("quoted", "0.1.0")],
+            "1.0": [make_entry("numeric", "1.0.0")],
+            "acme-awesome": [
+                make_entry("awesome", "1.0.0"),
+                make_entry("awesome", "1.1.0", extra_annotations={"x": long_value}),
+            ],
+            "acme-empty": [],
+            "hashicorp-vault": [make_entry("vault", "0.17.0", provider="hashicorp")],
+        },
+    }
+
+
+@dataclass
+class UpdateIndexTextScenario:
+    entry_name: str
+    version: str
+    index: dict = None
+
+
+scenarios_update_index_text = [
+    # New version of an existing chart
+    UpdateIndexTextScenario(entry_name="acme-awesome", version="1.2.0"),
+    # Existing version of an existing chart is replaced
+    UpdateIndexTextScenario(entry_name="acme-awesome", version="1.0.0"),
+    # Chart with an empty list of entries
+    UpdateIndexTextScenario(entry_name="acme-empty", version="0.1.0"),
+    # Chart with a quoted key
+    UpdateIndexTextScenario(entry_name="'quoted", version="0.2.0"),
+    # New chart, inserted first
+    UpdateIndexTextScenario(entry_name="!first", version="1.0.0"),
+    # New chart, inserted in the middle
+    UpdateIndexTextScenario(entry_name="acme-brand-new", version="1.0.0"),
+    # New chart, inserted last
+    UpdateIndexTextScenario(entry_name="zzz-last", version="1.0.0"),
+    # Chart whose name is a prefix of an existing chart
+    UpdateIndexTextScenario(entry_name="acme", version="1.0.0"),
+]
+
+
+@pytest.mark.parametrize("test_scenario", scenarios_update_index_text)
+def test_update_index_text(test_scenario, monkeypatch):
+    monkeypatch.setattr(updateindex, "_now", lambda: frozen_now)
+    monkeypatch.setenv("CHART_ENTRY_NAME", test_scenario.entry_name)
+
+    index = test_scenario.index or make_index()
+    index_text = yaml.dump(index, Dumper=Dumper)
+    chart_entry = make_entry(test_scenario.entry_name, test_scenario.version)
+    chart_url = "https://example.com/new.tgz"
+
+    # Full load / dump path
+    index_data = yaml.load(index_text, Loader=Loader)
+    index_data["generated"] = frozen_now
+    updateindex.update_index(
+        index_data, test_scenario.version, chart_url, copy.deepcopy(chart_entry), True
+    )
+    expected = yaml.dump(index_data, Dumper=Dumper)
+
+    # Entry-scoped path
+    out, changes = updateindex.update_index_text(
+        index_text, test_scenario.version, chart_url, copy.deepcopy(chart_entry), True
+    )
+
+    assert out == expected
+
+    base_data = yaml.load(index_text, Loader=Loader)
+    base_data["entries"] |= changes["entries"]
+    base_data["generated"] = changes["generated"]
+    assert base_data == index_data
+
+
+def test_update_index_text_unexpected_layout(monkeypatch):
+    monkeypatch.setattr(updateindex, "_now", lambda: frozen_now)
+    monkeypatch.setenv("CHART_ENTRY_NAME", "acme-awesome")
+
+    index_text = yaml.dump(make_index(), Dumper=Dumper, default_flow_style=True)
+    with pytest.raises(updateindex.IndexLayoutError):
+        updateindex.update_index_text(
+            index_text,
+            "1.2.0",
+            "https://example.com/new.tgz",
+            make_entry("awesome", "1.2.0"),
+            True,
+        )
+
+
+def test_write_index_file_incremental_fallback(monkeypatch, tmp_path):
+    monkeypatch.setattr(updateindex, "_now", lambda: frozen_now)
+    monkeypatch.setenv("CHART_ENTRY_NAME", "acme-awesome")
+
+    index_file = tmp_path / "index.yaml"
+    index_text = yaml.dump(make_index(), Dumper=Dumper, default_flow_style=True)
+    update = updateindex.IndexUpdate(
+        "acme-awesome",
+        "1.2.0",
+        "https://example.com/new.tgz",
+        make_entry("awesome", "1.2.0"),
+        True,
+    )
+    updateindex.write_index_file_incremental(index_text, str(index_file), [update])
+
+    index_data = yaml.load(index_file.read_text(), Loader=Loader)
+    assert index_data["generated"] == frozen_now
+    versions = [e["version"] for e in index_data["entries"]["acme-awesome"]]
+    assert versions == ["1.0.0", "1.1.0", "1.2.0"]
+
+
+def test_write_index_file_incremental_sidecars(monkeypatch, tmp_path):
+    monkeypatch.setattr(updateindex, "_now", lambda: frozen_now)
+    monkeypatch.setenv("CHART_ENTRY_NAME", "acme-awesome")
+    index_text = yaml.dump(make_index(), Dumper=Dumper)
+
+    full_dir = tmp_path / "full"
+    full_dir.mkdir()
+    index_data = yaml.load(index_text, Loader=Loader)
+    index_data["generated"] = frozen_now
+    updateindex.update_index(
+        index_data,
+        "1.2.0",
+        "https://example.com/new.tgz",
+        make_entry("a", "1.2.0"),
+        True,
+    )
+    updateindex.write_index_file(index_data, str(full_dir / "index.yaml"), True, True)
+
+    incremental_dir = tmp_path / "incremental"
+    incremental_dir.mkdir()
+    update = updateindex.IndexUpdate(
+        "acme-awesome",
+        "1.2.0",
+        "https://example.com/new.tgz",
+        make_entry("a", "1.2.0"),
+        True,
+    )
+    updateindex.write_index_file_incremental(
+        index_text,
+        str(incremental_dir / "index.yaml"),
+        [update],
+        yaml.load(index_text, Loader=Loader),
+        write_sidecars=True,
+        write_shards=True,
+    )
+
+    for name in [
+        "index.yaml",
+        "index.json",
+        "index.ocp-compat.json",
+        "partners/index.yaml.gz",
+        "providers/acme/index.yaml",
+    ]:
+        assert (full_dir / name).read_bytes() == (incremental_dir / name).read_bytes()
+
+    index_content = (incremental_dir / "index.yaml").read_bytes()
+    index_digest = hashlib.sha256(index_content).hexdigest()
+    json_content = (incremental_dir / "index.json").read_bytes()
+    assert sidecar.load_json_sidecar(json_content, index_digest) == index_data
+    assert sidecar.load_json_sidecar(json_content, "0" * 64) is None
+
+
+@responses.activate
+def test_download_index_timestamps(monkeypatch, tmp_path):
+    monkeypatch.setenv(fetch.INDEX_CACHE_DIR_ENV, str(tmp_path / "cache"))
+    monkeypatch.setattr(updateindex, "_now", lambda: frozen_now)
+    fetch.clear()
+    index_text = """\
+apiVersion: v1
+entries:
+  acme-awesome:
+  - created: 2021-06-08 10:35:03.925573+00:00
+    name: awesome
+    version: 1.0.0
+generated: 2021-06-08 10:35:03.925573+00:00
+"""
+    index_url = fetch.get_index_url("acme/charts", "gh-pages")
+    responses.get(index_url, body=index_text)
+    sidecar.write_sidecars(
+        yaml.load(index_text, Loader=Loader), str(tmp_path / "index.yaml"), index_text
+    )
+    responses.get(
+        sidecar.get_json_path(index_url),
+        body=(tmp_path / "index.json").read_text(),
+    )
+
+    # Read-only consumers load the JSON sidecar, whose timestamps are strings
+    document = fetch.fetch_repository_index("acme/charts", "gh-pages")
+    chart = document.data["entries"]["acme-awesome"][0]
+    assert chart["created"] == "2021-06-08T10:35:03.925573+00:00"
+
+    # The index written back keeps its timestamps
+    index_data = updateindex.download_index("index.yaml", "acme/charts", "gh-pages")
+    updateindex.write_index_file(index_data, str(tmp_path / "index.yaml"))
+    index_content = (tmp_path / "index.yaml").read_text()
+    assert "  - created: 2021-06-08 10:35:03.925573+00:00\n" in index_content
+    fetch.clear()
+
+
+def make_updates():
+    return [
+        updateindex.IndexUpdate(
+            entry_name,
+            version,
+            f"https://example.com/{entry_name}-{version}.tgz",
+            make_entry(entry_name, version),
+            True,
+        )
+        for entry_name, version in [
+            ("acme-awesome", "1.2.0"),
+            ("zzz-last", "1.0.0"),
+            ("acme-brand-new", "1.0.0"),
+            ("acme-awesome", "1.3.0"),
+            ("acme-awesome", "1.0.0"),
+        ]
+    ]
+
+
+def test_update_index_batch(monkeypatch):
+    monkeypatch.setattr(updateindex, "_now", lambda: frozen_now)
+    index_text = yaml.dump(make_index(), Dumper=Dumper)
+
+    index_data = yaml.load(index_text, Loader=Loader)
+    index_data["generated"] = frozen_now
+    updateindex.update_index_batch(index_data, make_updates())
+    expected = yaml.dump(index_data, Dumper=Dumper)
+
+    out, changes = updateindex.update_index_text_batch(index_text, make_updates())
+    assert out == expected
+    assert sorted(changes["entries"]) == ["acme-awesome", "acme-brand-new", "zzz-last"]
+
+    versions = [e["version"] for e in index_data["entries"]["acme-awesome"]]
+    assert versions == ["1.1.0", "1.2.0", "1.3.0", "1.0.0"]
+
+
+def test_read_manifest(tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    chart_entry = make_entry("awesome", "1.2.0")
+    lines = [
+        {
+            "entry_name": "acme-awesome",
+            "version": "1.2.0",
+            "chart_url": "https://example.com/new.tgz",
+            "chart_entry": base64.b64encode(json.dumps(chart_entry).encode()).decode(),
+        },
+        {
+            "entry_name": "acme-other",
+            "version": "0.1.0",
+            "chart_url": "https://example.com/other.tgz",
+            "chart_entry": base64.b64encode(b"{}").decode(),
+            "web_catalog_only": True,
+        },
+    ]
+    manifest.write_text("\n".join(json.dumps(line) for line in lines) + "\n\n")
+
+    updates = updateindex.read_manifest(str(manifest))
+    assert updates[0] == updateindex.IndexUpdate(
+        "acme-awesome", "1.2.0", "https://example.com/new.tgz", chart_entry, False
+    )
+    assert updates[1].web_catalog_only
+
+    manifest.write_text('{"entry_name": "acme-awesome"}\n')
+    with pytest.raises(ValueError, match="line 1"):
+        updateindex.read_manifest(str(manifest))
+
+
+@responses.activate
+def test_verify_package_digests(tmp_path, monkeypatch):
+    monkeypatch.setenv(digest.DIGEST_CACHE_DIR_ENV, str(tmp_path))
+    updates = make_updates()[:3]
+    for update in updates:
+        update.web_catalog_only = False
+        update.chart_entry.pop("digest")
+        content = update.chart_url.encode()
+        responses.head(update.chart_url)
+        responses.get(update.chart_url, body=content)
+    updates[1].chart_entry["digest"] = "0" * 64
+
+    with pytest.raises(Exception, match="integrity issue"):
+        updateindex.verify_package_digests(updates)
+
+    updates[1].chart_entry.pop("digest")
+    updateindex.verify_package_digests(updates)
+    for update in updates:
+        expected = hashlib.sha256(update.chart_url.encode()).hexdigest()
+        assert update.chart_entry["digest"] == expected
@@ -2,6 +2,7 @@
 """Utility module for processing chart files."""
 
 import os
+import sys
 import tarfile
 import yaml
 import shutil
@@ -9,6 +10,9 @@ import json
 from enum import Enum
 from dataclasses import dataclass
 
+sys.path.append("../../../../../scripts/src")
+from tools import chartarchive
+
 
 class Chart_Type(Enum):
     SRC = 1
@@ -82,19 +86,13 @@ def get_name_and_version_from_chart_tar(path):
     str: chart name
     str: chart version
     """
-    tar = tarfile.open(path)
-    for member in tar.getmembers():
-        if member.name.split("/")[-1] == "Chart.yaml":
-            chart = tar.extractfile(member)
-            if chart is not None:
-                content = chart.read()
-                try:
-                    chart_yaml = yaml.safe_load(content)
-                    return chart_yaml["name"], chart_yaml["version"]
-                except yaml.YAMLError as err:
-                    raise AssertionError(f"error parsing '{path}': {err}")
-    else:
+    try:
+        chart_yaml = chartarchive.get_chart_yaml(path)
+    except yaml.YAMLError as err:
+        raise AssertionError(f"error parsing '{path}': {err}")
+    except ValueError:
         raise AssertionError(f"Chart.yaml not in {path}")
+    return chart_yaml["name"], chart_yaml["version"]
 
 
 def get_name_and_version_from_chart_src(path):